@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 import logging
 from logging.handlers import TimedRotatingFileHandler
@@ -18,6 +19,14 @@ __all__ = [
     "component",
     "spellman",
     "data_collector",
+    "dispatch",
+    "trajectory",
+    "timing",
+    "console",
+    "scan_queue",
+    "events",
+    "server",
+    "streaming",
 ]
 
 # default cross-platform directory for Borealis log and config files
@@ -62,6 +71,10 @@ session_orchestrator = Orchestrator()
 from borealis.data_collector import DataCollector
 session_data_collector = DataCollector()
 
+# Console scan table, detach it for headless high-rate runs: session_console.detach()
+from borealis.console import ScanConsole
+session_console = ScanConsole()
+
 ####################
 #   PUBLIC API     #
 ####################
@@ -82,9 +95,120 @@ def new_sample(sample: str):
     session_data_collector.current_sample = sample
 
 
-def scan(scan_motor: Union['Motor', 'PseudoMotor'], data_point: Iterable[float], acq_time: float):
+def scan(scan_motor: Union['Motor', 'PseudoMotor'], data_point: Iterable[float], acq_time: float,
+         dry_run: bool = False, target_counts: int = None, roi: tuple = None):
     """Master scan function.
 
+    Parameters
+    ----------
+    scan_motor : Union[Motor, PseudoMotor]
+        Instance of Motor or Pseudo-motor to scan
+    data_point : Iterable[float]
+    acq_time : float
+        Acquisition time per point, maximum acquisition time per point with target_counts.
+    dry_run : bool
+        If True, only validate the scan and return its estimated duration (ScanEstimate).
+    target_counts : int
+        If given, acquire each point until the counts reach this target (count preset).
+    roi : tuple
+        (first, last) channels in which the counts of the preset are integrated, whole spectrum if None.
+
+    """
+    acq_times = [acq_time] * len(data_point)
+    if dry_run:
+        return session_orchestrator.dry_run(scan_motor, data_point, acq_times)
+    session_orchestrator.scan(scan_motor, data_point, acq_times, target_counts=target_counts, roi=roi)
+
+
+def resume():
+    """Resume the last interrupted scan, into the same scan of the data file."""
+    session_orchestrator.resume()
+
+
+def repeat_scan(scan_motor: Union['Motor', 'PseudoMotor'], data_point: Iterable[float], acq_time: float,
+                passes: int, roi: tuple = None, target_error: float = None):
+    """Repeat the same scan, storing each pass and their accumulation.
+
+    Parameters
+    ----------
+    scan_motor : Union[Motor, PseudoMotor]
+        Instance of Motor or Pseudo-motor to scan
+    data_point : Iterable[float]
+    acq_time : float
+    passes : int
+        Maximum number of passes.
+    roi : tuple
+        (first, last) channels integrated for the statistics, all channels by default.
+    target_error : float
+        Stop early once the relative standard error of the integrated counts of every point is below this value.
+
+    """
+    acq_times = [acq_time] * len(data_point)
+    return session_orchestrator.repeat_scan(scan_motor, data_point, acq_times, passes, roi=roi,
+                                            target_error=target_error)
+
+
+def timescan(acq_time: float, nb_frames: int = None):
+    """Time scan function, back-to-back acquisitions at the current position.
+
+    Parameters
+    ----------
+    acq_time : float
+        Acquisition time of each frame.
+    nb_frames : int
+        Number of frames, until stopped with Ctrl-C (or an abort from the scan server) by default.
+
+    """
+    return session_orchestrator.time_scan(acq_time, nb_frames=nb_frames)
+
+
+def mesh(scan_motors: list, axes_points: list[Iterable[float]], acq_time: float, snake: bool = True):
+    """Mesh scan function, N-dimensional grid over several motors.
+
+    Parameters
+    ----------
+    scan_motors : list[Union[Motor, PseudoMotor]]
+        Motors or pseudo-motors to scan, from the slowest to the fastest.
+    axes_points : list[Iterable[float]]
+        Positions along each grid axis, one per motor.
+    acq_time : float
+    snake : bool
+        Snake (boustrophedon) ordering, the fast motors never fly back. Default is True.
+
+    """
+    session_orchestrator.mesh_scan(scan_motors, axes_points, acq_time, snake=snake)
+
+
+def adaptive_scan(scan_motor: Union['Motor', 'PseudoMotor'], start: float, stop: float, coarse_step: float,
+                  acq_time: float, roi: tuple = None, tolerance: float = 0.05, max_points: int = 500):
+    """Adaptive scan function, densifying the sampling where the intensity changes fastest (edge, white line).
+
+    Parameters
+    ----------
+    scan_motor : Union[Motor, PseudoMotor]
+        Instance of Motor or Pseudo-motor to scan
+    start : float
+    stop : float
+    coarse_step : float
+        Step of the first, uniform, pass.
+    acq_time : float
+    roi : tuple
+        (first, last) channels integrated to compute the intensity, all channels by default.
+    tolerance : float
+        Accepted relative intensity change between two neighbouring points.
+    max_points : int
+        Maximum total number of points.
+
+    """
+    return session_orchestrator.adaptive_scan(scan_motor, start, stop, coarse_step, acq_time, roi=roi,
+                                              tolerance=tolerance, max_points=max_points)
+
+
+def ascan(scan_motor: Union['Motor', 'PseudoMotor'], data_point: Iterable[float], acq_time: float):
+    """Master scan function, running the scan on an asyncio event loop.
+
+    Motion and acquisitions of all devices are coordinated as tasks, blocks until the scan ends.
+
     Parameters
     ----------
     scan_motor : Union[Motor, PseudoMotor]
@@ -93,4 +217,5 @@ def scan(scan_motor: Union['Motor', 'PseudoMotor'], data_point: Iterable[float],
     acq_time : float
 
     """
-    session_orchestrator.scan(scan_motor, data_point, acq_time)
\ No newline at end of file
+    acq_times = [acq_time] * len(data_point)
+    asyncio.run(session_orchestrator.ascan(scan_motor, data_point, acq_times))
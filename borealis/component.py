@@ -16,7 +16,11 @@ class Component(metaclass=ABCMeta):
     def send(self, message, **kwargs):
         """Sends a message to the mediator."""
         LOGGER.debug('Sending message: %s', message)
-        self._orchestrator.notify(sender=self, message=message, **kwargs)
+        return self._orchestrator.notify(sender=self, message=message, **kwargs)
+
+    def publish(self, event):
+        """Publishes an event (see borealis.events) to the subscribed data components."""
+        self._orchestrator.publish(event)
 
     @abstractmethod
     def receive(self, message, **kwargs):
@@ -45,6 +49,10 @@ class SensorComponent(DeviceComponent):
 
 class DataComponent(Component):
     """Base data component class."""
+    # Event types delivered to the component, all events if None
+    subscriptions = None
+    # Scan timing phase of the deliveries to the component, 'receive <component>' if None
+    timing_phase = None
 
     def __init__(self):
         super().__init__()
@@ -53,6 +61,11 @@ class DataComponent(Component):
     def receive(self, message, **kwargs):
         """Receives and processes messages from the mediator."""
 
+    def receive_event(self, event):
+        """Receives and processes a typed event, as a legacy message unless overridden."""
+        message, kwargs = event.as_message()
+        self.receive(message, **kwargs)
+
 
 class ControllerComponent(DeviceComponent):
     """Base controller component class."""
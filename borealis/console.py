@@ -0,0 +1,126 @@
+import logging
+import time
+
+import numpy as np
+
+from borealis.component import DataComponent
+from borealis.events import DeviceStatus, PointReady, ScanClosed, ScanInterrupted, ScanResumed, ScanStarted, from_message
+
+LOGGER = logging.getLogger(__name__)
+
+# Column widths of the console scan table: index, position, time, counts, rate, ETA
+IDX_COL_WIDTH = 5
+POS_COL_WIDTH = 8
+TIME_COL_WIDTH = 7
+COUNT_COL_WIDTH = 10
+RATE_COL_WIDTH = 7
+ETA_COL_WIDTH = 8
+
+
+class ScanConsole(DataComponent):
+    """
+    Console scan table, printing scan progress from the new_scan_point messages.
+
+    Output is rate-limited: at most `refresh_rate` table lines are printed per second, the points in
+    between are skipped (they are still stored by the data collector). The first and last points of a
+    scan are always printed. Each line shows the point, the total counts of the last sensor, the
+    average number of points per second and the estimated time left.
+
+    For headless high-rate runs, `detach` removes the console from the orchestrator altogether.
+
+    """
+    subscriptions = (ScanStarted, PointReady, ScanClosed, ScanInterrupted, ScanResumed, DeviceStatus)
+    timing_phase = 'logging'
+
+    def __init__(self, refresh_rate: float = 10.):
+        """
+        ScanConsole constructor
+
+        Parameters
+        ----------
+        refresh_rate : float
+            Maximum number of table lines printed per second, every point is printed if None or 0.
+
+        """
+        super().__init__()
+        self.refresh_rate = refresh_rate
+        self._nb_points = 0
+        self._done = 0
+        self._start_time = None
+        self._last_print = -np.inf
+        self._last_line = None
+
+    def __str__(self):
+        return f'{self.__class__.__name__}'
+
+    def receive(self, message, **kwargs):
+        self.receive_event(from_message(message, **kwargs))
+
+    def receive_event(self, event):
+        match event:
+            case ScanStarted(scan_points=scan_points):
+                self.start_table(scan_points)
+            case PointReady():
+                self.add_line(event.point_number, event.position, event.acq_time, event.data)
+            case ScanClosed():
+                self.end_table()
+            case ScanInterrupted():
+                self._flush()
+                LOGGER.info("\n   Scan interrupted after %d/%d points.\n", self._done, self._nb_points)
+            case ScanResumed():
+                LOGGER.info("Resuming at point %d/%d...\n", self._done, self._nb_points)
+            case DeviceStatus(alias=alias, status={'error': error}):
+                LOGGER.warning("%s: %s", alias, error)
+
+    def attach(self):
+        """Register the console to the orchestrator again after `detach`."""
+        if self not in self._orchestrator.data_managers:
+            self._orchestrator.add_data_component(self)
+
+    def detach(self):
+        """Remove the console from the orchestrator, nothing is printed during scans anymore."""
+        if self in self._orchestrator.data_managers:
+            self._orchestrator.remove_data_component(self)
+
+    def start_table(self, scan_points):
+        self._nb_points = int(np.prod(scan_points))
+        self._done = 0
+        self._start_time = time.perf_counter()
+        self._last_print = -np.inf
+        self._last_line = None
+
+        LOGGER.info("Scan starts...\n")
+        LOGGER.info(f"| {'#':>{IDX_COL_WIDTH}} | {'pos':>{POS_COL_WIDTH}} | {'time':>{TIME_COL_WIDTH}} "
+                    f"| {'count tot.':>{COUNT_COL_WIDTH}} | {'pts/s':>{RATE_COL_WIDTH}} | {'ETA':>{ETA_COL_WIDTH}} |")
+        LOGGER.info(f"| {'-' * IDX_COL_WIDTH} | {'-' * POS_COL_WIDTH} | {'-' * TIME_COL_WIDTH} "
+                    f"| {'-' * COUNT_COL_WIDTH} | {'-' * RATE_COL_WIDTH} | {'-' * ETA_COL_WIDTH} |")
+
+    def add_line(self, point_number, position, acq_time, data):
+        self._done += 1
+        now = time.perf_counter()
+        self._last_line = (point_number, position, acq_time, data, now)
+
+        if self.refresh_rate and now - self._last_print < 1 / self.refresh_rate and self._done < self._nb_points:
+            return
+        self._flush()
+
+    def end_table(self):
+        self._flush()
+        duration = time.perf_counter() - self._start_time if self._start_time is not None else 0.
+        LOGGER.info(f"\n   Scan ended successfully. Total duration was: {duration:.2f} s\n")
+
+    def _flush(self):
+        """Print the last received point, if it was skipped."""
+        if self._last_line is None:
+            return
+        point_number, position, acq_time, data, now = self._last_line
+        self._last_line = None
+        self._last_print = now
+
+        counts = next(reversed(data.values())).counts.sum() if data else np.nan
+        elapsed = now - self._start_time
+        rate = self._done / elapsed if elapsed > 0 else np.inf
+        eta = (self._nb_points - self._done) / rate if self._done > 0 and self._nb_points else np.nan
+        LOGGER.info(f"| {point_number:{IDX_COL_WIDTH}.0f} | {position:{POS_COL_WIDTH}.4f} "
+                    f"| {acq_time:{TIME_COL_WIDTH}.2f} | {counts:{COUNT_COL_WIDTH}.0f} "
+                    f"| {rate:{RATE_COL_WIDTH}.2f} | {eta:{ETA_COL_WIDTH}.1f} |")
@@ -4,12 +4,15 @@ Created on Thu February 9 14:48:59 2023.
 
 @author: A. Vancraeyenest
 """
+import asyncio
 import logging
 from abc import ABCMeta, abstractmethod
 import time
 
 import pytest
 
+from borealis import timing
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -127,6 +130,45 @@ class Controller(metaclass=ABCMeta):
         """
         raise NotImplementedError
 
+    def get_axis_velocity(self, axis_id: str):
+        """
+        Get the velocity of a single axis, in dial unit per second.
+
+        Only required for continuous (fly) scans, derived classes supporting it must override.
+
+        Parameters
+        ----------
+        axis_id : str
+            Axis ID as used by the controller.
+
+        Returns
+        -------
+        velocity : float
+            Current velocity setting of the axis.
+
+        """
+        raise NotImplementedError(f"{self} does not support velocity control.")
+
+    def set_axis_velocity(self, axis_id: str, velocity: float):
+        """
+        Set the velocity of a single axis, in dial unit per second.
+
+        Only required for continuous (fly) scans, derived classes supporting it must override.
+
+        Parameters
+        ----------
+        axis_id : str
+            Axis ID as used by the controller.
+        velocity : float
+            New velocity of the axis, must be positive.
+
+        Returns
+        -------
+        None
+
+        """
+        raise NotImplementedError(f"{self} does not support velocity control.")
+
     def wait_motion_end(self, axis_id: str, target: float, timeout: float = 60):
         """
         Check that the axis has reached its target position.
@@ -153,20 +195,68 @@ class Controller(metaclass=ABCMeta):
         """
         sleep_for = 0.1  # sec
         start_time = time.time()
-        while True:
-            current = self.get_axis_position(axis_id)
-            if current == pytest.approx(target, abs=5e-4):
-                break
+        with timing.phase('wait_motion_end'):
+            while not self._is_motion_ended(axis_id, target, start_time, timeout):
+                time.sleep(sleep_for)
+
+    async def async_move_axis(self, axis_id: str, target: float = 0):
+        """
+        Coroutine moving a single axis.
+
+        Runs the blocking move_axis in a worker thread. Controllers able to send a non-blocking
+        move command should override it and await async_wait_motion_end instead.
+
+        Parameters
+        ----------
+        axis_id : str
+            Axis ID as used by the controller.
+        target : float
+            Target position. Default to 0.
+
+        """
+        await asyncio.to_thread(self.move_axis, axis_id, target)
+
+    async def async_wait_motion_end(self, axis_id: str, target: float, timeout: float = 60):
+        """
+        Coroutine checking that the axis has reached its target position.
+
+        Same as wait_motion_end but yields to the event loop between two polls.
+
+        Parameters
+        ----------
+        axis_id : str
+            axis ID as registered in the controller object
+        target : float
+            Position (dial) the axis must reach.
+        timeout : float, optional
+            Time limit for the axis movement to be done, in seconds.
+            The default is 60 seconds.
+
+        Raises
+        ------
+        TimeoutError
+            Error when axis does not reach its target position in due time.
+
+        """
+        sleep_for = 0.1  # sec
+        start_time = time.time()
+        while not self._is_motion_ended(axis_id, target, start_time, timeout):
+            await asyncio.sleep(sleep_for)
 
-            if self.is_limit_switch_activated(axis_id):
-                raise RuntimeError(
-                    "Limit switch activated, move aborted")
+    def _is_motion_ended(self, axis_id: str, target: float, start_time: float, timeout: float):
+        current = self.get_axis_position(axis_id)
+        if current == pytest.approx(target, abs=5e-4):
+            return True
 
-            if (time.time() - start_time) > timeout:
-                raise TimeoutError(
-                    f"Axis never reached target position. Stopped at {current})")
+        if self.is_limit_switch_activated(axis_id):
+            raise RuntimeError(
+                "Limit switch activated, move aborted")
 
-            time.sleep(sleep_for)
+        if (time.time() - start_time) > timeout:
+            raise TimeoutError(
+                f"Axis never reached target position. Stopped at {current})")
+
+        return False
 
     def log(self, level, msg, *args, **kwargs):
         """Log a message with prepending the device's alias in front of the message."""
@@ -181,12 +271,30 @@ class DummyCtrl(Controller):
     def __init__(self, alias: str = "Dummy Controller") -> None:
         super().__init__(alias=alias)
         self.position = {}
+        # Axes without velocity move instantaneously, otherwise motion is simulated from the wall clock
+        self.velocity = {}
+        self._motion = {}
         LOGGER.info('%s initialised.', self)
 
     def move_axis(self, axis_id: str, target: float = 0):
-        self.position[axis_id] = target
+        velocity = self.velocity.get(axis_id)
+        if velocity is None:
+            self.position[axis_id] = target
+        else:
+            self._motion[axis_id] = (time.time(), self.get_axis_position(axis_id), target, velocity)
+
+    async def async_move_axis(self, axis_id: str, target: float = 0):
+        self.move_axis(axis_id, target)
 
     def get_axis_position(self, axis_id: str):
+        if axis_id in self._motion:
+            start_time, start, target, velocity = self._motion[axis_id]
+            travelled = velocity * (time.time() - start_time)
+            if travelled < abs(target - start):
+                return start + travelled if target > start else start - travelled
+            self._motion.pop(axis_id, None)
+            self.position[axis_id] = target
+
         try:
             pos = self.position[axis_id]
         except KeyError:
@@ -204,3 +312,9 @@ class DummyCtrl(Controller):
     def set_axis_to_zero(self, axis_id: str):
         pass
 
+    def get_axis_velocity(self, axis_id: str):
+        return self.velocity.get(axis_id)
+
+    def set_axis_velocity(self, axis_id: str, velocity: float):
+        self.velocity[axis_id] = velocity
+
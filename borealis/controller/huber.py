@@ -36,6 +36,13 @@ class HuberSMC(Controller):
         LOGGER.debug("%s: Moving axis %s to %f (dial).",
                      self.alias, axis_id, target)
 
+    async def async_move_axis(self, axis_id: str, target: float = 0):
+        """Move a single axis to a target position, without blocking the event loop."""
+        self._write(f'goto{axis_id}:{target}')
+        await self.async_wait_motion_end(axis_id, target)
+        LOGGER.debug("%s: Moving axis %s to %f (dial).",
+                     self.alias, axis_id, target)
+
     def get_axis_position(self, axis_id: str):
         """Get the dial position for a single axis."""
         self._write(f'?p{axis_id}')
@@ -1,17 +1,47 @@
 import logging
+import time
 from datetime import datetime
 from pathlib import Path
 
 import h5py
+import numpy as np
 
-from borealis.mca import MCA
 from borealis.component import DataComponent
+from borealis.events import (PointReady, ScanAccumulated, ScanClosed, ScanInterrupted, ScanResumed, ScanStarted,
+                             ScanTiming, from_message)
 
 LOGGER = logging.getLogger(__name__)
 
+# Layout of the spectra datasets: (*scan shape, channels), each spectrum is a contiguous row.
+# Files written before it have no layout attribute and store spectra as (channels, *scan shape).
+POINT_MAJOR = 'point-major'
+
+
+def read_spectra(dataset: h5py.Dataset, channels: slice = slice(None)) -> np.ndarray:
+    """
+    Read a spectra dataset as (*scan shape, channels), whatever the layout of the file.
+
+    Parameters
+    ----------
+    dataset : h5py.Dataset
+        Spectra dataset of a scan, e.g. h5file['scan1/Ketek/MCA'].
+    channels : slice, optional
+        Channels to read (ROI), all by default.
+
+    Returns
+    -------
+    numpy.ndarray
+        Spectra, one row per scan point.
+
+    """
+    if dataset.attrs.get('layout') == POINT_MAJOR:
+        return dataset[..., channels]
+    return np.moveaxis(dataset[channels], 0, -1)
+
 
 class DataCollector(DataComponent):
     """Data collector with HDF5 file handler."""
+    subscriptions = (ScanStarted, PointReady, ScanClosed, ScanInterrupted, ScanResumed, ScanTiming, ScanAccumulated)
 
     def __init__(self):
         """
@@ -26,25 +56,95 @@ class DataCollector(DataComponent):
         super().__init__()
         self.h5file = None
         self.current_scan = None
+        # name of the last scan added to the file, kept once it is closed
+        self.last_scan = None
         self.data_dir = Path.cwd() / 'data'
         self.filename_base = 'borealis_datafile_'
         self.current_sample = 'Unknown sample'
         self.instrument = 'Unknown instrument'
         self.experiment_id = 'Unknown ID'
+        self._growable = False
+        self._timestamps = None
+        # Spectra are chunked along the point axis, with `spectra_per_chunk` spectra per chunk,
+        # and compressed with the filter selected by set_compression
+        self.spectra_per_chunk = 1
+        self.compression = {}
+        # Flush policy: scan points are buffered in memory and written, one hyperslab per run of consecutive
+        # points, then flushed for SWMR readers, every `flush_points` points or when `flush_interval` seconds
+        # have passed since the last flush (checked when a point or a batch of events arrives), and at the end of
+        # the scan.
+        self.flush_points = 1
+        self.flush_interval = None
+        self._pending_points = []
+        self._last_flush = time.monotonic()
+        # handles of the datasets of the current scan, {alias: {name: dataset}}, resolved once per scan
+        self._datasets = {}
 
     def __str__(self):
         """Custom __str__ method for DataCollector class."""
         return f'{self.__class__.__name__}'
 
     def receive(self, message, **kwargs):
-        LOGGER.debug('Receiving message: %s', message)
-        match message:
-            case 'new_scan':
-                self.add_scan(**kwargs)
-            case 'new_scan_point':
-                self.add_scan_point(**kwargs)
-            case 'close_scan':
+        self.receive_event(from_message(message, **kwargs))
+
+    def receive_events(self, events: list):
+        """Receive a batch of events, the scan points of the batch are written to the file together."""
+        for event in events:
+            if isinstance(event, PointReady):
+                self._pending_points.append((event.idx, event.data, event.positions, event.timestamp))
+            else:
+                self.receive_event(event)
+        if self._flush_due():
+            self.flush()
+
+    def receive_event(self, event):
+        LOGGER.debug('Receiving event: %s', type(event).__name__)
+        match event:
+            case ScanStarted():
+                self.add_scan(**event.as_message()[1])
+            case PointReady(idx=idx, data=data, positions=positions, timestamp=timestamp):
+                self.add_scan_point(idx, data, positions, timestamp)
+            case ScanClosed():
                 self.close_scan()
+            case ScanInterrupted():
+                self.interrupt_scan()
+            case ScanResumed():
+                self.resume_scan()
+            case ScanTiming(phases=phases):
+                self.add_scan_timing(phases)
+            case ScanAccumulated(passes=passes, data=data, positions=positions, scans=scans):
+                self.add_accumulated_scan(passes, data, positions, scans)
+
+    def set_compression(self, filter_name: str = None, level: int = None):
+        """
+        Select the compression filter of the spectra datasets of the next scans.
+
+        Parameters
+        ----------
+        filter_name : str, optional
+            'gzip', 'lzf', 'blosc' (requires the hdf5plugin package) or None for no compression.
+        level : int, optional
+            Compression level, 0-9 for gzip (default 4) and blosc (default 5). Not used by lzf.
+
+        """
+        match filter_name:
+            case None:
+                self.compression = {}
+            case 'gzip':
+                self.compression = {'compression': 'gzip', 'compression_opts': 4 if level is None else level,
+                                    'shuffle': True}
+            case 'lzf':
+                self.compression = {'compression': 'lzf', 'shuffle': True}
+            case 'blosc':
+                try:
+                    import hdf5plugin
+                except ImportError as exc:
+                    raise ImportError("Blosc compression requires the hdf5plugin package.") from exc
+                self.compression = dict(hdf5plugin.Blosc(cname='lz4', clevel=5 if level is None else level,
+                                                         shuffle=hdf5plugin.Blosc.SHUFFLE))
+            case _:
+                raise ValueError(f"Unknown compression filter '{filter_name}', "
+                                 "expected 'gzip', 'lzf', 'blosc' or None.")
 
     def create_h5file(self, experiment_id: str = '', add_date=True):
         if self.h5file is not None:
@@ -74,46 +174,187 @@ class DataCollector(DataComponent):
         LOGGER.debug('Adding scan to H5file')
         scan_number = len(list(self.h5file.keys())) + 1
         self.current_scan = self.h5file.create_group(f"/scan{scan_number}")
+        self.last_scan = f"scan{scan_number}"
         self.current_scan.attrs["start_time"] = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
         self.current_scan.attrs["Sample name"] = self.current_sample
+        # progress of the scan in the file, updated when points are written (resuming relies on the
+        # steps kept in memory by the orchestrator, these attributes only record what was stored)
+        self.current_scan.attrs["status"] = "running"
+        self.current_scan.attrs["completed_points"] = 0
+        self.current_scan.attrs["last_completed_idx"] = -1
 
+        # scan_points is the number of points, or the grid shape for mesh scans,
+        # 0 for an open-ended scan (time scan until stopped): datasets then grow along the point axis
+        self._pending_points = []
+        scan_shape = tuple(int(dim) for dim in np.atleast_1d(kwargs['scan_points']))
+        self._growable = scan_shape == (0, )
+        self._datasets = {}
         for alias, device_info in kwargs['all_device_info'].items():
             group = self.current_scan.create_group(alias)
             for name, value in device_info['attrs'].items():
                 group.attrs[name.replace('_', ' ').capitalize()] = value
-            for name, size in device_info['data_sets'].items():
+            datasets = self._datasets[alias] = {}
+            for name, spec in device_info['data_sets'].items():
+                # data set declared as its size, or as (size, dtype)
+                size, dtype = spec if isinstance(spec, tuple) else (spec, 'f4')
                 if size == 1:
-                    group.create_dataset(f'{name}', (kwargs['scan_points'], ))
+                    datasets[name] = group.create_dataset(f'{name}', scan_shape, dtype=dtype,
+                                                          **self._max_shape(scan_shape, self._growable))
                 else:
-                    group.create_dataset(f'{name}', (size, kwargs['scan_points']))
+                    datasets[name] = group.create_dataset(f'{name}', (*scan_shape, size), dtype=dtype,
+                                                          **self._spectra_options(size, scan_shape))
+                    datasets[name].attrs['layout'] = POINT_MAJOR
+        # wall-clock time at the end of the acquisition of each point
+        self._timestamps = self.current_scan.create_dataset('timestamp', scan_shape, dtype='f8', fillvalue=np.nan,
+                                                            **self._max_shape(scan_shape, self._growable))
+
+        # acquisition order of the points, stored as logical indices, when the scan path was reordered
+        if kwargs.get('point_order') is not None:
+            self.current_scan.create_dataset('point_order', data=np.asarray(kwargs['point_order']))
+
+        # each point acquired until its counts reach the preset, the actual time is in the runtime datasets
+        if kwargs.get('count_preset') is not None:
+            self.current_scan.attrs["Preset counts"] = kwargs['count_preset'].target_counts
+            if kwargs['count_preset'].roi is not None:
+                self.current_scan.attrs["Preset ROI"] = kwargs['count_preset'].roi
 
         # h5_scan.attrs["scan type"] = f"Type of the scan #{scan_number}, ie. function call"
 
         self.h5file.flush()
+        self._last_flush = time.monotonic()
+
+    @staticmethod
+    def _max_shape(shape, growable):
+        """Dataset options of growable datasets (1D scans), unlimited along the point axis."""
+        if not growable:
+            return {}
+        return {'maxshape': (None, *shape[1:]), 'chunks': True}
+
+    def _spectra_options(self, size, scan_shape):
+        """Dataset options of spectra datasets: chunks of whole spectra along the (last) scan axis, compression."""
+        nb_points = max(1, min(self.spectra_per_chunk, scan_shape[-1] or self.spectra_per_chunk))
+        chunks = (*(1 for _ in scan_shape[:-1]), nb_points, size)
+        return {**self._max_shape((*scan_shape, size), self._growable), 'chunks': chunks, **self.compression}
+
+    def _grow_datasets(self, nb_points):
+        """Resize all datasets of an open-ended scan along the point axis."""
+        for dataset in (self._timestamps, *(item for datasets in self._datasets.values()
+                                            for item in datasets.values())):
+            if dataset.maxshape[0] is None:
+                dataset.resize(nb_points, axis=0)
 
     def close_scan(self):
+        self.flush()
+        if self._growable:  # trim the unused space reserved at the end of open-ended scans
+            self._grow_datasets(int(self.current_scan.attrs["completed_points"]))
+            self._growable = False
         self.current_scan.attrs["end_time"] = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
+        self.current_scan.attrs["status"] = "completed"
         self.current_scan = None
+        self._datasets = {}
+        self._timestamps = None
+
+        self.h5file.flush()
 
+    def interrupt_scan(self):
+        """Mark the current scan as interrupted, it is kept open to be resumed."""
+        if self.current_scan is None:
+            return
+        self.flush()
+        if self._growable:  # trimmed to the stored points, it grows again if the scan is resumed
+            self._grow_datasets(int(self.current_scan.attrs["completed_points"]))
+        self.current_scan.attrs["status"] = "interrupted"
         self.h5file.flush()
 
-    def add_datapoint_mca(self, alias: str, idx: int, mca: MCA):
-        nb_channels = len(mca.counts)
-        self.current_scan[alias]['MCA'][0:nb_channels,idx] = mca.counts
-        self.current_scan[alias]['runtime'][idx] = mca.metadata.runtime
-        self.current_scan[alias]['ICR'][idx] = mca.metadata.input_cr
-        self.current_scan[alias]['OCR'][idx] = mca.metadata.output_cr
-        self.current_scan[alias]['OCR'][idx] = mca.metadata.output_cr
+    def resume_scan(self):
+        """Continue storing data into the interrupted scan."""
+        if self.current_scan is None:
+            raise UserWarning("No interrupted scan is open in the current file, it can not be resumed.")
+        self.current_scan.attrs["status"] = "running"
+
+    def add_scan_timing(self, phases: dict):
+        """Store the duration of each phase for each point, in execution order, in the scan 'timing' group."""
+        group = self.current_scan.require_group('timing')
+        group.attrs['Unit'] = 's'
+        for phase, durations in phases.items():
+            name = phase.replace('/', '_')
+            if name in group:
+                del group[name]
+            group.create_dataset(name, data=durations)
 
         self.h5file.flush()
 
-    def add_motor_datapoint(self, alias: str, idx: int, position):
-        self.current_scan[alias]['user_position'][idx] = position
+    def add_accumulated_scan(self, passes: int, data: dict, positions: dict, scans: list = None):
+        """Store the accumulation of `passes` scans as a new scan, referencing the `scans` of the individual passes."""
+        scan_number = len(list(self.h5file.keys())) + 1
+        scan = self.h5file.create_group(f"/scan{scan_number}")
+        scan.attrs["start_time"] = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
+        scan.attrs["Sample name"] = self.current_sample
+        scan.attrs["status"] = "accumulated"
+        scan.attrs["Accumulated scans"] = list(scans or [])
+        for alias, data_sets in data.items():
+            group = scan.create_group(alias)
+            for name, values in data_sets.items():
+                dataset = group.create_dataset(name, data=values)
+                if dataset.ndim > 1:  # spectra
+                    dataset.attrs['layout'] = POINT_MAJOR
+        for alias, position in positions.items():
+            scan.create_group(alias).create_dataset('user_position', data=position)
 
         self.h5file.flush()
 
-    def add_scan_point(self, idx, data, positions):
-        for sensor_alias, sensor_data in data.items():
-            self.add_datapoint_mca(sensor_alias, idx, sensor_data)
-        for ctlr_alias, ctlr_position in positions.items():
-            self.add_motor_datapoint(ctlr_alias, idx, ctlr_position)
+    def add_scan_point(self, idx, data, positions, timestamp=np.nan):
+        """Buffer a scan point, buffered points are written to the file according to the flush policy."""
+        self._pending_points.append((idx, data, positions, timestamp))
+        if self._flush_due():
+            self.flush()
+
+    def _flush_due(self):
+        return bool(self._pending_points) and (
+            len(self._pending_points) >= self.flush_points
+            or (self.flush_interval is not None and time.monotonic() - self._last_flush >= self.flush_interval))
+
+    def flush(self):
+        """Write the buffered scan points into the current scan and flush the file."""
+        points, self._pending_points = self._pending_points, []
+        if points:
+            if self._growable:
+                nb_points = self._timestamps.shape[0]
+                last_idx = max(point[0] for point in points)
+                if last_idx >= nb_points:  # reserve space by doubling, instead of resizing at every point
+                    self._grow_datasets(max(2 * nb_points, last_idx + 1, 64))
+            for selection, run in self._consecutive_runs(points):
+                self._write_points(selection, run)
+            self.current_scan.attrs["completed_points"] += len(points)
+            self.current_scan.attrs["last_completed_idx"] = points[-1][0]
+
+        self.h5file.flush()
+        self._last_flush = time.monotonic()
+
+    @staticmethod
+    def _consecutive_runs(points):
+        """Split points into runs of consecutive indices along the (last) point axis, with their selection."""
+        runs = []
+        for point in points:
+            idx = point[0] if isinstance(point[0], tuple) else (point[0], )
+            if runs and runs[-1][0] == idx[:-1] and runs[-1][2] == idx[-1]:
+                runs[-1][2] += 1
+                runs[-1][3].append(point)
+            else:
+                runs.append([idx[:-1], idx[-1], idx[-1] + 1, [point]])
+        return [((*prefix, slice(start, stop)), run) for prefix, start, stop, run in runs]
+
+    def _write_points(self, selection, points):
+        """Write a run of consecutive points as one hyperslab per dataset."""
+        self._timestamps[selection] = np.array([point[3] for point in points], dtype=float)
+        for alias in points[0][1]:
+            spectra = [point[1][alias] for point in points]
+            counts = np.stack([mca.counts for mca in spectra])
+            datasets = self._datasets[alias]
+            datasets['MCA'][(*selection, slice(0, counts.shape[-1]))] = counts
+            datasets['runtime'][selection] = np.array([mca.metadata.runtime for mca in spectra], dtype=float)
+            datasets['ICR'][selection] = np.array([mca.metadata.input_cr for mca in spectra], dtype=float)
+            datasets['OCR'][selection] = np.array([mca.metadata.output_cr for mca in spectra], dtype=float)
+        for alias in points[0][2]:
+            self._datasets[alias]['user_position'][selection] = np.array([point[2][alias] for point in points],
+                                                                         dtype=float)
@@ -1,8 +1,85 @@
-from dataclasses import dataclass
-from typing import Dict, Any
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterator, List
 
 
 @dataclass
 class DeviceInfo:
     alias: str
     metadata: Dict[str, Any]
+
+
+@dataclass
+class DispatchStats:
+    """Delivery counters of a queued DataComponent, latencies in seconds."""
+    depth: int = 0
+    max_depth: int = 0
+    delivered: int = 0
+    total_latency: float = 0.
+    max_latency: float = 0.
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.delivered if self.delivered else 0.
+
+
+@dataclass
+class ScanCheckpoint:
+    """State needed to resume an interrupted scan: numbered steps left to do and devices in use."""
+    steps: Iterator
+    start_time: float
+    aliases: List[str]
+    count_preset: 'CountPreset' = None
+    targets: dict = None  # target of every scan motor at the first step left, {motor: target}
+
+
+@dataclass
+class CountPreset:
+    """Acquire each scan point until the counts (total or within the ROI) reach a target, capped by its acquisition time."""
+    target_counts: int
+    roi: tuple = None  # (first, last) channel slice bounds, the whole spectrum if None
+
+
+@dataclass
+class MotionTimingModel:
+    """Motion time of a scan motor: settling + travel / velocity for each point."""
+    velocity: float = 1.  # user unit per second
+    settling: float = 0.  # seconds per point
+
+
+@dataclass
+class ScanEstimate:
+    """Predicted duration of a scan, in seconds, broken down by phase."""
+    nb_points: int
+    motion: float
+    settling: float
+    acquisition: float
+    io: float
+    targets: Dict[str, Any] = field(default_factory=dict)  # physical target of each motor for all points
+
+    @property
+    def total(self) -> float:
+        return self.motion + self.settling + self.acquisition + self.io
+
+
+@dataclass
+class ScanJob:
+    """Job of the scan queue: sample name, motor moves done before the scan and scan definition."""
+    job_id: int
+    sample: str
+    scan: Dict[str, Any]
+    moves: Dict[str, float] = field(default_factory=dict)
+    status: str = 'queued'  # queued, running, done, failed, aborted or cancelled
+    error: str = ''
+
+
+@dataclass
+class EventStats:
+    """Publishing counters of one event type, times in seconds (including synchronous delivery)."""
+    published: int = 0
+    deliveries: int = 0
+    total_time: float = 0.
+    max_time: float = 0.
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.published if self.published else 0.
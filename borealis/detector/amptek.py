@@ -4,9 +4,10 @@ Created on Tue Mar 23 18:54:19 2021.
 
 @author: A. Vancraeyenest
 """
+import asyncio
 import logging
 from operator import xor, and_
-from time import sleep
+from time import monotonic, sleep
 
 import usb.core
 import usb.util
@@ -56,10 +57,51 @@ class AmptekCdTe123(Detector):
 
     def acquisition(self, acquisition_time: float):
         """Start an acquisition and return corresponding Spectrum object."""
+        self._start_acquisition(acquisition_time)
+        sleep(acquisition_time*1.1)
+        return self._end_acquisition()
+
+    async def async_acquisition(self, acquisition_time: float):
+        """Start an acquisition and return corresponding Spectrum object, without blocking the event loop."""
+        self._start_acquisition(acquisition_time)
+        await asyncio.sleep(acquisition_time*1.1)
+        return self._end_acquisition()
+
+    def count_acquisition(self, target_counts: int, max_time: float, roi: tuple = None,
+                          poll_time: float = 0.1):
+        """
+        Acquire until `target_counts` counts are reached (total, or within the ROI), at most `max_time`.
+
+        Without ROI, the detector count preset (PREC) and time preset (PRET) stop the acquisition by
+        themselves. Counts within a ROI are polled from the running spectrum every `poll_time` seconds.
+        """
+        self._clear_spectrum()
+        if roi is None:
+            self._set_acquisition_time_counts(max_time, int(target_counts), save_to_mem=False)
+        else:
+            self._set_acquisition_time(max_time, save_to_mem=False)
+        channels = slice(*roi) if roi is not None else slice(None)
+        self._enable_mca()
+        start = monotonic()
+        while monotonic() - start < max_time * 1.1:
+            sleep(poll_time)
+            spectrum = self._get_mca_counts(self._get_spectrum_status(), num_chan=2048, contain_status=True)
+            if np.sum(spectrum[channels]) >= target_counts:
+                break
+        return self._end_acquisition()
+
+    def stop(self):
+        """Close the connection to the detector and free resources."""
+        usb.util.dispose_resources(self._device)
+
+    def _start_acquisition(self, acquisition_time: float):
+        """Clear the spectrum, preset the acquisition time and enable the MCA."""
         self._clear_spectrum()
         self._set_acquisition_time(acquisition_time, save_to_mem=False)
         self._enable_mca()
-        sleep(acquisition_time*1.1)
+
+    def _end_acquisition(self):
+        """Disable the MCA and read out spectrum and status into an MCA object."""
         self._disable_mca()
         raw_spe_st = self._get_spectrum_status()
         mca_counts = self._get_mca_counts(raw_spe_st, num_chan=2048, contain_status=True)
@@ -73,10 +115,6 @@ class AmptekCdTe123(Detector):
 
         return mca_obj
 
-    def stop(self):
-        """Close the connection to the detector and free resources."""
-        usb.util.dispose_resources(self._device)
-
     def _write(self, msg):
         """Write a message to the _device."""
         answer = self._device.write(self._endpoint_out.bEndpointAddress,
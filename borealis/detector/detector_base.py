@@ -4,6 +4,7 @@ Created on Fri May 13 14:48:59 2022.
 
 @author: A. Vancraeyenest
 """
+import asyncio
 import logging
 import time
 from abc import ABCMeta, abstractmethod
@@ -37,6 +38,7 @@ class Detector(SensorComponent, metaclass=ABCMeta):
         self.alias = alias if alias != "" else "Undefined"
         self.serial_number = 'Unknown'
         self.mca_size = 4096
+        self.mca_dtype = 'uint32'  # dtype of the stored spectra, counts by default
         super().__init__()
 
     def __str__(self):
@@ -60,6 +62,83 @@ class Detector(SensorComponent, metaclass=ABCMeta):
 
         """
 
+    async def async_acquisition(self, acquisition_time: float) -> mca.MCA:
+        """
+        Coroutine for acquisition.
+
+        Runs the blocking acquisition in a worker thread. Detectors that wait for the end of the
+        acquisition with a sleep should override it and await asyncio.sleep instead.
+
+        Parameters
+        ----------
+        acquisition_time : float
+            Acquisition time in seconds.
+
+        Returns
+        -------
+        mca : mca.MCA
+            MCA object with spectrum counts and metadata.
+
+        """
+        return await asyncio.to_thread(self.acquisition, acquisition_time)
+
+    def count_acquisition(self, target_counts: int, max_time: float, roi: tuple = None,
+                          poll_time: float = 0.1) -> mca.MCA:
+        """
+        Acquire until the spectrum holds `target_counts` counts (total, or within the ROI), at most `max_time`.
+
+        Host-side polling: successive acquisitions are summed until the preset is reached, each one sized from
+        the count rate measured so far (at least `poll_time`). `max_time` bounds the wall-clock time, overheads
+        of the acquisitions (start, stop, readout) included. Detectors with a hardware count preset should
+        override it.
+
+        Parameters
+        ----------
+        target_counts : int
+            Number of counts to reach.
+        max_time : float
+            Maximum acquisition time in seconds, the acquisition stops there even if the preset is not reached.
+        roi : tuple, optional
+            (first, last) channel slice bounds in which the counts are integrated, the whole spectrum if None.
+        poll_time : float, optional
+            Shortest acquisition time between two checks of the counts, in seconds. The default is 0.1.
+
+        Returns
+        -------
+        mca : mca.MCA
+            Summed spectrum, its runtime is the actual acquisition time and the count rates are averaged.
+
+        """
+        if poll_time <= 0:
+            raise ValueError('The polling time must be strictly positive.')
+
+        channels = slice(*roi) if roi is not None else slice(None)
+        counts = None
+        # elapsed: wall-clock time, checked against max_time; acquired: requested acquisition time, for the rate
+        elapsed = acquired = runtime = input_counts = output_counts = 0.
+        start = time.monotonic()
+        while elapsed < max_time:
+            reached = 0. if counts is None else float(np.sum(counts[channels]))
+            if reached >= target_counts:
+                break
+            chunk = poll_time
+            if reached > 0:  # expected time to reach the preset at the count rate measured so far
+                chunk = max(poll_time, (target_counts - reached) * acquired / reached)
+            chunk = min(chunk, max_time - elapsed)
+            spectrum = self.acquisition(chunk)
+            acquired += chunk
+            elapsed = time.monotonic() - start
+            counts = spectrum.counts if counts is None else counts + spectrum.counts
+            metadata = spectrum.metadata
+            runtime += metadata.runtime
+            input_counts += (metadata.input_cr or 0.) * metadata.runtime
+            output_counts += (metadata.output_cr or 0.) * metadata.runtime
+
+        if counts is None:
+            return self.acquisition(0.)
+        return mca.MCA(counts, mca.MCAMetadata(runtime, input_counts / runtime if runtime else 0.,
+                                               output_counts / runtime if runtime else 0., self.get_det_info()))
+
     @abstractmethod
     def stop(self):
         """ABC method for stopping detector. (derived must override)."""
@@ -72,10 +151,10 @@ class Detector(SensorComponent, metaclass=ABCMeta):
 
     def get_device_info(self):
         attrs = self.get_det_info()
-        data_sets = {'MCA': self.mca_size,
-                     'runtime': 1,
-                     'ICR': 1,
-                     'OCR': 1}
+        data_sets = {'MCA': (self.mca_size, self.mca_dtype),
+                     'runtime': (1, 'f8'),
+                     'ICR': (1, 'f8'),
+                     'OCR': (1, 'f8')}
         return DeviceInfo(alias=self.alias, metadata={'attrs': attrs, 'data_sets': data_sets })
 
     def log(self, level, msg, *args, **kwargs):
@@ -96,6 +175,7 @@ class DummyDet(Detector):
 
     def __init__(self, alias: str = "DummyDet"):
         super().__init__(alias=alias)
+        self.mca_dtype = 'f8'  # dummy counts scale with the acquisition time
         LOGGER.info("Detector %s successfully initialised", self)
 
     def acquisition(self, acquisition_time: float) -> mca.MCA:
@@ -104,7 +184,19 @@ class DummyDet(Detector):
 
         time.sleep(float(acquisition_time))
 
-        return mca.MCA(np.arange(2048) * acquisition_time, mca.MCAMetadata.dummy())
+        return self._dummy_mca(acquisition_time)
+
+    async def async_acquisition(self, acquisition_time: float) -> mca.MCA:
+        await asyncio.sleep(float(acquisition_time))
+
+        return self._dummy_mca(acquisition_time)
+
+    @staticmethod
+    def _dummy_mca(acquisition_time: float) -> mca.MCA:
+        """Spectrum growing linearly with the acquisition time, stored as its runtime."""
+        metadata = mca.MCAMetadata.dummy()
+        metadata.runtime = float(acquisition_time)
+        return mca.MCA(np.arange(2048) * acquisition_time, metadata)
 
     def stop(self):
         LOGGER.info('%s controller closed', self.alias)
@@ -0,0 +1,202 @@
+"""
+Detectors hosted in their own worker process.
+
+The driver of the detector (ctypes, pyusb...) and the decoding of its data run in a separate process,
+so that they neither hold the GIL of the orchestrator process nor bring it down when they crash.
+Spectra are written by the worker into a buffer in shared memory, only small commands and metadata go
+through the pipe.
+"""
+import logging
+import multiprocessing
+import pickle
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from borealis.detector.detector_base import Detector
+from borealis.exceptions import DetectorProcessError
+from borealis.mca import MCA, MCAMetadata
+
+LOGGER = logging.getLogger(__name__)
+
+# Extra time given to the worker to answer, on top of the acquisition time
+REPLY_TIMEOUT = 10.
+
+
+class DetectorProcess(Detector):
+    """
+    Proxy to a Detector running in a worker process, keeping the Detector API.
+
+    Spectra are exchanged through a buffer of one spectrum in shared memory, of the `mca_dtype` of the
+    detector: acquisitions run one at a time, each spectrum is written by the worker and copied out by
+    the proxy before the next acquisition. Other methods of the detector can be run in the worker with
+    `call`.
+
+    Examples
+    --------
+    >>> ketek = DetectorProcess(KetekAXASM, 'C:/ketek/KETEK.ini', alias='Ketek')
+    >>> ketek.acquisition(1.)
+
+    """
+
+    def __init__(self, detector_class: type, *args, start_method: str = 'spawn', **kwargs):
+        """
+        Start the worker process and initialise the detector in it.
+
+        Parameters
+        ----------
+        detector_class : type
+            Detector class, instantiated in the worker with `args` and `kwargs` (they must be picklable).
+        start_method : str, optional
+            multiprocessing start method. Default is 'spawn', no driver state is inherited from this process.
+
+        """
+        self._lock = threading.Lock()
+        self._shm = None
+        self._buffer = None
+        context = multiprocessing.get_context(start_method)
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=_worker_main, args=(child_conn, detector_class, args, kwargs),
+                                        name=f'borealis-{detector_class.__name__}', daemon=True)
+        self._process.start()
+        child_conn.close()
+        self._alias = kwargs.get('alias', detector_class.__name__)
+
+        info = self._reply(None)
+        self._det_info = info['det_info']
+        super().__init__(alias=info['det_info']['alias'])
+        self.serial_number = info['det_info']['serial_number']
+        self.mca_size = info['mca_size']
+        self.mca_dtype = info['mca_dtype']
+
+        self._shm = SharedMemory(create=True, size=self.mca_size * np.dtype(self.mca_dtype).itemsize)
+        self._buffer = np.ndarray(self.mca_size, dtype=self.mca_dtype, buffer=self._shm.buf)
+        self._request('attach', self._shm.name, self.mca_size, self.mca_dtype)
+        LOGGER.info("Detector %s started in worker process %d", self, self._process.pid)
+
+    def __str__(self):
+        return f'{self.__class__.__name__}(alias={self.alias}, type={self._det_info["type"]})'
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process.is_alive()
+
+    def acquisition(self, acquisition_time: float) -> MCA:
+        """Run an acquisition in the worker and return the spectrum read from the shared memory buffer."""
+        with self._lock:
+            nb_channels, dtype, metadata = self._request('acquire', float(acquisition_time),
+                                                         timeout=acquisition_time + REPLY_TIMEOUT)
+            # copied out, the buffer is overwritten by the next acquisition
+            counts = self._buffer[:nb_channels].astype(dtype)
+
+        mca_metadata = MCAMetadata.from_dict(metadata)
+        mca_metadata.acq_date = metadata['date']
+        return MCA(counts, mca_metadata)
+
+    def call(self, method: str, *args, **kwargs):
+        """Run a method of the detector in the worker process and return its result."""
+        with self._lock:
+            return self._request('call', method, args, kwargs)
+
+    def stop(self):
+        """Stop the detector, then the worker process, and release the shared memory."""
+        with self._lock:
+            try:
+                if self.is_alive:
+                    self._request('stop')
+                    self._process.join(REPLY_TIMEOUT)
+            finally:
+                if self._process.is_alive():
+                    self._process.terminate()
+                self._conn.close()
+                if self._shm is not None:
+                    self._buffer = None
+                    self._shm.close()
+                    self._shm.unlink()
+                    self._shm = None
+        LOGGER.info('%s worker process stopped', self.alias)
+
+    def get_det_info(self):
+        """Return the info of the detector in the worker, its type is the actual detector class."""
+        return dict(self._det_info)
+
+    def _request(self, *command, timeout: float = REPLY_TIMEOUT):
+        if not self.is_alive:
+            raise DetectorProcessError(self.alias, f'process exited with code {self._process.exitcode}')
+        self._conn.send(command)
+        return self._reply(timeout)
+
+    def _reply(self, timeout):
+        alias = getattr(self, 'alias', self._alias)
+        try:
+            if not self._conn.poll(timeout):
+                raise DetectorProcessError(alias, f'no answer after {timeout:.1f} s')
+            status, value = self._conn.recv()
+        except (EOFError, ConnectionError):
+            self._process.join(1.)
+            raise DetectorProcessError(alias, f'process exited with code {self._process.exitcode}') from None
+        if status == 'error':
+            raise value
+        return value
+
+
+def _worker_main(conn, detector_class, args, kwargs):
+    """Worker process loop: build the detector, then run the commands received from the proxy."""
+    try:
+        detector = detector_class(*args, **kwargs)
+        conn.send(('ok', {'det_info': detector.get_det_info(), 'mca_size': detector.mca_size,
+                          'mca_dtype': detector.mca_dtype}))
+    except Exception as exc:
+        conn.send(('error', _picklable(exc)))
+        return
+
+    shm = None
+    buffer = None
+    while True:
+        try:
+            command, *params = conn.recv()
+        except EOFError:  # proxy gone
+            break
+        try:
+            match command:
+                case 'attach':
+                    name, mca_size, mca_dtype = params
+                    shm = SharedMemory(name=name)
+                    # the proxy owns the shared memory, it must not be unlinked when this process ends
+                    resource_tracker.unregister(shm._name, 'shared_memory')
+                    buffer = np.ndarray(mca_size, dtype=mca_dtype, buffer=shm.buf)
+                    result = None
+                case 'acquire':
+                    acquisition_time, = params
+                    mca = detector.acquisition(acquisition_time)
+                    counts = np.asarray(mca.counts)
+                    buffer[:len(counts)] = counts
+                    result = (len(counts), counts.dtype.str, mca.metadata.as_dict())
+                case 'call':
+                    method, call_args, call_kwargs = params
+                    result = getattr(detector, method)(*call_args, **call_kwargs)
+                case 'stop':
+                    detector.stop()
+                    conn.send(('ok', None))
+                    break
+                case _:
+                    raise ValueError(f'Unknown command {command!r}')
+        except Exception as exc:
+            conn.send(('error', _picklable(exc)))
+        else:
+            conn.send(('ok', result))
+
+    buffer = None
+    if shm is not None:
+        shm.close()
+
+
+def _picklable(exc):
+    """Exceptions are sent back to the proxy, replaced by a RuntimeError when they can not be pickled."""
+    try:
+        pickle.loads(pickle.dumps(exc))
+        return exc
+    except Exception:
+        return RuntimeError(repr(exc))
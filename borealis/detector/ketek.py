@@ -4,6 +4,7 @@ Created on Sat Jan  8 12:54:49 2022.
 
 @author: A. Vancraeyenest
 """
+import asyncio
 import ctypes as ct
 import logging
 from ctypes import byref
@@ -40,6 +41,16 @@ class KetekAXASM(Detector):
         """Start an acquisition and return corresponding Spectrum object."""
         self._start_run()
         sleep(acquisition_time)
+        return self._end_acquisition()
+
+    async def async_acquisition(self, acquisition_time: float):
+        """Start an acquisition and return corresponding Spectrum object, without blocking the event loop."""
+        self._start_run()
+        await asyncio.sleep(acquisition_time)
+        return self._end_acquisition()
+
+    def _end_acquisition(self):
+        """Stop the run and read out spectrum and statistics into an MCA object."""
         self._stop_run()
         mca_counts = self._get_spectrum()
         run_stat = self._get_all_run_stats()
@@ -0,0 +1,97 @@
+import logging
+import queue
+import threading
+import time
+
+from borealis.data_structures import DispatchStats
+from borealis.events import ScanStarted, deliver
+
+LOGGER = logging.getLogger(__name__)
+
+
+class QueuedDelivery:
+    """
+    Deliver events to a single DataComponent from its own worker thread.
+
+    Events are processed in the order they were put, through a bounded queue: `put` blocks
+    when the component is more than `maxsize` batches of events behind. Once the component raised,
+    the delivery is failed: following events are dropped and the error is re-raised in the caller
+    thread on every `put` or `drain`, until the next scan start or `reset`, so that the component
+    never receives the points of a scan it missed the start of.
+
+    """
+
+    def __init__(self, component, maxsize: int = 64):
+        self.component = component
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stats = DispatchStats()
+        self._lock = threading.Lock()
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name=f'borealis-dispatch-{component}', daemon=True)
+        self._thread.start()
+
+    def __str__(self):
+        return f'{self.__class__.__name__}({self.component})'
+
+    @property
+    def stats(self) -> DispatchStats:
+        """Snapshot of the delivery counters."""
+        with self._lock:
+            return DispatchStats(depth=self._queue.qsize(),
+                                 max_depth=self._stats.max_depth,
+                                 delivered=self._stats.delivered,
+                                 total_latency=self._stats.total_latency,
+                                 max_latency=self._stats.max_latency)
+
+    def put(self, events: list):
+        """Queue events for the component, blocks while the queue is full."""
+        if not (events and isinstance(events[0], ScanStarted)):  # a scan start recovers a failed delivery
+            self._raise_if_failed()
+        self._queue.put((events, time.perf_counter()))
+        with self._lock:
+            self._stats.max_depth = max(self._stats.max_depth, self._queue.qsize())
+
+    def drain(self):
+        """Block until all queued events have been processed by the component."""
+        self._queue.join()
+        self._raise_if_failed()
+
+    def reset(self):
+        """Wait until all queued events are processed (or dropped), then deliver again the next ones."""
+        self._queue.join()
+        self.error = None
+
+    def stop(self):
+        """Process the remaining events and stop the worker thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    break
+                events, queued_at = item
+                if self.error is not None:
+                    if not isinstance(events[0], ScanStarted):
+                        continue  # drop events once the component failed, until the next scan
+                    self.error = None
+                try:
+                    deliver(self.component, events)
+                except Exception as exc:
+                    LOGGER.error("%s failed on %s: %r", self.component,
+                                 ', '.join(type(event).__name__ for event in events), exc)
+                    self.error = exc
+                    continue
+                latency = time.perf_counter() - queued_at
+                with self._lock:
+                    self._stats.delivered += len(events)
+                    self._stats.total_latency += latency
+                    self._stats.max_latency = max(self._stats.max_latency, latency)
+            finally:
+                self._queue.task_done()
+
+    def _raise_if_failed(self):
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,258 @@
+"""
+Typed events published by the orchestrator to the data components.
+
+Data components choose the event types they receive with their `subscriptions` attribute (all events by
+default). Components implementing `receive_event` get the event objects, the other ones get the legacy
+`receive(message, **kwargs)` call, with the message string of the event type.
+"""
+import collections
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from typing import Any, ClassVar, Dict, List
+
+import numpy as np
+
+from borealis.data_structures import EventStats
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class Event:
+    """Base event, `message` is the legacy message string of the event type."""
+    message: ClassVar[str] = ''
+
+    def as_message(self):
+        """Legacy (message, kwargs) form of the event."""
+        return self.message, {item.name: getattr(self, item.name) for item in fields(self)}
+
+
+@dataclass
+class ScanStarted(Event):
+    message: ClassVar[str] = 'new_scan'
+    scan_points: Any  # number of points, or grid shape of mesh scans
+    all_device_info: Dict[str, Any]
+    point_order: Any = None
+    count_preset: Any = None  # CountPreset of count-preset scans
+
+
+@dataclass
+class PointReady(Event):
+    message: ClassVar[str] = 'new_scan_point'
+    idx: Any
+    data: Dict[str, Any]
+    positions: Dict[str, float]
+    point_number: int = 0
+    position: float = np.nan
+    acq_time: float = 0.
+    timestamp: float = np.nan  # wall-clock time (s since epoch) at the end of the acquisition
+
+
+@dataclass
+class ScanClosed(Event):
+    message: ClassVar[str] = 'close_scan'
+
+
+@dataclass
+class ScanInterrupted(Event):
+    message: ClassVar[str] = 'interrupt_scan'
+
+
+@dataclass
+class ScanResumed(Event):
+    message: ClassVar[str] = 'resume_scan'
+
+
+@dataclass
+class ScanTiming(Event):
+    message: ClassVar[str] = 'scan_timing'
+    phases: Dict[str, np.ndarray]
+
+
+@dataclass
+class ScanAccumulated(Event):
+    message: ClassVar[str] = 'accumulated_scan'
+    passes: int
+    data: Dict[str, Any]
+    positions: Dict[str, np.ndarray]
+    scans: List[str] = field(default_factory=list)  # names of the stored passes
+
+
+@dataclass
+class DeviceStatus(Event):
+    message: ClassVar[str] = 'device_status'
+    alias: str
+    status: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Message(Event):
+    """Untyped message, for messages without event type."""
+    name: str
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    def as_message(self):
+        return self.name, self.kwargs
+
+
+EVENT_TYPES = {event_type.message: event_type
+               for event_type in (ScanStarted, PointReady, ScanClosed, ScanInterrupted, ScanResumed, ScanTiming,
+                                  ScanAccumulated, DeviceStatus)}
+
+
+def from_message(message: str, **kwargs) -> Event:
+    """Build the typed event of a legacy message, a generic Message if the message has no event type."""
+    try:
+        return EVENT_TYPES[message](**kwargs)
+    except KeyError:
+        return Message(message, kwargs)
+
+
+def deliver(component, events: list):
+    """Deliver events to a component, as a batch, one by one or as legacy messages depending on its API."""
+    receive_events = getattr(component, 'receive_events', None)
+    if receive_events is not None:
+        receive_events(events)
+        return
+    receive_event = getattr(component, 'receive_event', None)
+    for event in events:
+        if receive_event is not None:
+            receive_event(event)
+        else:
+            message, kwargs = event.as_message()
+            component.receive(message, **kwargs)
+
+
+def accepts(component, event_type: type) -> bool:
+    subscriptions = getattr(component, 'subscriptions', None)
+    return subscriptions is None or issubclass(event_type, tuple(subscriptions))
+
+
+class EventBus:
+    """
+    Route events to the components subscribed to their type.
+
+    The routing table of each event type is cached until the subscriber list changes. Within `batch`, events
+    are kept and delivered at the end, each component receiving all its events in one call. The time spent
+    publishing each event type is recorded, see `stats`.
+
+    """
+
+    def __init__(self, subscribers: list, deliver_function=deliver):
+        """
+        EventBus constructor
+
+        Parameters
+        ----------
+        subscribers : list
+            Subscribed components, the list is shared with the owner of the bus and may change.
+        deliver_function : Callable[[Component, list[Event]], None]
+            Function delivering a list of events to one component.
+
+        """
+        self.subscribers = subscribers
+        self._deliver = deliver_function
+        self._routes = {}
+        self._routed_subscribers = ()
+        self._routes_lock = threading.Lock()
+        self._batches = threading.local()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def routes(self, event_type: type) -> list:
+        """Components subscribed to an event type."""
+        # publishing threads (scan, writer, queued deliveries) share the cache
+        with self._routes_lock:
+            current = tuple(self.subscribers)
+            if current != self._routed_subscribers:
+                self._routes = {}
+                self._routed_subscribers = current
+            try:
+                return self._routes[event_type]
+            except KeyError:
+                routes = self._routes[event_type] = [component for component in current
+                                                     if accepts(component, event_type)]
+                return routes
+
+    def publish(self, event: Event):
+        """Deliver an event to its subscribers, or keep it for the end of the current batch."""
+        batch = getattr(self._batches, 'events', None)
+        if batch is not None:
+            batch.append(event)
+            return
+
+        start = time.perf_counter()
+        routes = self.routes(type(event))
+        error = None
+        for component in routes:
+            # a failing subscriber must not hide the event from the next ones
+            try:
+                self._deliver(component, [event])
+            except Exception as exc:
+                error = error or exc
+        self._record(type(event), 1, len(routes), time.perf_counter() - start)
+        if error is not None:
+            raise error
+
+    @contextmanager
+    def batch(self):
+        """
+        Group the events published by this thread, they are delivered when leaving the context.
+
+        Examples
+        --------
+        >>> with bus.batch():
+        ...     for frame in frames:
+        ...         bus.publish(PointReady(...))
+
+        """
+        if getattr(self._batches, 'events', None) is not None:  # nested batch
+            yield
+            return
+        self._batches.events = []
+        try:
+            yield
+        finally:
+            events, self._batches.events = self._batches.events, None
+            self.publish_batch(events)
+
+    def publish_batch(self, events: list):
+        """Deliver a list of events, each subscriber receiving its events in a single call, in order."""
+        if not events:
+            return
+        start = time.perf_counter()
+        deliveries = collections.Counter()
+        error = None
+        for component in tuple(self.subscribers):
+            selected = [event for event in events if accepts(component, type(event))]
+            if selected:
+                try:
+                    self._deliver(component, selected)
+                except Exception as exc:
+                    error = error or exc
+                deliveries.update(type(event) for event in selected)
+        elapsed = time.perf_counter() - start
+        for event_type, count in collections.Counter(type(event) for event in events).items():
+            self._record(event_type, count, deliveries[event_type], elapsed * count / len(events))
+        if error is not None:
+            raise error
+
+    def stats(self) -> dict:
+        """Publishing counters keyed by event type name."""
+        with self._stats_lock:
+            return {event_type.__name__: EventStats(**vars(stats)) for event_type, stats in self._stats.items()}
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = {}
+
+    def _record(self, event_type, published, deliveries, elapsed):
+        with self._stats_lock:
+            stats = self._stats.setdefault(event_type, EventStats())
+            stats.published += published
+            stats.deliveries += deliveries
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed / published)
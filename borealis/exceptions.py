@@ -13,6 +13,18 @@ class SoftLimitError(BorealisException):
         super().__init__(message)
 
 
+class ScanPreflightError(SoftLimitError):
+    """Scan rejected before moving, some points give physical motor targets outside the soft limits."""
+
+    def __init__(self, alias: str, violations: dict):
+        # violations: first offending point of each physical motor, {alias: (index, scan point, dial, low, high)}
+        self.violations = violations
+        lines = [f'  {motor.upper()}: point #{idx} ({point:.4f}) gives dial {dial:.2f}, outside [{low:.2f}:{high:.2f}]'
+                 for motor, (idx, point, dial, low, high) in violations.items()]
+        message = f'Scan of {alias.upper()} rejected, soft limits exceeded:\n' + '\n'.join(lines)
+        BorealisException.__init__(self, message)
+
+
 class NotReadyError(BorealisException):
 
     def __init__(self, alias: str):
@@ -24,4 +36,33 @@ class LimitSwitchError(BorealisException):
 
     def __init__(self, alias: str):
         message = (f'The limit switch for device {alias.upper()} is activated.')
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+
+
+class AcquisitionError(BorealisException):
+
+    def __init__(self, errors: dict):
+        self.errors = errors
+        details = ', '.join(f'{alias.upper()} ({exc!r})' for alias, exc in errors.items())
+        message = (f'Acquisition failed for sensor(s): {details}.')
+        super().__init__(message)
+
+
+class DetectorProcessError(BorealisException):
+
+    def __init__(self, alias: str, reason: str):
+        message = (f'The worker process of detector {alias.upper()} failed: {reason}.')
+        super().__init__(message)
+
+
+class ScanAbortedError(BorealisException):
+
+    def __init__(self):
+        super().__init__('Scan aborted on request.')
+
+
+class ServerError(BorealisException):
+
+    def __init__(self, error: str):
+        self.error = error
+        super().__init__(f'Scan server error: {error}')
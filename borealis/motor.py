@@ -5,6 +5,7 @@ Created on Mon Mar  6 10:50:29 2023.
 @author: René Bes
 """
 import logging
+import threading
 from math import inf
 
 import numpy as np
@@ -59,7 +60,7 @@ class Motor(ControllerComponent):
 
     def get_device_info(self):
         attrs = {'Alias': self.alias, }
-        datasets = {'user_position': 1, }
+        datasets = {'user_position': (1, 'f8'), }
         return DeviceInfo(alias=self.alias, metadata={'attrs': attrs, 'data_sets': datasets})
 
     def where(self):
@@ -74,6 +75,37 @@ class Motor(ControllerComponent):
         print(f'{self.alias:20} at : {self.user_position:6.2f} (user)')
 
 
+    def physical_targets(self, target_user: float) -> dict:
+        """Return the target of each physical motor, i.e. this motor, for a target position (user)."""
+        return {self.alias: target_user}
+
+    def physical_targets_array(self, targets_user: np.ndarray) -> dict:
+        """Vectorised physical_targets, for a whole array of target positions (user)."""
+        return {self.alias: np.asarray(targets_user, dtype=float)}
+
+    def soft_limit_violations(self, targets_user: np.ndarray) -> dict:
+        """
+        Check a whole array of target positions (user) against the soft limits (inclusive) at once.
+
+        Parameters
+        ----------
+        targets_user : np.ndarray
+            Target positions in user unit, NaN targets are invalid.
+
+        Returns
+        -------
+        dict
+            {alias: (index, dial, limit_low, limit_high)} of the first target outside the limits,
+            empty if all targets are valid.
+
+        """
+        targets_dial = (np.asarray(targets_user, dtype=float) - self.offset) / self._direction_coeff
+        outside = ~((self._limit_low <= targets_dial) & (targets_dial <= self._limit_high))
+        if not outside.any():
+            return {}
+        idx = int(np.argmax(outside))
+        return {self.alias: (idx, float(targets_dial[idx]), self._limit_low, self._limit_high)}
+
     def _check_is_ready(self):
         # TODO: change to MotorNotReady error once available
         if self.is_ready is False:
@@ -123,6 +155,28 @@ class Motor(ControllerComponent):
         self._controller.wait_motion_end(self.motor_id, dial)
         self.log(logging.DEBUG, "moved to %.2f.", self.user_position)
 
+    async def async_amove(self, user_position: float):
+        """
+        Coroutine moving the motor to a new position (user) in absolute scale.
+
+        Parameters
+        ----------
+        user_position : float
+            New position (user) to move the motor to.
+
+        Returns
+        -------
+        None.
+
+        """
+        self._check_is_ready()
+        self.check_soft_limits(user_position)
+
+        dial = (user_position - self.offset) / self._direction_coeff
+        await self._controller.async_move_axis(self.motor_id, dial)
+        await self._controller.async_wait_motion_end(self.motor_id, dial)
+        self.log(logging.DEBUG, "moved to %.2f.", self.user_position)
+
     def rmove(self, rel_position: float):
         """
         Move the motor by a relative position.
@@ -145,7 +199,7 @@ class Motor(ControllerComponent):
         self._controller.wait_motion_end(self.motor_id, dial)
         self.log(logging.DEBUG, "moved to %.2f.", self.user_position)
 
-    def scan(self, start: float, stop: float, step: float, acq_time: float = 0.):
+    def scan(self, start: float, stop: float, step: float, acq_time: float = 0., dry_run: bool = False):
         """
         Perform a scan, if acq_time > 0 will also do an acquisition on all sensors.
 
@@ -159,14 +213,83 @@ class Motor(ControllerComponent):
             Spacing between values. For any output `out`, this is the distance
             between two adjacent values, ``out[i+1] - out[i]``.
         acq_time : float
+        dry_run : bool
+            If True, only validate the scan and return its estimated duration (ScanEstimate).
 
         """
-        self._check_is_ready()
-
         scan_points = np.arange(start, stop, step, dtype=np.float32)
         acq_times = np.full_like(scan_points, acq_time)
+        if dry_run:
+            return self.send(message='DryRun', scan_points=scan_points, acq_times=acq_times)
+
+        self._check_is_ready()
         self.send(message='Scan', scan_points=scan_points, acq_times=acq_times)
 
+    def check_velocity_control(self):
+        """Raise NotImplementedError if the controller can not set the axis velocity, as needed by fly scans."""
+        self._controller.get_axis_velocity(self.motor_id)
+
+    def fly_move(self, user_position: float, duration: float, started: threading.Event = None):
+        """
+        Move the motor continuously to a new position (user), at constant velocity over `duration`.
+
+        The axis velocity is restored to its previous value once the motion ends.
+
+        Parameters
+        ----------
+        user_position : float
+            New position (user) to move the motor to.
+        duration : float
+            Duration of the motion in seconds.
+        started : threading.Event, optional
+            Set once the motion is started, e.g. to start acquiring with it.
+
+        Returns
+        -------
+        None.
+
+        """
+        self._check_is_ready()
+        self.check_soft_limits(user_position)
+
+        dial = (user_position - self.offset) / self._direction_coeff
+        velocity = abs(dial - self.dial_position) / duration
+        previous_velocity = self._controller.get_axis_velocity(self.motor_id)
+        self._controller.set_axis_velocity(self.motor_id, velocity)
+        self.log(logging.DEBUG, "flying to %.4f at %.4f (dial)/s.", user_position, velocity)
+        try:
+            self._controller.move_axis(self.motor_id, dial)
+            if started is not None:
+                started.set()
+            self._controller.wait_motion_end(self.motor_id, dial, timeout=duration + 60)
+        finally:
+            self._controller.set_axis_velocity(self.motor_id, previous_velocity)
+
+    def fly_scan(self, start: float, stop: float, step: float, acq_time: float):
+        """
+        Perform a continuous scan, the motor moves without stopping while sensors acquire back-to-back.
+
+        Each point is a time bin of `acq_time` covering `step`, tagged with the position read
+        from the controller at the middle of the bin.
+
+        Parameters
+        ----------
+        start : float
+            Start of interval. The interval includes this value.
+        stop : float
+            End of interval.
+        step : float
+            Width of one bin, sets the motor velocity to ``step / acq_time``.
+        acq_time : float
+            Acquisition time of one bin, must be positive.
+
+        """
+        self._check_is_ready()
+
+        nb_bins = int(round((stop - start) / step))
+        acq_times = np.full(nb_bins, acq_time, dtype=np.float32)
+        self.send(message='FlyScan', start=start, stop=start + nb_bins * step, acq_times=acq_times)
+
     def set_current_as_zero(self):
         """Set motor current position as 0."""
         current_position = self.dial_position
@@ -1,12 +1,188 @@
+import asyncio
+import collections
+import contextlib
+import itertools
 import logging
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
-from borealis.data_structures import DeviceInfo
+from borealis.data_structures import CountPreset, DeviceInfo, MotionTimingModel, ScanCheckpoint, ScanEstimate
+from borealis import timing
+from borealis.dispatch import QueuedDelivery
+from borealis.events import (DeviceStatus, EventBus, PointReady, ScanAccumulated, ScanClosed, ScanInterrupted,
+                             ScanResumed, ScanStarted, ScanTiming, deliver, from_message)
+from borealis.trajectory import mesh_points, optimise_order, refine_points, travel_time
+from borealis.exceptions import AcquisitionError, NotReadyError, ScanAbortedError, ScanPreflightError
 
 LOGGER = logging.getLogger(__name__)
 
+class ScanPointWriter(threading.Thread):
+    """
+    Background stage of a pipelined scan, publishing scan points while the scan thread moves on.
+
+    Points are handed over through a bounded queue: when the writer falls behind by more than
+    `maxsize` points, `put` blocks the scan thread until there is room again (backpressure).
+    The first error raised by the handler is re-raised in the scan thread on the next `put`
+    or on `close`.
+
+    With `batch`, a context manager factory such as `EventBus.batch`, the points queued while the
+    writer was busy are handled together within one `batch` context.
+
+    """
+
+    def __init__(self, handler, maxsize: int = 8, batch=None):
+        super().__init__(name='borealis-writer', daemon=True)
+        self._handler = handler
+        self._batch = batch
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.error = None
+
+    def run(self):
+        closed = False
+        while not closed:
+            items = [self._queue.get()]
+            if self._batch is not None:
+                while items[-1] is not None and not self._queue.empty():
+                    items.append(self._queue.get_nowait())
+            if items[-1] is None:
+                closed = True
+                items.pop()
+            if self.error is not None or not items:
+                continue  # drain without processing once something went wrong
+            try:
+                with self._batch() if self._batch is not None else contextlib.nullcontext():
+                    for item in items:
+                        self._handler(*item)
+            except Exception as exc:
+                LOGGER.error("Scan point writer failed: %r", exc)
+                self.error = exc
+
+    def put(self, *args):
+        """Queue a scan point for publishing, blocks while the queue is full."""
+        self._raise_if_failed()
+        self._queue.put(args)
+
+    def close(self, raise_error: bool = True):
+        """Wait for all queued points to be published and stop the writer."""
+        self._queue.put(None)
+        self.join()
+        if raise_error:
+            self._raise_if_failed()
+
+    def _raise_if_failed(self):
+        if self.error is not None:
+            raise self.error
+
+
+class IntensityRecorder:
+    """Temporary data manager keeping the (ROI) integrated counts of one sensor for each scan point."""
+    subscriptions = (PointReady, )
+
+    def __init__(self, sensor_alias: str, roi: tuple = None):
+        self.sensor_alias = sensor_alias
+        self.roi = slice(*roi) if roi is not None else slice(None)
+        self.intensities = {}
+
+    def __str__(self):
+        return f'{self.__class__.__name__}({self.sensor_alias})'
+
+    def receive(self, message, **kwargs):
+        if message == 'new_scan_point':
+            counts = kwargs['data'][self.sensor_alias].counts
+            self.intensities[kwargs['idx']] = float(np.sum(counts[self.roi]))
+
+
+class ScanAccumulator:
+    """
+    Temporary data manager accumulating repeated passes of the same scan in memory.
+
+    For each sensor and scan point, it keeps the running sums of the spectra, runtimes and count rates,
+    and the running mean and variance (Welford) over the passes of the (ROI) integrated counts.
+
+    """
+    subscriptions = (ScanStarted, PointReady, ScanClosed)
+
+    def __init__(self, roi: tuple = None):
+        self.roi = slice(*roi) if roi is not None else slice(None)
+        self.passes = 0
+        self.counts = {}
+        self.runtime = {}
+        self.input_cr = {}
+        self.output_cr = {}
+        self.positions = {}
+        self.roi_mean = {}
+        self._roi_m2 = {}
+        self._pass_roi = {}
+        self._nb_points = 0
+        # names of the stored passes, filled by repeat_scan
+        self.scans = []
+
+    def __str__(self):
+        return f'{self.__class__.__name__}'
+
+    def receive(self, message, **kwargs):
+        match message:
+            case 'new_scan':
+                self._nb_points = int(np.prod(kwargs['scan_points']))
+                self._pass_roi = {}
+            case 'new_scan_point':
+                self.add_point(kwargs['idx'], kwargs['data'], kwargs['positions'])
+            case 'close_scan':
+                self.end_pass()
+
+    def add_point(self, idx, data, positions):
+        for alias, mca in data.items():
+            counts = np.asarray(mca.counts)
+            if alias not in self.counts:
+                self.counts[alias] = np.zeros((self._nb_points, len(counts)))
+                for sums in (self.runtime, self.input_cr, self.output_cr, self.roi_mean, self._roi_m2):
+                    sums[alias] = np.zeros(self._nb_points)
+            self.counts[alias][idx] += counts
+            self.runtime[alias][idx] += mca.metadata.runtime
+            self.input_cr[alias][idx] += np.nan if mca.metadata.input_cr is None else mca.metadata.input_cr
+            self.output_cr[alias][idx] += np.nan if mca.metadata.output_cr is None else mca.metadata.output_cr
+            self._pass_roi.setdefault(alias, np.full(self._nb_points, np.nan))[idx] = counts[self.roi].sum()
+        for alias, position in positions.items():
+            self.positions.setdefault(alias, np.zeros(self._nb_points))[idx] += position
+
+    def end_pass(self):
+        """Update the running mean and variance of the integrated counts with the pass that just ended."""
+        self.passes += 1
+        for alias, roi_counts in self._pass_roi.items():
+            delta = roi_counts - self.roi_mean[alias]
+            self.roi_mean[alias] += delta / self.passes
+            self._roi_m2[alias] += delta * (roi_counts - self.roi_mean[alias])
+
+    def roi_variance(self, alias):
+        """Sample variance over the passes of the integrated counts of each point."""
+        if self.passes < 2:
+            return np.full(self._nb_points, np.nan)
+        return self._roi_m2[alias] / (self.passes - 1)
+
+    def relative_error(self):
+        """Largest relative standard error of the mean integrated counts, over all sensors and points."""
+        if self.passes < 2 or not self.roi_mean:
+            return np.inf
+        errors = [np.sqrt(self.roi_variance(alias) / self.passes) / np.abs(self.roi_mean[alias])
+                  for alias in self.roi_mean]
+        return float(np.nanmax(errors))
+
+    def result(self):
+        """Accumulated data, laid out as in a scan: spectra as (points, channels), summed over the passes."""
+        data = {alias: {'MCA': self.counts[alias],
+                        'runtime': self.runtime[alias],
+                        'ICR': self.input_cr[alias] / self.passes,
+                        'OCR': self.output_cr[alias] / self.passes,
+                        'ROI counts': self.roi_mean[alias],
+                        'ROI variance': self.roi_variance(alias)}
+                for alias in self.counts}
+        positions = {alias: position / self.passes for alias, position in self.positions.items()}
+        return {'passes': self.passes, 'data': data, 'positions': positions, 'scans': list(self.scans)}
+
 
 class Orchestrator():
     """Session orchestrator, keeps track of components and manages communication between them."""
@@ -15,12 +191,49 @@ class Orchestrator():
         self.sensors = []
         self.controllers = []
         self.data_managers = []
+        # Events are only delivered to the data managers subscribed to their type
+        self.bus = EventBus(self.data_managers, deliver_function=self._deliver)
+        # Trigger all sensors at the same time on a thread pool instead of one after the other
+        self.concurrent_acquisition = False
+        # Publish scan points (data managers and console) in a background thread while the motor moves on
+        self.pipelined_scan = False
+        self.pipeline_depth = 8
+        # Deliver messages to each data manager from its own worker thread and bounded queue
+        self.async_dispatch = False
+        self.dispatch_queue_size = 64
+        self._deliveries = {}
+        # Reorder scan points to minimise motion time, velocities in user unit/s keyed by physical motor alias
+        self.optimise_path = False
+        self.axis_velocities = {}
+        # Remaining steps of the last interrupted scan
+        self._checkpoint = None
+        # Set from any thread to stop the running step scan before its next point, or the next scan started
+        self._abort_requested = threading.Event()
+        self._scan_running = threading.Event()
+        # Controller positions read at the last scan point, {alias: user position}
+        self.last_positions = {}
+        # Timing models used by dry_run, calibrated at the end of each scan
+        self.motion_models = {}
+        self.acquisition_overhead = 0.  # seconds per point, on top of the acquisition time
+        self.io_time = 0.  # seconds per point, to publish the point to the data managers
+        self._motion_timings = []
+        self._acquisition_overheads = []
+        self._io_timings = []
+        self._timer = timing.PhaseTimer()
 
     def add_data_component(self, component):
         """Adds a component to the mediator."""
         LOGGER.debug('Adding data manager %s', component)
         self.data_managers.append(component)
 
+    def remove_data_component(self, component):
+        """Removes a data component from the mediator, after it has processed its pending messages."""
+        LOGGER.debug('Removing data manager %s', component)
+        self.data_managers.remove(component)
+        delivery = self._deliveries.pop(id(component), None)
+        if delivery is not None:
+            delivery.stop()
+
     def add_controller_component(self, component):
         """Adds a component to the mediator."""
         LOGGER.debug('Adding controller component %s', component)
@@ -74,67 +287,894 @@ class Orchestrator():
                     raise AttributeError(f'No scan point or acquisition times is specified')
 
                 self.scan(sender, scan_points, acq_times)
+            case 'FlyScan':
+                try:
+                    start = kwargs['start']
+                    stop = kwargs['stop']
+                    acq_times = kwargs['acq_times']
+                except KeyError:
+                    raise AttributeError(f'No start, stop or acquisition times is specified')
+
+                self.fly_scan(sender, start, stop, acq_times)
+            case 'DryRun':
+                try:
+                    scan_points = kwargs['scan_points']
+                    acq_times = kwargs['acq_times']
+                except KeyError:
+                    raise AttributeError(f'No scan point or acquisition times is specified')
+
+                return self.dry_run(sender, scan_points, acq_times)
 
-    def scan(self, sender, scan_points, acq_times):
+    def scan(self, sender, scan_points, acq_times, target_counts=None, roi=None):
+        """
+        Step scan of a motor, acquiring all sensors at each point.
+
+        Parameters
+        ----------
+        sender : Union[Motor, PseudoMotor]
+            Motor or pseudo-motor to scan.
+        scan_points : Iterable[float]
+        acq_times : Iterable[float]
+            Acquisition time of each point, in seconds. Maximum acquisition time with a count preset.
+        target_counts : int, optional
+            Count preset: each point is acquired until the counts of every sensor reach this target (hardware
+            preset when the detector has one, host-side polling otherwise). The actual acquisition time is
+            stored in the runtime of each point.
+        roi : tuple, optional
+            (first, last) channel bounds in which the counts of the preset are integrated, whole spectrum if None.
+
+        """
         scan_motor = sender
 
         if len(scan_points) != len(acq_times):
             raise ValueError("Length of scan points and acquisition times does not match")
+        count_preset = None
+        if target_counts is not None:
+            count_preset = CountPreset(int(target_counts), roi)
+            for sensor in self.sensors:
+                if not hasattr(sensor, 'count_acquisition'):
+                    raise ValueError(f"Sensor {sensor.alias} does not support count-preset acquisitions.")
+        self.preflight(scan_motor, scan_points)
 
-        # first create new scan in data collector
-        all_device_info = {
-            info.alias: info.metadata
-            for info in (device.get_device_info() for device in (self.sensors + self.controllers))
-        }
-        scan_info = {'scan_points': len(scan_points), 'all_device_info': all_device_info}
-        self.notify_data_managers('new_scan', scan_info)
-
-        # Prepare console logging TODO: move to a dedicated DataComponent
-        start_time = time.time()
-        LOGGER.info("Scan starts...\n")
-        idx_col_width = 5
-        pos_col_width = 8
-        time_col_width = 7
-        count_col_width = 10
-        LOGGER.info(f"| {'#':>{idx_col_width}} | {'pos':>{pos_col_width}} | {'time':>{time_col_width}} "
-                    f"| {'count tot.':>{count_col_width}} |")
-        LOGGER.info(
-            f"| {'-' * idx_col_width} | {'-' * pos_col_width} | {'-' * time_col_width} | {'-' * count_col_width} |")
+        point_order = None
+        if self.optimise_path and len(scan_points) > 2:
+            point_order = self.optimised_point_order(scan_motor, scan_points)
+
+        order = range(len(scan_points)) if point_order is None else point_order
+        steps = ((idx, [(scan_motor, scan_points[idx])], scan_points[idx], acq_times[idx]) for idx in order)
+        self._run_scan(steps, len(scan_points), point_order=point_order, count_preset=count_preset)
+        self._calibrate_timing(scan_motor.alias)
+
+    def preflight(self, scan_motor, scan_points):
+        """
+        Check all scan points against the soft limits of every physical motor at once, before anything moves.
+
+        The conversion laws of pseudo-motors are evaluated on the whole array of scan points (point by point
+        for laws that do not support arrays).
+
+        Parameters
+        ----------
+        scan_motor : Union[Motor, PseudoMotor]
+            Motor or pseudo-motor to scan.
+        scan_points : Iterable[float]
+
+        Raises
+        ------
+        ScanPreflightError
+            If a physical target is outside its motor soft limits, reporting the first offending point
+            of each physical motor.
+
+        """
+        scan_points = np.asarray(scan_points, dtype=float)
+        violations = scan_motor.soft_limit_violations(scan_points)
+        if violations:
+            error = ScanPreflightError(scan_motor.alias, {alias: (idx, float(scan_points[idx]), dial, low, high)
+                                                          for alias, (idx, dial, low, high) in violations.items()})
+            LOGGER.error(str(error))
+            raise error
+
+    def dry_run(self, sender, scan_points, acq_times):
+        """
+        Validate a scan and predict its duration, without moving anything.
+
+        The physical target of every motor is computed and checked against its soft limits for all
+        points. The duration is predicted from the timing models calibrated on the previous scans.
+
+        Parameters
+        ----------
+        sender : Union[Motor, PseudoMotor]
+            Motor or pseudo-motor to scan.
+        scan_points : Iterable[float]
+        acq_times : Iterable[float]
+
+        Returns
+        -------
+        ScanEstimate
+            Predicted duration broken down into motion, settling, acquisition and I/O,
+            with the physical targets of each motor.
+
+        Raises
+        ------
+        ScanPreflightError
+            If a physical target is outside its motor soft limits.
+
+        """
+        scan_motor = sender
+
+        if len(scan_points) != len(acq_times):
+            raise ValueError("Length of scan points and acquisition times does not match")
+
+        self.preflight(scan_motor, scan_points)
+        targets = scan_motor.physical_targets_array(np.asarray(scan_points, dtype=float))
+
+        nb_points = len(scan_points)
+        model = self.motion_models.get(scan_motor.alias, MotionTimingModel())
+        path = np.concatenate([[scan_motor.user_position], np.asarray(scan_points, dtype=float)])
+        acquisition = float(np.sum(acq_times))
+        if self.sensors:
+            acquisition += self.acquisition_overhead * nb_points
+        estimate = ScanEstimate(nb_points=nb_points,
+                                motion=float(np.sum(np.abs(np.diff(path)))) / model.velocity,
+                                settling=model.settling * nb_points,
+                                acquisition=acquisition,
+                                io=0. if self.pipelined_scan else self.io_time * nb_points,
+                                targets=targets)
+
+        LOGGER.info("Dry run: %d points, estimated duration %.1f s (motion %.1f s, settling %.1f s, "
+                    "acquisition %.1f s, I/O %.1f s).", nb_points, estimate.total, estimate.motion,
+                    estimate.settling, estimate.acquisition, estimate.io)
+        return estimate
+
+    def _calibrate_timing(self, scan_motor_alias):
+        """Update the timing models with the durations measured during the last scan."""
+        if len(self._motion_timings) >= 3:
+            travel, seconds = np.array(self._motion_timings).T
+            # steps of np.linspace differ by rounding errors, too little for a line fit
+            if np.ptp(travel) > 1e-9 * np.max(travel):
+                slope, intercept = np.polyfit(travel, seconds, 1)
+            elif np.mean(travel) > 0:  # constant step, settling can not be told apart from travel
+                slope, intercept = np.mean(seconds) / np.mean(travel), 0.
+            else:
+                slope, intercept = 0., np.mean(seconds)
+            velocity = 1. / slope if slope > 0 else np.inf
+            self.motion_models[scan_motor_alias] = MotionTimingModel(velocity=velocity, settling=max(intercept, 0.))
+        if self._acquisition_overheads:
+            self.acquisition_overhead = max(float(np.mean(self._acquisition_overheads)), 0.)
+        if self._io_timings:
+            self.io_time = float(np.mean(self._io_timings))
+        LOGGER.debug("Timing models calibrated: %s, acquisition overhead %.3f s, I/O %.3f s",
+                     self.motion_models.get(scan_motor_alias), self.acquisition_overhead, self.io_time)
+
+    def adaptive_scan(self, sender, start, stop, coarse_step, acq_time, roi=None, sensor_alias=None,
+                      tolerance=0.05, min_step=0., max_points=500, max_passes=5):
+        """
+        Scan densifying the sampling where the measured intensity changes fastest, e.g. around an absorption edge.
+
+        A coarse scan is done first, then each refinement pass measures the middle of every interval over which
+        the intensity changes by more than `tolerance` (relative to the full intensity range). It stops when no
+        interval exceeds the tolerance, or when `max_points` or `max_passes` is reached.
+        Each pass is stored as its own scan.
+
+        Parameters
+        ----------
+        sender : Union[Motor, PseudoMotor]
+            Motor or pseudo-motor to scan.
+        start : float
+        stop : float
+        coarse_step : float
+            Step of the first, uniform, pass.
+        acq_time : float
+            Acquisition time of each point.
+        roi : tuple, optional
+            (first, last) channels integrated to compute the intensity, all channels by default.
+        sensor_alias : str, optional
+            Sensor used to compute the intensity, the first registered sensor by default.
+        tolerance : float, optional
+            Accepted relative intensity change between two neighbouring points. Default is 0.05.
+        min_step : float, optional
+            Smallest allowed distance between two points. Default is 0.
+        max_points : int, optional
+            Maximum total number of points. Default is 500.
+        max_passes : int, optional
+            Maximum number of refinement passes. Default is 5.
+
+        Returns
+        -------
+        positions : np.ndarray
+            All measured positions, sorted.
+        intensities : np.ndarray
+            Intensity measured at each position.
+
+        """
+        if not self.sensors:
+            raise ValueError("Adaptive scan needs at least one sensor")
+
+        recorder = IntensityRecorder(sensor_alias or self.sensors[0].alias, roi)
+        measured = {}
+        points = np.arange(start, stop, coarse_step)
+        self.add_data_component(recorder)
+        try:
+            for pass_number in range(max_passes + 1):
+                LOGGER.info("Adaptive scan pass %d: %d points.", pass_number, len(points))
+                recorder.intensities = {}
+                self.scan(sender, points, np.full(len(points), acq_time))
+                measured.update({float(points[idx]): value for idx, value in recorder.intensities.items()})
+
+                positions = np.array(sorted(measured))
+                intensities = np.array([measured[position] for position in positions])
+                points = refine_points(positions, intensities, tolerance, min_step)[:max(max_points - len(measured), 0)]
+                if len(points) == 0:
+                    break
+                points = np.sort(points)
+        finally:
+            self.remove_data_component(recorder)
+
+        return positions, intensities
+
+    def repeat_scan(self, sender, scan_points, acq_times, passes, roi=None, target_error=None, min_passes=2):
+        """
+        Repeat the same scan several times, accumulating the passes in memory.
+
+        Each pass is stored as its own scan. Once all passes are done, or as soon as the statistical target is
+        reached, the accumulated result (summed spectra and runtimes, average count rates, mean and variance of
+        the integrated counts of each point) is sent to the data managers with an 'accumulated_scan' message,
+        along with the names of the stored passes.
+
+        Parameters
+        ----------
+        sender : Union[Motor, PseudoMotor]
+            Motor or pseudo-motor to scan.
+        scan_points : Iterable[float]
+        acq_times : Iterable[float]
+        passes : int
+            Maximum number of passes.
+        roi : tuple, optional
+            (first, last) channels integrated for the statistics, all channels by default.
+        target_error : float, optional
+            Stop early when the relative standard error of the mean integrated counts is below this value
+            for all points and sensors.
+        min_passes : int, optional
+            Minimum number of passes before stopping early. Default is 2.
+
+        Returns
+        -------
+        ScanAccumulator
+            Accumulated data of all passes.
+
+        """
+        accumulator = ScanAccumulator(roi)
+        self.add_data_component(accumulator)
+        try:
+            for pass_number in range(1, passes + 1):
+                LOGGER.info("Repeat scan pass %d/%d.", pass_number, passes)
+                self.scan(sender, scan_points, acq_times)
+                scan_name = self.stored_scan_name()
+                if scan_name is not None:
+                    accumulator.scans.append(scan_name)
+                if target_error is not None and pass_number >= max(min_passes, 2):
+                    error = accumulator.relative_error()
+                    if error <= target_error:
+                        LOGGER.info("Statistical target reached after %d passes (relative error %.3g).",
+                                    pass_number, error)
+                        break
+        finally:
+            self.remove_data_component(accumulator)
+
+        self.publish(ScanAccumulated(**accumulator.result()))
+        return accumulator
+
+    def stored_scan_name(self):
+        """Name of the last scan stored by the data managers keeping scans in a file, None if there is none."""
+        for component in self.data_managers:
+            scan_name = getattr(component, 'last_scan', None)
+            if scan_name is not None:
+                return scan_name
+        return None
+
+    def optimised_point_order(self, scan_motor, scan_points):
+        """
+        Order in which to visit the scan points to minimise the motion time.
+
+        The physical target of every motor is computed for each point, and each motor is assumed
+        to move at the velocity given in axis_velocities (1 unit/s if missing).
+
+        Parameters
+        ----------
+        scan_motor : Union[Motor, PseudoMotor]
+            Motor or pseudo-motor to scan.
+        scan_points : Iterable[float]
+
+        Returns
+        -------
+        np.ndarray
+            Indices of the scan points in visiting order.
+
+        """
+        all_targets = scan_motor.physical_targets_array(np.asarray(scan_points, dtype=float))
+        aliases = list(all_targets)
+        targets = np.column_stack([all_targets[alias] for alias in aliases])
+        velocities = np.array([self.axis_velocities.get(alias, 1.) for alias in aliases])
+        start_targets = scan_motor.physical_targets_array(np.array([scan_motor.user_position], dtype=float))
+        start = np.array([start_targets[alias][0] for alias in aliases])
+
+        order = optimise_order(targets, velocities, start=start)
+
+        time_before = travel_time(targets, velocities, start=start)
+        time_after = travel_time(targets[order], velocities, start=start)
+        LOGGER.info("Scan path optimised, estimated motion time %.1f s instead of %.1f s (%.1f s saved).",
+                    time_after, time_before, time_before - time_after)
+        return order
+
+    def mesh_scan(self, motors, axes, acq_time, snake=True):
+        """
+        N-dimensional grid scan, the first motor being the slowest and the last one the fastest.
+
+        Points are generated lazily and, with snake ordering, every motor reverses its direction
+        instead of flying back at each step of an outer motor. A motor only moves when its target changes.
+        Data are stored as N-D arrays in the grid (logical) order.
+
+        Parameters
+        ----------
+        motors : list[Union[Motor, PseudoMotor]]
+            Motors or pseudo-motors to scan, one per grid axis.
+        axes : list[Iterable[float]]
+            Positions along each grid axis.
+        acq_time : float
+            Acquisition time of each point.
+        snake : bool, optional
+            Snake (boustrophedon) traversal of the grid. Default is True.
+
+        """
+        if len(motors) != len(axes):
+            raise ValueError("Number of motors and number of grid axes does not match")
+        for motor, axis in zip(motors, axes):
+            self.preflight(motor, axis)
+
+        def steps():
+            current_targets = [None] * len(motors)
+            for index, targets in mesh_points(axes, snake=snake):
+                moves = [(motor, target) for motor, target, current in zip(motors, targets, current_targets)
+                         if target != current]
+                current_targets = list(targets)
+                yield index, moves, targets[-1], acq_time
+
+        self._run_scan(steps(), tuple(len(axis) for axis in axes))
+
+    def _run_scan(self, steps, scan_shape, point_order=None, count_preset=None):
+        start_time = self._open_scan(scan_shape, point_order=point_order, count_preset=count_preset)
+        self._motion_timings = []
+        self._acquisition_overheads = []
+        self._io_timings = []
+        self._timer = timing.PhaseTimer()
+        self._execute_steps(enumerate(steps), start_time, count_preset=count_preset)
+
+    def _execute_steps(self, numbered_steps, start_time, count_preset=None, targets=None):
+        acq_pool = None
+        if self.concurrent_acquisition and len(self.sensors) > 1:
+            acq_pool = ThreadPoolExecutor(max_workers=len(self.sensors), thread_name_prefix='borealis-acq')
+
+        # steps not published yet, they are the first ones to redo when resuming an interrupted scan,
+        # with the target of every motor at that step
+        pending = collections.deque()
+        # targets of all the motors moved so far, all moved again before the first step of a resumed scan
+        # as steps only move the motors whose target changes
+        targets = dict(targets or {})
+        restore = bool(targets)
+
+        def publish_point(point_number, step, data, positions, timestamp):
+            idx, _, position, acq_time = step
+            self._timer.start_point(point_number, scan_thread=False)
+            publish_start = time.perf_counter()
+            self._publish_scan_point(idx, position, acq_time, data, positions, point_number, timestamp)
+            self._io_timings.append(time.perf_counter() - publish_start)
+            timing.record('publish', self._io_timings[-1])
+            pending.popleft()
+
+        writer = None
+        if self.pipelined_scan:
+            writer = ScanPointWriter(publish_point, maxsize=self.pipeline_depth)
+            writer.start()
+
+        previous_position = None
+        motor_status = None
+        self._scan_running.set()
+        timing.activate(self._timer)
+        try:
+            for point_number, step in numbered_steps:
+                _, moves, position, acq_time = step
+                targets = {**targets, **dict(moves)}
+                pending.append((point_number, step, targets))
+                if self._abort_requested.is_set():
+                    LOGGER.error("Scan aborted before point %d.", point_number)
+                    raise ScanAbortedError()
+                self._timer.start_point(point_number)
+                if restore:  # motors may have been moved while the scan was interrupted
+                    moves, restore = list(targets.items()), False
+                motion_start = time.perf_counter()
+                for motor, target in moves:
+                    try:
+                        motor.amove(target)
+                    except RuntimeError as exc:  # TODO: change to MotorNotReady error once available
+                        LOGGER.error(
+                            "Scan interrupted at position %.2f", target)
+                        motor_status = DeviceStatus(motor.alias, {'error': repr(exc), 'target': target})
+                        raise RuntimeError(f"Scan interrupted at position {target}") from exc
+
+                acquisition_start = time.perf_counter()
+                timing.record('move', acquisition_start - motion_start)
+                if previous_position is not None:
+                    self._motion_timings.append((abs(position - previous_position), acquisition_start - motion_start))
+                previous_position = position
+
+                # get_all_sensors data (acq_time)
+                data = {}
+                if self.sensors:
+                    assert acq_time >= 0.
+                    data = self.acquire_all(acq_time, pool=acq_pool, count_preset=count_preset)
+                    if count_preset is None:  # the duration of count-preset acquisitions is not known beforehand
+                        self._acquisition_overheads.append(time.perf_counter() - acquisition_start - acq_time)
+                elif acq_time > 0:
+                    time.sleep(float(acq_time))
+                timestamp = time.time()
+                timing.record('acquisition', time.perf_counter() - acquisition_start)
+
+                # Get all controller position
+                positions = {ctlr.alias: ctlr.user_position for ctlr in self.controllers}
+
+                if writer is not None:
+                    writer.put(point_number, step, data, positions, timestamp)
+                else:
+                    publish_point(point_number, step, data, positions, timestamp)
+            if writer is not None:
+                writer.close()
+        except BaseException:
+            if writer is not None:
+                writer.close(raise_error=False)
+            self._checkpoint = ScanCheckpoint(steps=itertools.chain([(n, s) for n, s, _ in pending], numbered_steps),
+                                              start_time=start_time,
+                                              aliases=self._device_aliases(),
+                                              count_preset=count_preset,
+                                              targets=pending[0][2] if pending else targets)
+            LOGGER.error("Scan interrupted, %d point(s) left to measure can be resumed.", len(pending))
+            try:
+                if motor_status is not None:  # published once the writer no longer publishes points
+                    self.publish(motor_status)
+                self.publish(ScanInterrupted())
+            except Exception as exc:
+                LOGGER.error("Could not notify data managers of the scan interruption: %r", exc)
+            raise
+        finally:
+            self._scan_running.clear()
+            self._abort_requested.clear()
+            timing.activate(None)
+            if acq_pool is not None:
+                acq_pool.shutdown(wait=True)
+
+        self.publish(ScanTiming(phases=self._timer.phases()))
+        self._timer.log_summary()
+        self._close_scan(start_time)
+
+    def abort(self):
+        """
+        Stop the running step scan before its next point, from any thread.
+
+        The scan raises ScanAbortedError and is checkpointed as any interrupted scan, it can be resumed.
+        A time scan is stopped and closed normally. Requested while no scan runs (e.g. during the moves
+        before a queued scan), the abort is kept and stops the next scan before its first point, unless
+        cancelled with `clear_abort`.
+
+        """
+        LOGGER.warning("Scan abort requested.")
+        self._abort_requested.set()
+
+    def clear_abort(self):
+        """Cancel an abort request that no scan has handled yet."""
+        self._abort_requested.clear()
+
+    @property
+    def is_abort_requested(self) -> bool:
+        return self._abort_requested.is_set()
+
+    @property
+    def is_scanning(self) -> bool:
+        """True while a step scan is running."""
+        return self._scan_running.is_set()
+
+    def resume(self):
+        """
+        Resume the last interrupted scan from its first point that was not stored.
+
+        The data are written into the same scan, after checking that the devices are the same as
+        when the scan started and that all controllers are ready. All the scan motors are moved back to their
+        targets before the first point, in case they were moved meanwhile. The remaining steps are only kept in
+        memory until another scan starts: a scan can not be resumed after the session exited.
+
+        Raises
+        ------
+        UserWarning
+            If there is no interrupted scan to resume.
+        NotReadyError
+            If a controller is not ready.
+
+        """
+        if self._checkpoint is None:
+            raise UserWarning("There is no interrupted scan to resume.")
+
+        if self._device_aliases() != self._checkpoint.aliases:
+            raise ValueError("Devices changed since the scan was interrupted, it can not be resumed.")
+        for ctlr in self.controllers:
+            if getattr(ctlr, 'is_ready', True) is False:
+                LOGGER.error("Scan can not be resumed, %s is not ready.", ctlr.alias)
+                raise NotReadyError(ctlr.alias)
+
+        checkpoint = self._checkpoint
+        self._checkpoint = None
+        LOGGER.info("Resuming scan...\n")
+        self.publish(ScanResumed())
+        self._execute_steps(checkpoint.steps, checkpoint.start_time, count_preset=checkpoint.count_preset,
+                            targets=checkpoint.targets)
+
+    def _device_aliases(self):
+        return [device.alias for device in (self.sensors + self.controllers)]
+
+    async def ascan(self, sender, scan_points, acq_times):
+        """
+        Coroutine equivalent of scan, using the asyncio variants of the motor and sensors.
+
+        All sensors are acquired at the same time as tasks of the running event loop.
+        Scan points are published to the data managers inline.
+
+        Parameters
+        ----------
+        sender : Union[Motor, PseudoMotor]
+            Motor or pseudo-motor to scan.
+        scan_points : Iterable[float]
+        acq_times : Iterable[float]
+
+        """
+        scan_motor = sender
+
+        if len(scan_points) != len(acq_times):
+            raise ValueError("Length of scan points and acquisition times does not match")
+        self.preflight(scan_motor, scan_points)
+
+        start_time = self._open_scan(len(scan_points))
 
         for idx, (position, acq_time) in enumerate(zip(scan_points, acq_times)):
             try:
-                scan_motor.amove(position)
+                await scan_motor.async_amove(position)
             except RuntimeError as exc:  # TODO: change to MotorNotReady error once available
                 LOGGER.error(
                     "Scan interrupted at position %.2f", position)
                 raise RuntimeError(f"Scan interrupted at position {position}") from exc
 
-            # get_all_sensors data (acq_time)
             data = {}
-            log_counts = np.nan
             if self.sensors:
                 assert acq_time >= 0.
-                for sensor in self.sensors:
-                    # TODO: make asynchronous in case there are many sensors
-                    data[sensor.alias] = sensor.acquisition(acquisition_time=acq_time)
-                    log_counts = data[sensor.alias].counts.sum()
+                data = await self.async_acquire_all(acq_time)
             elif acq_time > 0:
-                time.sleep(float(acq_time))
+                await asyncio.sleep(float(acq_time))
+            timestamp = time.time()
 
-            # Get all controller position
             positions = {ctlr.alias: ctlr.user_position for ctlr in self.controllers}
+            self._publish_scan_point(idx, position, acq_time, data, positions, timestamp=timestamp)
+
+        self._close_scan(start_time)
+
+    def fly_scan(self, sender, start, stop, acq_times):
+        """
+        Continuous scan: the scan motor flies from start to stop while all sensors acquire back-to-back bins.
+
+        The motor velocity is set so that the motion lasts the sum of all acquisition times.
+        Controller positions are read at each bin boundary, and each bin is tagged with the
+        average of its two boundaries, i.e. the interpolated position at the middle of the bin.
+
+        Parameters
+        ----------
+        sender : Union[Motor, PseudoMotor]
+            Motor or pseudo-motor to scan, its controller must support velocity control.
+        start : float
+        stop : float
+        acq_times : Iterable[float]
+            Acquisition time of each bin, all must be positive.
+
+        """
+        scan_motor = sender
+
+        if len(acq_times) == 0 or min(acq_times) <= 0:
+            raise ValueError("Fly scan needs at least one bin and strictly positive acquisition times")
+        # physical motors move linearly between their start and stop targets
+        self.preflight(scan_motor, [start, stop])
+        # raises before anything moves if a controller can not set the velocity
+        scan_motor.check_velocity_control()
+
+        scan_motor.amove(start)
+        start_time = self._open_scan(len(acq_times))
+
+        acq_pool = None
+        if self.concurrent_acquisition and len(self.sensors) > 1:
+            acq_pool = ThreadPoolExecutor(max_workers=len(self.sensors), thread_name_prefix='borealis-acq')
+
+        started = threading.Event()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='borealis-fly') as motion:
+            move = motion.submit(scan_motor.fly_move, stop, float(sum(acq_times)), started=started)
+            idx = 0
+            try:
+                # the first bin starts with the motion
+                while not started.wait(0.01):
+                    if move.done():
+                        move.result()
+                        break
+                bin_start = {ctlr.alias: ctlr.user_position for ctlr in self.controllers}
+                bin_deadline = time.perf_counter()
+                for idx, acq_time in enumerate(acq_times):
+                    bin_deadline += float(acq_time)
+                    data = {}
+                    if self.sensors:
+                        data = self.acquire_all(acq_time, pool=acq_pool)
+                    else:  # bins follow the clock, publishing time does not delay the next ones
+                        time.sleep(max(0., bin_deadline - time.perf_counter()))
+                    timestamp = time.time()
+
+                    bin_end = {ctlr.alias: ctlr.user_position for ctlr in self.controllers}
+                    positions = {alias: (bin_start[alias] + bin_end[alias]) / 2 for alias in bin_end}
+                    bin_start = bin_end
+
+                    self._publish_scan_point(idx, positions.get(scan_motor.alias, np.nan), acq_time,
+                                             data, positions, timestamp=timestamp)
+                    if move.done() and move.exception() is not None:
+                        raise move.exception()
+                move.result()
+            except BaseException:
+                LOGGER.error("Fly scan interrupted at bin %d.", idx)
+                try:
+                    self.publish(ScanInterrupted())
+                except Exception as exc:
+                    LOGGER.error("Could not notify data managers of the scan interruption: %r", exc)
+                raise
+            finally:
+                if acq_pool is not None:
+                    acq_pool.shutdown(wait=True)
 
-            point_data = {'idx': idx, 'data': data, 'positions': positions}
-            self.notify_data_managers('new_scan_point', point_data)
+        self._close_scan(start_time)
 
-            LOGGER.info(f"| {idx:{idx_col_width}.0f} | {position:{pos_col_width}.4f} "
-                        f"| {acq_time:{time_col_width}.2f} | {log_counts:{count_col_width}.0f} |")
+    def time_scan(self, acq_time, nb_frames=None):
+        """
+        Acquire back-to-back frames at a fixed position, for `nb_frames` frames or until stopped.
 
-        self.notify_data_managers('close_scan', {})
+        Nothing moves and controller positions are only read once, at the start. Each frame is tagged with
+        its wall-clock time at the end of the acquisition and, with pipelined_scan, published from the writer
+        thread so that the next acquisition starts right away; the frames queued while the writer is busy are
+        then delivered as one batch of events. Open-ended time scans are stored in growing datasets.
+        The scan is stopped, and closed normally, by `abort` (e.g. from the scan server) or Ctrl-C.
 
-        LOGGER.info(f"\n   Scan ended successfully. Total duration was: {time.time() - start_time:.2f} s\n")
+        Parameters
+        ----------
+        acq_time : float
+            Acquisition time of each frame.
+        nb_frames : int, optional
+            Number of frames, unlimited by default.
+
+        Returns
+        -------
+        int
+            Number of acquired frames.
+
+        """
+        if nb_frames is None and not self.sensors and acq_time <= 0:
+            raise ValueError("An open-ended time scan needs sensors or a positive acquisition time")
+
+        positions = {ctlr.alias: ctlr.user_position for ctlr in self.controllers}
+        start_time = self._open_scan(nb_frames or 0)
+
+        acq_pool = None
+        if self.concurrent_acquisition and len(self.sensors) > 1:
+            acq_pool = ThreadPoolExecutor(max_workers=len(self.sensors), thread_name_prefix='borealis-acq')
+
+        def publish_frame(frame, data, timestamp):
+            self._publish_scan_point(frame, timestamp - start_time, acq_time, data, positions, timestamp=timestamp)
+
+        writer = None
+        if self.pipelined_scan:
+            writer = ScanPointWriter(publish_frame, maxsize=self.pipeline_depth, batch=self.bus.batch)
+            writer.start()
+
+        frame = 0
+        self._scan_running.set()
+        try:
+            try:
+                while nb_frames is None or frame < nb_frames:
+                    if self._abort_requested.is_set():
+                        LOGGER.info("Time scan stopped after %d frames.", frame)
+                        break
+                    data = {}
+                    if self.sensors:
+                        data = self.acquire_all(acq_time, pool=acq_pool)
+                    else:
+                        time.sleep(float(acq_time))
+                    if writer is not None:
+                        writer.put(frame, data, time.time())
+                    else:
+                        publish_frame(frame, data, time.time())
+                    frame += 1
+            except KeyboardInterrupt:
+                LOGGER.info("Time scan stopped after %d frames.", frame)
+            if writer is not None:
+                writer.close()
+        except BaseException:
+            if writer is not None:
+                writer.close(raise_error=False)
+            LOGGER.error("Time scan interrupted after %d frames.", frame)
+            try:
+                self.publish(ScanInterrupted())
+            except Exception as exc:
+                LOGGER.error("Could not notify data managers of the scan interruption: %r", exc)
+            raise
+        finally:
+            self._scan_running.clear()
+            self._abort_requested.clear()
+            if acq_pool is not None:
+                acq_pool.shutdown(wait=True)
+
+        self._close_scan(start_time)
+        return frame
+
+    def _open_scan(self, scan_shape, point_order=None, count_preset=None):
+        # a new scan discards the steps left by an interrupted one
+        self._checkpoint = None
+        # first create new scan in data collector
+        all_device_info = {
+            info.alias: info.metadata
+            for info in (device.get_device_info() for device in (self.sensors + self.controllers))
+        }
+        self.publish(ScanStarted(scan_points=scan_shape, all_device_info=all_device_info, point_order=point_order,
+                                 count_preset=count_preset))
+
+        return time.time()
+
+    def _close_scan(self, start_time):
+        self.publish(ScanClosed())
+        LOGGER.debug("Scan ended, total duration was: %.2f s", time.time() - start_time)
+
+    def _publish_scan_point(self, idx, position, acq_time, data, positions, point_number=None, timestamp=np.nan):
+        self.last_positions = positions
+        self.publish(PointReady(idx=idx, data=data, positions=positions,
+                                point_number=idx if point_number is None else point_number,
+                                position=position, acq_time=acq_time, timestamp=timestamp))
+
+    def acquire_all(self, acq_time, pool=None, count_preset=None):
+        """
+        Run an acquisition on all registered sensors.
+
+        Parameters
+        ----------
+        acq_time : float
+            Acquisition time in seconds, identical for all sensors. Maximum acquisition time with a count preset.
+        pool : ThreadPoolExecutor, optional
+            If given, all sensors are triggered at the same time on this pool,
+            otherwise they are acquired one after the other.
+        count_preset : CountPreset, optional
+            If given, each sensor acquires until its counts reach the preset.
+
+        Returns
+        -------
+        dict
+            Acquired data, keyed by sensor alias.
+
+        Raises
+        ------
+        AcquisitionError
+            If one or several sensors failed, once all the others have completed.
+
+        """
+        if pool is None:
+            return {sensor.alias: self._timed_acquisition(sensor, acq_time, count_preset) for sensor in self.sensors}
+
+        futures = {sensor.alias: pool.submit(self._timed_acquisition, sensor, acq_time, count_preset)
+                   for sensor in self.sensors}
+        data = {}
+        errors = {}
+        for alias, future in futures.items():
+            try:
+                data[alias] = future.result()
+            except Exception as exc:
+                LOGGER.error("Acquisition failed for sensor %s: %r", alias, exc)
+                errors[alias] = exc
+
+        if errors:
+            raise AcquisitionError(errors) from next(iter(errors.values()))
+
+        return data
+
+    @staticmethod
+    def _timed_acquisition(sensor, acq_time, count_preset=None):
+        with timing.phase(f'acquisition {sensor.alias}'):
+            if count_preset is not None:
+                return sensor.count_acquisition(count_preset.target_counts, max_time=acq_time, roi=count_preset.roi)
+            return sensor.acquisition(acquisition_time=acq_time)
+
+    async def async_acquire_all(self, acq_time):
+        """
+        Coroutine running an acquisition on all registered sensors at the same time.
+
+        Parameters
+        ----------
+        acq_time : float
+            Acquisition time in seconds, identical for all sensors.
+
+        Returns
+        -------
+        dict
+            Acquired data, keyed by sensor alias.
+
+        Raises
+        ------
+        AcquisitionError
+            If one or several sensors failed, once all the others have completed.
+
+        """
+        results = await asyncio.gather(*(sensor.async_acquisition(acquisition_time=acq_time)
+                                         for sensor in self.sensors),
+                                       return_exceptions=True)
+        data = {}
+        errors = {}
+        for sensor, result in zip(self.sensors, results):
+            if isinstance(result, Exception):
+                LOGGER.error("Acquisition failed for sensor %s: %r", sensor.alias, result)
+                errors[sensor.alias] = result
+            else:
+                data[sensor.alias] = result
+
+        if errors:
+            raise AcquisitionError(errors) from next(iter(errors.values()))
+
+        return data
+
+    def publish(self, event):
+        """Publish an event to the data managers subscribed to its type."""
+        self.bus.publish(event)
+
+        # a scan only starts once every data manager is ready and is only closed once they have all caught up
+        if self.async_dispatch and isinstance(event, (ScanStarted, ScanClosed)):
+            for component in self.bus.routes(type(event)):
+                self._deliveries[id(component)].drain()
 
     def notify_data_managers(self, message, kwargs):
-        for component in self.data_managers:
-            LOGGER.debug(f'Notifying {component}...')
-            component.receive(message, **kwargs)
+        """Publish a legacy message, as its typed event if it has one."""
+        self.publish(from_message(message, **kwargs))
+
+    def _deliver(self, component, events):
+        if self.async_dispatch:
+            try:
+                delivery = self._deliveries[id(component)]
+            except KeyError:
+                delivery = QueuedDelivery(component, maxsize=self.dispatch_queue_size)
+                self._deliveries[id(component)] = delivery
+            delivery.put(events)
+            return
+
+        with timing.phase(getattr(component, 'timing_phase', None) or f'receive {component}'):
+            deliver(component, events)
+
+    def dispatch_stats(self):
+        """
+        Queue depth and latency counters of the asynchronous data manager deliveries.
+
+        Returns
+        -------
+        dict
+            DispatchStats keyed by the data manager string representation.
+
+        """
+        return {str(delivery.component): delivery.stats for delivery in self._deliveries.values()}
+
+    def reset_dispatch(self):
+        """Deliver again to the data managers that failed, once their pending events are dropped."""
+        for delivery in self._deliveries.values():
+            delivery.reset()
+
+    def stop_dispatch(self):
+        """Process all pending messages and stop the data manager delivery threads."""
+        for delivery in self._deliveries.values():
+            delivery.stop()
+        self._deliveries = {}
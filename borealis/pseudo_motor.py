@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable
 
 import numpy as np
@@ -68,9 +71,67 @@ class PseudoMotor(ControllerComponent):
     def get_device_info(self):
         attrs = {'Alias': self.alias,
                  'Motors': self.motor_list,}
-        datasets = {'user_position': 1, }
+        datasets = {'user_position': (1, 'f8'), }
         return DeviceInfo(alias=self.alias, metadata={'attrs': attrs, 'data_sets': datasets})
 
+    def physical_targets(self, target_user: float) -> dict:
+        """Return the target (user) of each physical motor, through all nested conversion laws."""
+        targets = {}
+        for idx, motor in enumerate(self._motors):
+            targets.update(motor.physical_targets(self._conversion_laws[idx](target_user)))
+        return targets
+
+    def physical_targets_array(self, targets_user: np.ndarray) -> dict:
+        """Vectorised physical_targets, for a whole array of target positions (user)."""
+        targets_user = np.asarray(targets_user, dtype=float)
+        targets = {}
+        for idx, motor in enumerate(self._motors):
+            targets.update(motor.physical_targets_array(self._convert(idx, targets_user)))
+        return targets
+
+    def soft_limit_violations(self, targets_user: np.ndarray) -> dict:
+        """
+        Check a whole array of target positions (user) against the soft limits of all physical motors at once.
+
+        Parameters
+        ----------
+        targets_user : np.ndarray
+            Target positions in user unit.
+
+        Returns
+        -------
+        dict
+            {alias: (index, dial, limit_low, limit_high)} of the first offending target of each physical motor,
+            empty if all targets are valid.
+
+        """
+        targets_user = np.asarray(targets_user, dtype=float)
+        violations = {}
+        for idx, motor in enumerate(self._motors):
+            for alias, violation in motor.soft_limit_violations(self._convert(idx, targets_user)).items():
+                if alias not in violations or violation[0] < violations[alias][0]:
+                    violations[alias] = violation
+        return violations
+
+    def _convert(self, idx: int, targets_user: np.ndarray) -> np.ndarray:
+        """Apply a conversion law to an array of targets, point by point if the law does not support arrays."""
+        law = self._conversion_laws[idx]
+        with np.errstate(invalid='ignore'):  # out of domain positions give NaN, reported as soft limit errors
+            try:
+                converted = np.asarray(law(targets_user), dtype=float)
+            except (TypeError, ValueError):  # law written for scalars, e.g. with math functions or if statements
+                converted = None
+            if converted is None or converted.shape != targets_user.shape:
+                converted = np.array([self._apply_law(law, target) for target in targets_user], dtype=float)
+        return converted
+
+    @staticmethod
+    def _apply_law(law, target_user):
+        try:
+            return law(target_user)
+        except ValueError:  # math domain error
+            return np.nan
+
     def _check_is_ready(self):
         # TODO: change to MotorNotReady error once available
         if self.is_ready is False:
@@ -117,7 +178,67 @@ class PseudoMotor(ControllerComponent):
             motor_pos = self._conversion_laws[idx](target_user)
             motor.amove(motor_pos)
 
-    def scan(self, start: float, stop: float, step: float, acq_time: float = 0):
+    async def async_amove(self, target_user):
+        """Coroutine moving all (pseudo)motors to their target at the same time."""
+        self._check_is_ready()
+        self.check_soft_limits(target_user)
+
+        await asyncio.gather(*(motor.async_amove(self._conversion_laws[idx](target_user))
+                               for idx, motor in enumerate(self._motors)))
+
+    def check_velocity_control(self):
+        """Raise NotImplementedError if the controller of any (pseudo)motor can not set the axis velocity."""
+        for motor in self._motors:
+            motor.check_velocity_control()
+
+    def fly_move(self, target_user, duration: float, started: threading.Event = None):
+        """
+        Move all (pseudo)motors continuously and at the same time, so that they all arrive after `duration`.
+
+        `started`, if given, is set once all the motions are started (or have failed).
+        """
+        self._check_is_ready()
+        self.check_soft_limits(target_user)
+
+        motor_started = [threading.Event() for _ in self._motors]
+        with ThreadPoolExecutor(max_workers=len(self._motors), thread_name_prefix='borealis-fly') as pool:
+            moves = [pool.submit(motor.fly_move, self._conversion_laws[idx](target_user), duration,
+                                 started=motor_started[idx])
+                     for idx, motor in enumerate(self._motors)]
+            if started is not None:
+                for motion_started, move in zip(motor_started, moves):
+                    while not motion_started.wait(0.01) and not move.done():
+                        pass
+                started.set()
+            for move in moves:
+                move.result()
+
+    def fly_scan(self, start: float, stop: float, step: float, acq_time: float):
+        """
+        Perform a continuous scan, all motors move without stopping while sensors acquire back-to-back.
+
+        Each motor moves linearly in its own coordinates, each point is tagged with the
+        pseudo-motor position computed at the middle of the bin.
+
+        Parameters
+        ----------
+        start : float
+            Start of interval. The interval includes this value.
+        stop : float
+            End of interval.
+        step : float
+            Width of one bin.
+        acq_time : float
+            Acquisition time of one bin, must be positive.
+
+        """
+        self._check_is_ready()
+
+        nb_bins = int(round((stop - start) / step))
+        acq_times = np.full(nb_bins, acq_time, dtype=np.float32)
+        self.send(message='FlyScan', start=start, stop=start + nb_bins * step, acq_times=acq_times)
+
+    def scan(self, start: float, stop: float, step: float, acq_time: float = 0, dry_run: bool = False):
         """
         Perform a scan, if acq_time > 0 will also do an acquisition on all sensors.
 
@@ -131,10 +252,14 @@ class PseudoMotor(ControllerComponent):
             Spacing between values.  For any output `out`, this is the distance
             between two adjacent values, ``out[i+1] - out[i]``.
         acq_time : float
+        dry_run : bool
+            If True, only validate the scan and return its estimated duration (ScanEstimate).
 
         """
-        self._check_is_ready()
-
         scan_points = np.arange(start, stop, step, dtype=np.float32)
         acq_times = np.full_like(scan_points, acq_time)
+        if dry_run:
+            return self.send(message='DryRun', scan_points=scan_points, acq_times=acq_times)
+
+        self._check_is_ready()
         self.send(message='Scan', scan_points=scan_points, acq_times=acq_times)
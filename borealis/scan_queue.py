@@ -0,0 +1,285 @@
+import dataclasses
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable, Union
+
+import numpy as np
+
+from borealis import app_dir, session_data_collector, session_orchestrator
+from borealis.data_structures import ScanJob
+from borealis.exceptions import ScanAbortedError
+
+LOGGER = logging.getLogger(__name__)
+
+SCAN_TYPES = ('scan', 'mesh', 'repeat_scan')
+
+
+class ScanQueue:
+    """
+    Queue of scan jobs run back-to-back by a worker thread, for unattended measurements.
+
+    Each job sets the sample name, moves motors to their starting positions, then runs a scan. Scan
+    definitions are dictionaries with a 'type' key:
+
+    - {'type': 'scan', 'motor': alias, 'points': [...], 'acq_time': float}
+    - {'type': 'mesh', 'motors': [aliases], 'axes': [[...], ...], 'acq_time': float, 'snake': bool}
+    - {'type': 'repeat_scan', 'motor': alias, 'points': [...], 'acq_time': float, 'passes': int,
+      'roi': [first, last], 'target_error': float}
+
+    Motors are referenced by alias, so that the queue state can be saved to disk after every change and
+    reloaded in a new session. Jobs that were running when the session ended are queued again.
+    A failing job is marked as failed and the worker moves on to the next one.
+
+    """
+
+    def __init__(self, motors: Iterable = (), state_file: Union[str, Path] = None,
+                 orchestrator=None, data_collector=None):
+        """
+        ScanQueue constructor
+
+        Parameters
+        ----------
+        motors : Iterable[Union[Motor, PseudoMotor]]
+            Motors (and pseudo-motors) that jobs can move or scan.
+        state_file : Union[str, Path], optional
+            JSON file where the queue is saved, 'scan_queue.json' of the Borealis directory by default.
+            An existing queue is loaded from it.
+        orchestrator : Orchestrator, optional
+            Session orchestrator by default.
+        data_collector : DataCollector, optional
+            Session data collector by default.
+
+        """
+        self.motors = {motor.alias: motor for motor in motors}
+        self.state_file = Path(state_file) if state_file is not None else app_dir / 'scan_queue.json'
+        self._orchestrator = orchestrator if orchestrator is not None else session_orchestrator
+        self._data_collector = data_collector if data_collector is not None else session_data_collector
+        self.jobs = []
+        self._lock = threading.RLock()
+        self._wake_up = threading.Condition(self._lock)
+        # held while a job runs, anything else moving the motors (e.g. the scan server) must take it too
+        self.motion_lock = threading.Lock()
+        self._paused = False
+        self._stopping = False
+        self._worker = None
+        self._load()
+
+    # -------------  Queue edition ------------- #
+    def add(self, sample: str, scan: dict, moves: dict = None) -> int:
+        """
+        Add a job at the end of the queue.
+
+        Parameters
+        ----------
+        sample : str
+            Sample name of the job data.
+        scan : dict
+            Scan definition, see the class documentation.
+        moves : dict, optional
+            Positions to move motors to before the scan, keyed by motor alias.
+
+        Returns
+        -------
+        int
+            Job ID.
+
+        """
+        moves = {alias: float(position) for alias, position in (moves or {}).items()}
+        # stored as saved, numpy arrays and scalars (also nested, e.g. mesh axes) as plain lists and numbers
+        scan = json.loads(json.dumps(scan, default=_json_default))
+        self._validate(scan, moves)
+
+        with self._lock:
+            job_id = max((job.job_id for job in self.jobs), default=0) + 1
+            self.jobs.append(ScanJob(job_id=job_id, sample=sample, scan=scan, moves=moves))
+            try:
+                self._save()
+            except Exception:
+                self.jobs.pop()
+                raise
+            self._wake_up.notify_all()
+        LOGGER.info("Job %d added to the scan queue (%s on %s).", job_id, scan['type'], sample)
+        return job_id
+
+    def remove(self, job_id: int):
+        """Cancel a queued job, it stays in the queue with the 'cancelled' status."""
+        with self._lock:
+            job = self._get(job_id)
+            if job.status != 'queued':
+                raise ValueError(f"Job {job_id} is {job.status}, only queued jobs can be cancelled.")
+            job.status = 'cancelled'
+            self._save()
+
+    def move(self, job_id: int, position: int):
+        """Move a job to a new position in the queue (0 is the first position)."""
+        with self._lock:
+            job = self._get(job_id)
+            self.jobs.remove(job)
+            self.jobs.insert(position, job)
+            self._save()
+
+    def clear(self):
+        """Remove all jobs that are not queued or running from the queue."""
+        with self._lock:
+            self.jobs = [job for job in self.jobs if job.status in ('queued', 'running')]
+            self._save()
+
+    def status(self) -> list[ScanJob]:
+        """Copy of all jobs, in queue order, with their status."""
+        with self._lock:
+            return [dataclasses.replace(job) for job in self.jobs]
+
+    # -------------  Worker control ------------- #
+    def start(self):
+        """Start running the queued jobs in a background worker thread (once resumed, if paused)."""
+        if self.is_running:
+            return
+        self._stopping = False
+        self._worker = threading.Thread(target=self._run, name='borealis-scan-queue', daemon=True)
+        self._worker.start()
+
+    def pause(self):
+        """Stop running new jobs, the running job is completed first."""
+        with self._lock:
+            self._paused = True
+            self._wake_up.notify_all()
+        LOGGER.info("Scan queue paused.")
+
+    def abort(self):
+        """Pause the queue and abort the running job, during its moves or its scan (the scan can be resumed)."""
+        with self._lock:
+            self._paused = True
+            if any(job.status == 'running' for job in self.jobs):
+                self._orchestrator.abort()
+            self._wake_up.notify_all()
+        LOGGER.info("Scan queue paused.")
+
+    def resume(self):
+        """Run queued jobs again after `pause`."""
+        with self._lock:
+            self._paused = False
+            self._wake_up.notify_all()
+        LOGGER.info("Scan queue resumed.")
+
+    def stop(self, timeout: float = None):
+        """Stop the worker once the running job is completed."""
+        with self._lock:
+            self._stopping = True
+            self._wake_up.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def join(self):
+        """Wait until all queued jobs are done, or until the running job is done if the queue is paused."""
+        with self._lock:
+            while self.is_running and any(job.status == 'running' or (job.status == 'queued' and not self._paused)
+                                          for job in self.jobs):
+                self._wake_up.wait()
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None and self._worker.is_alive()
+
+    @property
+    def is_paused(self) -> bool:
+        return self._paused
+
+    # -------------  Internals ------------- #
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._stopping and (self._paused or self._next_job() is None):
+                    self._wake_up.wait()
+                if self._stopping:
+                    return
+                job = self._next_job()
+                job.status = 'running'
+                self._save()
+
+            LOGGER.info("Scan queue: starting job %d.", job.job_id)
+            try:
+                with self.motion_lock:
+                    self._run_job(job)
+            except ScanAbortedError as exc:
+                LOGGER.warning("Scan queue: job %d aborted.", job.job_id)
+                status, error = 'aborted', repr(exc)
+            except Exception as exc:
+                LOGGER.error("Scan queue: job %d failed: %r", job.job_id, exc)
+                status, error = 'failed', repr(exc)
+            else:
+                LOGGER.info("Scan queue: job %d done.", job.job_id)
+                status, error = 'done', ''
+
+            with self._lock:
+                self._orchestrator.clear_abort()  # an abort arriving once the job is over must not stop the next one
+                job.status = status
+                job.error = error
+                self._save()
+                self._wake_up.notify_all()
+
+    def _run_job(self, job: ScanJob):
+        self._data_collector.current_sample = job.sample
+        for alias, position in job.moves.items():
+            if self._orchestrator.is_abort_requested:
+                raise ScanAbortedError()
+            self.motors[alias].amove(position)
+
+        scan = job.scan
+        match scan['type']:
+            case 'scan':
+                points = scan['points']
+                self._orchestrator.scan(self.motors[scan['motor']], points, [scan['acq_time']] * len(points))
+            case 'mesh':
+                self._orchestrator.mesh_scan([self.motors[alias] for alias in scan['motors']], scan['axes'],
+                                             scan['acq_time'], snake=scan.get('snake', True))
+            case 'repeat_scan':
+                points = scan['points']
+                roi = scan.get('roi')
+                self._orchestrator.repeat_scan(self.motors[scan['motor']], points, [scan['acq_time']] * len(points),
+                                               scan['passes'], roi=tuple(roi) if roi is not None else None,
+                                               target_error=scan.get('target_error'))
+
+    def _next_job(self):
+        return next((job for job in self.jobs if job.status == 'queued'), None)
+
+    def _get(self, job_id: int) -> ScanJob:
+        for job in self.jobs:
+            if job.job_id == job_id:
+                return job
+        raise KeyError(f"No job {job_id} in the scan queue.")
+
+    def _validate(self, scan: dict, moves: dict):
+        if scan.get('type') not in SCAN_TYPES:
+            raise ValueError(f"Unknown scan type {scan.get('type')!r}, must be one of {SCAN_TYPES}.")
+        aliases = list(moves) + scan.get('motors', []) + ([scan['motor']] if 'motor' in scan else [])
+        unknown = [alias for alias in aliases if alias not in self.motors]
+        if unknown:
+            raise ValueError(f"Unknown motor(s) {unknown}, they must be given to the scan queue.")
+
+    def _save(self):
+        state = [dataclasses.asdict(job) for job in self.jobs]
+        temp_file = self.state_file.with_suffix('.tmp')
+        temp_file.write_text(json.dumps(state, indent=1, default=_json_default))
+        temp_file.replace(self.state_file)  # never leave a half-written state file
+
+    def _load(self):
+        if not self.state_file.exists():
+            return
+        self.jobs = [ScanJob(**job) for job in json.loads(self.state_file.read_text())]
+        for job in self.jobs:
+            if job.status == 'running':
+                LOGGER.warning("Job %d was interrupted, it is queued again.", job.job_id)
+                job.status = 'queued'
+        LOGGER.info("Scan queue loaded from %s: %d queued job(s).", self.state_file,
+                    sum(job.status == 'queued' for job in self.jobs))
+
+
+def _json_default(value):
+    """Numpy values of the scan definitions, as JSON types."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} can not be stored in the scan queue.")
@@ -0,0 +1,247 @@
+"""
+Scan server, giving other processes (GUI, remote users) access to a running Borealis session.
+
+The server runs in the instrument process, where devices are initialised once, and listens on a local
+TCP or Unix socket. Requests and answers are JSON objects, one per line:
+
+    {"command": "scan", "sample": "Cu foil", "motor": "energy", "points": [8970, 8971], "acq_time": 1}
+    {"ok": true, "result": 3}
+
+Scans are submitted to a ScanQueue and run one after the other, `move` is refused while a scan runs.
+"""
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+from pathlib import Path
+from typing import Iterable, Union
+
+import numpy as np
+
+from borealis import session_data_collector, session_orchestrator
+from borealis.exceptions import ServerError
+from borealis.scan_queue import ScanQueue
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PORT = 5678
+
+
+class ScanServer:
+    """
+    Local socket server exposing scan submission, motor moves, status and abort of the session.
+
+    Commands
+    --------
+    status                              session, motors and queue status
+    move(motor, position)               absolute move, refused while a scan runs
+    scan(sample, motor, points, acq_time, moves={})
+    mesh(sample, motors, axes, acq_time, moves={}, snake=True)
+                                        queue a scan, returns the job ID
+    jobs                                status of all queued jobs
+    cancel(job_id)                      cancel a queued job
+    abort                               stop the running job (its scan can be resumed) and pause the queue
+    resume_queue                        run queued jobs again after an abort
+
+    """
+
+    def __init__(self, motors: Iterable, address: Union[tuple, str, Path] = ('127.0.0.1', DEFAULT_PORT),
+                 scan_queue: ScanQueue = None, orchestrator=None, data_collector=None):
+        """
+        ScanServer constructor
+
+        Parameters
+        ----------
+        motors : Iterable[Union[Motor, PseudoMotor]]
+            Motors (and pseudo-motors) that clients can move or scan.
+        address : Union[tuple, str, Path], optional
+            (host, port) of a TCP socket, localhost only by default, or path of a Unix socket.
+        scan_queue : ScanQueue, optional
+            Queue running the submitted scans, a new one by default.
+        orchestrator : Orchestrator, optional
+            Session orchestrator by default.
+        data_collector : DataCollector, optional
+            Session data collector by default.
+
+        """
+        self.motors = {motor.alias: motor for motor in motors}
+        self._orchestrator = orchestrator if orchestrator is not None else session_orchestrator
+        self.scan_queue = scan_queue if scan_queue is not None else ScanQueue(
+            self.motors.values(), orchestrator=self._orchestrator,
+            data_collector=data_collector if data_collector is not None else session_data_collector)
+
+        handler = self._handler_class()
+        if isinstance(address, tuple):
+            self._server = socketserver.ThreadingTCPServer(address, handler, bind_and_activate=True)
+        else:
+            if Path(address).exists():
+                os.unlink(address)
+            self._server = socketserver.ThreadingUnixStreamServer(os.fspath(address), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self):
+        """Address actually listened to, e.g. with the port chosen by the system when port 0 was given."""
+        return self._server.server_address
+
+    def start(self):
+        """Serve requests in a background thread and start running queued scans."""
+        self.scan_queue.start()
+        self._thread = threading.Thread(target=self._server.serve_forever, name='borealis-server', daemon=True)
+        self._thread.start()
+        LOGGER.info("Scan server listening on %s", self.address)
+
+    def stop(self):
+        """Stop serving requests, the scan queue worker is stopped once the running job is completed."""
+        self._server.shutdown()
+        self._server.server_close()
+        if isinstance(self.address, str):
+            Path(self.address).unlink(missing_ok=True)
+        self.scan_queue.stop()
+        LOGGER.info("Scan server stopped")
+
+    def handle(self, request: dict):
+        """Run a request and return its result, raises on invalid requests."""
+        match request:
+            case {'command': 'status'}:
+                return {'scanning': self._orchestrator.is_scanning,
+                        'queue_paused': self.scan_queue.is_paused,
+                        'motors': self._positions(),
+                        'queued_jobs': sum(job.status == 'queued' for job in self.scan_queue.status())}
+            case {'command': 'move', 'motor': alias, 'position': position}:
+                # shared with the queue worker: no job can start while the motor moves, and conversely
+                if not self.scan_queue.motion_lock.acquire(blocking=False):
+                    raise RuntimeError("A scan is running, motors can not be moved.")
+                try:
+                    if self._orchestrator.is_scanning:
+                        raise RuntimeError("A scan is running, motors can not be moved.")
+                    self.motors[alias].amove(float(position))
+                    return self.motors[alias].user_position
+                finally:
+                    self.scan_queue.motion_lock.release()
+            case {'command': 'scan', 'sample': sample, 'motor': alias, 'points': points, 'acq_time': acq_time}:
+                return self.scan_queue.add(sample, {'type': 'scan', 'motor': alias, 'points': points,
+                                                    'acq_time': acq_time}, moves=request.get('moves'))
+            case {'command': 'mesh', 'sample': sample, 'motors': aliases, 'axes': axes, 'acq_time': acq_time}:
+                return self.scan_queue.add(sample, {'type': 'mesh', 'motors': aliases, 'axes': axes,
+                                                    'acq_time': acq_time, 'snake': request.get('snake', True)},
+                                           moves=request.get('moves'))
+            case {'command': 'jobs'}:
+                return [vars(job) for job in self.scan_queue.status()]
+            case {'command': 'cancel', 'job_id': job_id}:
+                self.scan_queue.remove(job_id)
+            case {'command': 'abort'}:
+                self.scan_queue.abort()
+            case {'command': 'resume_queue'}:
+                self.scan_queue.resume()
+            case _:
+                raise ValueError(f"Invalid request {request}")
+
+    def _positions(self):
+        """
+        Motor positions, read from the controllers unless something else drives the motors.
+
+        While a job or another client moves the motors, the controllers are not queried a second time at once
+        (their connection is not shared safely between threads): the positions are the ones read at the last
+        scan point, None for the motors not read by the scan.
+
+        """
+        if not self.scan_queue.motion_lock.acquire(blocking=False):
+            return {alias: self._orchestrator.last_positions.get(alias) for alias in self.motors}
+        try:
+            return {alias: motor.user_position for alias, motor in self.motors.items()}
+        finally:
+            self.scan_queue.motion_lock.release()
+
+    def _handler_class(self):
+        server = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        answer = {'ok': True, 'result': server.handle(json.loads(line))}
+                    except Exception as exc:
+                        LOGGER.error("Scan server request failed: %r", exc)
+                        answer = {'ok': False, 'error': repr(exc)}
+                    self.wfile.write(json.dumps(answer, default=_to_json).encode() + b'\n')
+
+        return RequestHandler
+
+
+class ScanClient:
+    """
+    Client of a ScanServer.
+
+    Examples
+    --------
+    >>> client = ScanClient()
+    >>> job_id = client.scan('Cu foil', 'energy', np.arange(8970, 9020, 0.5), acq_time=1.)
+    >>> client.jobs()
+
+    """
+
+    def __init__(self, address: Union[tuple, str, Path] = ('127.0.0.1', DEFAULT_PORT), timeout: float = 60.):
+        if isinstance(address, tuple):
+            self._socket = socket.create_connection(address, timeout=timeout)
+        else:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(os.fspath(address))
+        self._file = self._socket.makefile('rwb')
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def request(self, command: str, **params):
+        """Send a request and return its result, raises ServerError if it failed in the server."""
+        self._file.write(json.dumps({'command': command, **params}, default=_to_json).encode() + b'\n')
+        self._file.flush()
+        answer = json.loads(self._file.readline())
+        if not answer['ok']:
+            raise ServerError(answer['error'])
+        return answer['result']
+
+    def status(self) -> dict:
+        return self.request('status')
+
+    def move(self, motor: str, position: float) -> float:
+        return self.request('move', motor=motor, position=position)
+
+    def scan(self, sample: str, motor: str, points: Iterable[float], acq_time: float, moves: dict = None) -> int:
+        return self.request('scan', sample=sample, motor=motor, points=points, acq_time=acq_time, moves=moves)
+
+    def mesh(self, sample: str, motors: list[str], axes: list[Iterable[float]], acq_time: float,
+             moves: dict = None, snake: bool = True) -> int:
+        return self.request('mesh', sample=sample, motors=motors, axes=axes, acq_time=acq_time, moves=moves,
+                            snake=snake)
+
+    def jobs(self) -> list[dict]:
+        return self.request('jobs')
+
+    def cancel(self, job_id: int):
+        self.request('cancel', job_id=job_id)
+
+    def abort(self):
+        self.request('abort')
+
+    def resume_queue(self):
+        self.request('resume_queue')
+
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
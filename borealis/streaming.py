@@ -0,0 +1,305 @@
+"""
+Live streaming of scan points to external subscribers (plotting clients...) over a local socket.
+
+Binary format: each frame is a header `<4sBI` (magic b'BRLS', frame type, payload length) and a payload.
+
+- SCAN_STARTED, LAYOUT and SCAN_CLOSED payloads are JSON objects. LAYOUT gives the position and sensor
+  aliases of the following points, in payload order, it is sent before the first point of each scan.
+- POINT payload: `<qdd` point number, scan motor position and acquisition time, one float64 per position,
+  then for each sensor `<dddcI` runtime, ICR, OCR, dtype code ('I' uint32, 'f' float32, 'd' float64),
+  number of values, followed by the values (full spectrum, or ROI integrated counts).
+"""
+import collections
+import json
+import logging
+import socket
+import struct
+import threading
+import time
+from typing import Union
+
+import numpy as np
+
+from borealis.component import DataComponent
+from borealis.events import PointReady, ScanClosed, ScanStarted, from_message
+
+LOGGER = logging.getLogger(__name__)
+
+MAGIC = b'BRLS'
+HEADER = struct.Struct('<4sBI')
+POINT_HEADER = struct.Struct('<qdd')
+SENSOR_HEADER = struct.Struct('<dddcI')
+SCAN_STARTED, LAYOUT, POINT, SCAN_CLOSED = 1, 2, 3, 4
+DTYPES = {b'I': np.uint32, b'f': np.float32, b'd': np.float64}
+
+
+class StreamPublisher(DataComponent):
+    """
+    Publish scan points to the subscribers connected to a local TCP socket.
+
+    Each subscriber chooses, when connecting, to keep only every `decimation`-th point, at most `max_rate`
+    points per second, and full spectra or ROI integrated counts. Points are queued per subscriber in a
+    bounded buffer and sent from the subscriber's own thread: when a subscriber is too slow, its oldest
+    points are dropped, the scan never waits for it.
+
+    """
+    subscriptions = (ScanStarted, PointReady, ScanClosed)
+
+    def __init__(self, address: tuple = ('127.0.0.1', 0), buffer_size: int = 256):
+        """
+        StreamPublisher constructor, starts listening for subscribers.
+
+        Parameters
+        ----------
+        address : tuple, optional
+            (host, port) to listen to, localhost with a port chosen by the system by default.
+        buffer_size : int, optional
+            Maximum number of frames waiting to be sent to each subscriber.
+
+        """
+        super().__init__()
+        self.buffer_size = buffer_size
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._socket = socket.create_server(address)
+        self.address = self._socket.getsockname()
+        self._closed = False
+        self._accept_thread = threading.Thread(target=self._accept, name='borealis-stream', daemon=True)
+        self._accept_thread.start()
+        LOGGER.info("Streaming scan points on %s", self.address)
+
+    def __str__(self):
+        return f'{self.__class__.__name__}'
+
+    @property
+    def nb_subscribers(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def receive(self, message, **kwargs):
+        self.receive_event(from_message(message, **kwargs))
+
+    def receive_event(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.put(event)
+
+    def close(self):
+        """Stop streaming, disconnect all subscribers and remove the publisher from the orchestrator."""
+        self._closed = True
+        self._socket.close()
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for subscriber in subscribers:
+            subscriber.close()
+        if self in self._orchestrator.data_managers:
+            self._orchestrator.remove_data_component(self)
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                connection, address = self._socket.accept()
+            except OSError:  # socket closed
+                break
+            try:
+                connection.settimeout(5.)
+                with connection.makefile('rb') as request:
+                    options = json.loads(request.readline())
+                connection.settimeout(None)
+                subscriber = _Subscriber(connection, self.buffer_size, **options)
+            except (OSError, ValueError, TypeError) as exc:
+                LOGGER.error("Invalid stream subscription from %s: %r", address, exc)
+                connection.close()
+                continue
+            subscriber.on_close = self._remove
+            with self._lock:
+                self._subscribers.append(subscriber)
+            LOGGER.info("Stream subscriber connected from %s", address)
+
+    def _remove(self, subscriber):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+
+class _Subscriber:
+    """Connection to one subscriber, with its decimation options, frame buffer and sender thread."""
+
+    def __init__(self, connection, buffer_size, decimation: int = 1, max_rate: float = None, roi: list = None):
+        self.connection = connection
+        self.decimation = max(int(decimation), 1)
+        self.min_interval = 1 / max_rate if max_rate else 0.
+        self.roi = slice(*roi) if roi is not None else None
+        self.dropped = 0
+        self.on_close = None
+        self._buffer = collections.deque()
+        self._buffer_size = buffer_size
+        self._ready = threading.Condition()
+        self._closed = False
+        self._points = 0
+        self._last_sent = -np.inf
+        self._layout = None
+        self._thread = threading.Thread(target=self._send_loop, name='borealis-stream-subscriber', daemon=True)
+        self._thread.start()
+
+    def put(self, event):
+        """Queue an event if the subscriber wants it, called from the scan thread: never blocks."""
+        if isinstance(event, PointReady):
+            self._points += 1
+            now = time.perf_counter()
+            if (self._points - 1) % self.decimation or now - self._last_sent < self.min_interval:
+                return
+            self._last_sent = now
+        elif isinstance(event, ScanStarted):
+            self._points = 0
+            self._last_sent = -np.inf
+        with self._ready:
+            if len(self._buffer) >= self._buffer_size:
+                self._buffer.popleft()
+                self.dropped += 1
+            self._buffer.append(event)
+            self._ready.notify()
+
+    def close(self):
+        with self._ready:
+            self._closed = True
+            self._ready.notify()
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)  # unblocks a send to a subscriber that stopped reading
+        except OSError:
+            pass
+        self._thread.join()
+
+    def _send_loop(self):
+        try:
+            while True:
+                with self._ready:
+                    while not self._buffer and not self._closed:
+                        self._ready.wait()
+                    if self._closed:
+                        break
+                    event = self._buffer.popleft()
+                self.connection.sendall(b''.join(self._encode(event)))
+        except OSError as exc:
+            LOGGER.info("Stream subscriber disconnected: %r", exc)
+        finally:
+            self.connection.close()
+            if self.on_close is not None:
+                self.on_close(self)
+
+    def _encode(self, event):
+        match event:
+            case ScanStarted(scan_points=scan_points):
+                self._layout = None
+                yield _frame(SCAN_STARTED, json.dumps({'scan_points': np.atleast_1d(scan_points).tolist()}).encode())
+            case ScanClosed():
+                yield _frame(SCAN_CLOSED, json.dumps({'dropped': self.dropped}).encode())
+            case PointReady():
+                layout = (list(event.positions), list(event.data))
+                if layout != self._layout:
+                    self._layout = layout
+                    yield _frame(LAYOUT, json.dumps({'positions': layout[0], 'sensors': layout[1],
+                                                     'roi': self.roi is not None}).encode())
+                yield _frame(POINT, self._encode_point(event))
+
+    def _encode_point(self, event):
+        parts = [POINT_HEADER.pack(int(event.point_number), float(event.position), float(event.acq_time)),
+                 np.array(list(event.positions.values()), dtype='<f8').tobytes()]
+        for mca in event.data.values():
+            counts = np.asarray(mca.counts)
+            if self.roi is not None:
+                values, code = np.array([counts[self.roi].sum()], dtype='<f8'), b'd'
+            elif np.issubdtype(counts.dtype, np.integer):
+                values, code = counts.astype('<u4'), b'I'
+            else:
+                values, code = counts.astype('<f4'), b'f'
+            metadata = mca.metadata
+            parts.append(SENSOR_HEADER.pack(float(metadata.runtime), _rate(metadata.input_cr),
+                                            _rate(metadata.output_cr), code, len(values)))
+            parts.append(values.tobytes())
+        return b''.join(parts)
+
+
+class StreamSubscriber:
+    """
+    Client of a StreamPublisher, iterating over the frames of the live scans.
+
+    Examples
+    --------
+    >>> with StreamSubscriber(publisher_address, decimation=10, roi=(200, 400)) as stream:
+    ...     for frame in stream:
+    ...         if frame['type'] == 'point':
+    ...             plot(frame['position'], frame['sensors']['Ketek']['values'][0])
+
+    """
+
+    def __init__(self, address: tuple, decimation: int = 1, max_rate: float = None, roi: tuple = None,
+                 timeout: Union[float, None] = None):
+        self._socket = socket.create_connection(address, timeout=timeout)
+        self._file = self._socket.makefile('rb')
+        options = {'decimation': decimation, 'max_rate': max_rate, 'roi': list(roi) if roi is not None else None}
+        self._socket.sendall(json.dumps(options).encode() + b'\n')
+        self._layout = None
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        while True:
+            frame = self.receive()
+            if frame is None:
+                return
+            yield frame
+
+    def receive(self):
+        """Next frame as a dictionary, None once the publisher closed the connection."""
+        header = self._file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return None
+        magic, frame_type, length = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("Invalid stream frame")
+        payload = self._file.read(length)
+        if frame_type == POINT:
+            return self._decode_point(payload)
+        if frame_type == LAYOUT:
+            self._layout = json.loads(payload)
+            return {'type': 'layout', **self._layout}
+        if frame_type == SCAN_STARTED:
+            return {'type': 'scan_started', **json.loads(payload)}
+        if frame_type == SCAN_CLOSED:
+            return {'type': 'scan_closed', **json.loads(payload)}
+        raise ValueError(f"Unknown stream frame type {frame_type}")
+
+    def _decode_point(self, payload):
+        point_number, position, acq_time = POINT_HEADER.unpack_from(payload)
+        offset = POINT_HEADER.size
+        nb_positions = len(self._layout['positions'])
+        positions = np.frombuffer(payload, dtype='<f8', count=nb_positions, offset=offset)
+        offset += positions.nbytes
+        sensors = {}
+        for alias in self._layout['sensors']:
+            runtime, input_cr, output_cr, code, nb_values = SENSOR_HEADER.unpack_from(payload, offset)
+            offset += SENSOR_HEADER.size
+            values = np.frombuffer(payload, dtype=np.dtype(DTYPES[code]).newbyteorder('<'), count=nb_values,
+                                   offset=offset)
+            offset += values.nbytes
+            sensors[alias] = {'runtime': runtime, 'ICR': input_cr, 'OCR': output_cr, 'values': values}
+        return {'type': 'point', 'point_number': point_number, 'position': position, 'acq_time': acq_time,
+                'positions': dict(zip(self._layout['positions'], positions.tolist())), 'sensors': sensors}
+
+
+def _frame(frame_type, payload):
+    return HEADER.pack(MAGIC, frame_type, len(payload)) + payload
+
+
+def _rate(value):
+    return np.nan if value is None else float(value)
@@ -0,0 +1,99 @@
+"""Per-point timing of the phases of a scan (motion, acquisition, data managers, logging)."""
+import contextlib
+import logging
+import threading
+import time
+
+import numpy as np
+
+LOGGER = logging.getLogger(__name__)
+
+# Timer of the running scan, phases are not recorded when None
+_active_timer = None
+
+
+class PhaseTimer:
+    """
+    Accumulate the time spent in each phase for each scan point.
+
+    The point a duration belongs to is the one set by `start_point` in the current thread,
+    or the point of the scan thread for threads that did not set any (e.g. acquisition pool).
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._current_point = 0
+        self._durations = {}
+        self.nb_points = 0
+
+    def start_point(self, point_number: int, scan_thread: bool = True):
+        """Set the point the next durations recorded from this thread belong to."""
+        self._local.point = point_number
+        if scan_thread:
+            self._current_point = point_number
+            self.nb_points = max(self.nb_points, point_number + 1)
+
+    def add(self, phase: str, seconds: float):
+        """Add a duration to a phase of the current point."""
+        point = getattr(self._local, 'point', self._current_point)
+        with self._lock:
+            per_point = self._durations.setdefault(phase, {})
+            per_point[point] = per_point.get(point, 0.) + seconds
+
+    def phases(self) -> dict:
+        """Duration of each phase for each point, in execution order (NaN when the phase did not occur)."""
+        with self._lock:
+            phases = {}
+            for phase, per_point in self._durations.items():
+                durations = np.full(self.nb_points, np.nan)
+                for point, seconds in per_point.items():
+                    if point < self.nb_points:
+                        durations[point] = seconds
+                phases[phase] = durations
+            return phases
+
+    def summary(self, percentiles=(50, 90, 99)) -> dict:
+        """Percentiles and maximum of each phase duration, in seconds."""
+        summary = {}
+        for phase, durations in self.phases().items():
+            durations = durations[~np.isnan(durations)]
+            if len(durations):
+                summary[phase] = dict(zip([f'p{q}' for q in percentiles], np.percentile(durations, percentiles)),
+                                      max=durations.max())
+        return summary
+
+    def log_summary(self):
+        """Log the percentiles of each phase as a table."""
+        LOGGER.info(f"| {'phase':<30} | {'p50 (ms)':>9} | {'p90 (ms)':>9} | {'p99 (ms)':>9} | {'max (ms)':>9} |")
+        for phase, stats in self.summary().items():
+            LOGGER.info(f"| {phase:<30} | {stats['p50'] * 1e3:9.1f} | {stats['p90'] * 1e3:9.1f} "
+                        f"| {stats['p99'] * 1e3:9.1f} | {stats['max'] * 1e3:9.1f} |")
+
+
+def activate(timer: PhaseTimer = None):
+    """Record the phases in `timer`, or stop recording them if None."""
+    global _active_timer
+    _active_timer = timer
+
+
+def record(phase_name: str, seconds: float):
+    """Add a duration to a phase of the running scan, if any."""
+    timer = _active_timer
+    if timer is not None:
+        timer.add(phase_name, seconds)
+
+
+@contextlib.contextmanager
+def phase(phase_name: str):
+    """Context manager timing its block as a phase of the running scan, if any."""
+    if _active_timer is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase_name, time.perf_counter() - start)
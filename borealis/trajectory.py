@@ -0,0 +1,168 @@
+"""Generation of the sequence of points visited during multi-motor scans."""
+from typing import Iterable, Iterator
+
+import numpy as np
+
+
+def mesh_points(axes: Iterable[Iterable[float]], snake: bool = True) -> Iterator[tuple[tuple, tuple]]:
+    """
+    Lazily generate the points of an N-dimensional grid.
+
+    The first axis is the slowest, the last axis the fastest. With snake (boustrophedon)
+    ordering, each axis reverses its direction every time an outer axis steps, so that
+    two consecutive points always differ by a single step along a single axis.
+
+    Parameters
+    ----------
+    axes : Iterable[Iterable[float]]
+        Positions along each axis of the grid.
+    snake : bool, optional
+        True for snake ordering, False to always run the axes in increasing index. Default is True.
+
+    Yields
+    ------
+    index : tuple[int]
+        Index of the point in the grid, used to store the data in logical order.
+    targets : tuple[float]
+        Position of each axis.
+
+    """
+    axes = [np.asarray(axis) for axis in axes]
+    shape = tuple(len(axis) for axis in axes)
+    for counter in np.ndindex(shape):
+        index = counter
+        if snake:
+            index = tuple(
+                shape[k] - 1 - counter[k] if k > 0 and np.ravel_multi_index(counter[:k], shape[:k]) % 2 else counter[k]
+                for k in range(len(shape))
+            )
+        yield index, tuple(float(axis[i]) for axis, i in zip(axes, index))
+
+
+def travel_time(targets: np.ndarray, velocities: np.ndarray, start: np.ndarray = None) -> float:
+    """
+    Estimate the motion time to visit the targets in the given order.
+
+    Axes are moved one after the other, as done by PseudoMotor.amove, so the time of a
+    move is the sum over all axes of the travelled distance divided by the axis velocity.
+
+    Parameters
+    ----------
+    targets : np.ndarray
+        Physical target of each axis, shape (nb_points, nb_axes).
+    velocities : np.ndarray
+        Velocity of each axis, in position unit per second.
+    start : np.ndarray, optional
+        Position of each axis before the first move.
+
+    Returns
+    -------
+    float
+        Motion time in seconds.
+
+    """
+    path = np.asarray(targets, dtype=float)
+    if start is not None:
+        path = np.vstack([start, path])
+    return float(np.sum(np.abs(np.diff(path, axis=0)) / velocities))
+
+
+def optimise_order(targets: np.ndarray, velocities: np.ndarray, start: np.ndarray = None,
+                   max_passes: int = 10) -> np.ndarray:
+    """
+    Reorder the targets to minimise the total motion time.
+
+    A nearest-neighbour tour is built first, then improved with 2-opt segment reversals
+    until no reversal shortens the path or `max_passes` is reached.
+
+    Parameters
+    ----------
+    targets : np.ndarray
+        Physical target of each axis, shape (nb_points, nb_axes).
+    velocities : np.ndarray
+        Velocity of each axis, in position unit per second.
+    start : np.ndarray, optional
+        Position of each axis before the first move, the path starts from the closest point.
+    max_passes : int, optional
+        Maximum number of 2-opt passes. Default is 10.
+
+    Returns
+    -------
+    np.ndarray
+        Indices of the targets in the optimised visiting order.
+
+    """
+    targets = np.asarray(targets, dtype=float)
+    velocities = np.asarray(velocities, dtype=float)
+    nodes = targets if start is None else np.vstack([start, targets])
+    offset = 0 if start is None else 1
+
+    def cost(node, others):
+        return np.sum(np.abs(nodes[others] - nodes[node]) / velocities, axis=-1)
+
+    # nearest neighbour tour, starting from the start position or from the first target
+    route = [0]
+    remaining = np.ones(len(nodes), dtype=bool)
+    remaining[0] = False
+    for _ in range(len(nodes) - 1):
+        candidates = np.flatnonzero(remaining)
+        nearest = candidates[np.argmin(cost(route[-1], candidates))]
+        route.append(nearest)
+        remaining[nearest] = False
+    route = np.array(route)
+
+    # 2-opt: reverse route[i:j+1] whenever it shortens the path, the first node stays fixed
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, len(route) - 1):
+            j = np.arange(i + 1, len(route))
+            before = cost(route[i - 1], route[i]) + np.append(cost(route[j[:-1]], route[j[:-1] + 1]), 0.)
+            after = cost(route[i - 1], route[j]) + np.append(cost(route[i], route[j[:-1] + 1]), 0.)
+            delta = after - before
+            best = np.argmin(delta)
+            if delta[best] < -1e-12:
+                route[i:j[best] + 1] = route[i:j[best] + 1][::-1]
+                improved = True
+        if not improved:
+            break
+
+    return route[offset:] - offset
+
+
+def refine_points(positions: np.ndarray, intensities: np.ndarray, tolerance: float,
+                  min_step: float = 0.) -> np.ndarray:
+    """
+    Midpoints of the intervals over which the measured intensity changes too much.
+
+    The change over each interval between two neighbouring points is compared to the full
+    intensity range; intervals with a relative change above `tolerance` and wider than
+    `2 * min_step` are split in two.
+
+    Parameters
+    ----------
+    positions : np.ndarray
+        Measured positions, sorted in increasing order.
+    intensities : np.ndarray
+        Measured intensity at each position.
+    tolerance : float
+        Accepted relative intensity change between two neighbouring points.
+    min_step : float, optional
+        Smallest allowed distance between two points. Default is 0.
+
+    Returns
+    -------
+    np.ndarray
+        New positions to measure, sorted by decreasing intensity change.
+
+    """
+    positions = np.asarray(positions, dtype=float)
+    intensities = np.asarray(intensities, dtype=float)
+    span = np.ptp(intensities)
+    if len(positions) < 2 or span == 0:
+        return np.array([])
+
+    change = np.abs(np.diff(intensities)) / span
+    width = np.diff(positions)
+    to_split = np.flatnonzero((change > tolerance) & (width > 2 * min_step))
+    to_split = to_split[np.argsort(change[to_split])[::-1]]
+    return positions[to_split] + width[to_split] / 2
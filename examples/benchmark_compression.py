@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Write cost vs file size of the compression filters of the DataCollector spectra datasets.
+
+Writes the same synthetic scan (sparse Poisson spectra: a few fluorescence lines over a weak background,
+mostly zeros as measured spectra) with each filter, and reports the mean write time per point and the
+file size. Run it on the instrument PC, with its data directory, to pick the instrument default:
+
+    python benchmark_compression.py --points 2000 --channels 4096 --data-dir D:/data
+
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+import borealis
+from borealis.data_collector import DataCollector
+from borealis.mca import MCA, MCAMetadata
+
+FILTERS = [(None, None), ('lzf', None), ('gzip', 1), ('gzip', 4), ('gzip', 9), ('blosc', 5)]
+
+
+def synthetic_spectra(nb_points, nb_channels, seed=0):
+    """Poisson spectra with three gaussian lines whose intensity varies along the scan."""
+    rng = np.random.default_rng(seed)
+    channels = np.arange(nb_channels)
+    lines = sum(amplitude * np.exp(-0.5 * ((channels - center) / 6.) ** 2)
+                for center, amplitude in ((0.3 * nb_channels, 50.), (0.33 * nb_channels, 10.),
+                                          (0.6 * nb_channels, 30.)))
+    edge = np.linspace(0.5, 1.5, nb_points)[:, None]
+    return rng.poisson(0.02 + edge * lines).astype('uint32')
+
+
+def benchmark(filter_name, level, spectra, data_dir):
+    dc = DataCollector()
+    borealis.session_orchestrator.data_managers.remove(dc)
+    dc.data_dir = data_dir
+    dc.filename_base = f'benchmark_{filter_name}_{level}'
+    dc.create_h5file(add_date=False)
+    dc.set_compression(filter_name, level)
+
+    nb_points, nb_channels = spectra.shape
+    device_info = {'det': {'attrs': {}, 'data_sets': {'MCA': (nb_channels, 'uint32'), 'runtime': 1,
+                                                      'ICR': 1, 'OCR': 1}}}
+    dc.add_scan(scan_points=nb_points, all_device_info=device_info)
+    metadata = MCAMetadata.dummy()
+    start = time.perf_counter()
+    for idx, counts in enumerate(spectra):
+        dc.add_scan_point(idx, data={'det': MCA(counts, metadata)}, positions={})
+    dc.close_scan()
+    duration = time.perf_counter() - start
+    filename = Path(dc.h5file.filename)
+    dc.h5file.close()
+
+    return duration / nb_points, filename.stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--points', type=int, default=2000)
+    parser.add_argument('--channels', type=int, default=4096)
+    parser.add_argument('--data-dir', type=Path, default=None,
+                        help='Directory of the test files, a temporary directory by default.')
+    args = parser.parse_args()
+
+    spectra = synthetic_spectra(args.points, args.channels)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or Path(tmp_dir)
+        print(f'{"filter":<10}{"level":>6}{"ms/point":>12}{"size (MB)":>12}{"ratio":>8}')
+        reference = None
+        for filter_name, level in FILTERS:
+            try:
+                time_per_point, size = benchmark(filter_name, level, spectra, data_dir)
+            except ImportError as exc:
+                print(f'{filter_name!s:<10}{level!s:>6}  skipped: {exc}')
+                continue
+            reference = reference or size
+            print(f'{filter_name!s:<10}{level!s:>6}{1e3 * time_per_point:>12.3f}{size / 1e6:>12.2f}'
+                  f'{reference / size:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,6 @@
+import time
+
+import numpy as np
 import pytest
 
 from borealis.controller.controller_base import DummyCtrl, Controller
@@ -33,4 +36,46 @@ def test_dummy_detector():
     """Check basic functionality of Dummy detector."""
     det = DummyDet()
     det = DummyDet('DummyAlias')
-    det.acquisition(5)
\ No newline at end of file
+    det.acquisition(5)
+
+def test_count_acquisition_reaches_preset():
+    """Host-side polling stops once the counts reach the preset, the runtime is the actual acquisition time."""
+    det = DummyDet('PresetDet')
+    rate = np.arange(2048).sum()  # counts per second of the dummy spectrum
+
+    spectrum = det.count_acquisition(rate * 0.05, max_time=1., poll_time=0.01)
+    assert spectrum.counts.sum() >= rate * 0.05
+    assert spectrum.metadata.runtime == pytest.approx(spectrum.counts.sum() / rate)
+    assert spectrum.metadata.runtime < 0.1
+
+    roi_spectrum = det.count_acquisition(45 * 0.05, max_time=1., roi=(0, 10), poll_time=0.01)
+    assert roi_spectrum.counts[:10].sum() >= 45 * 0.05
+
+
+def test_count_acquisition_capped_by_max_time():
+    det = DummyDet('CappedDet')
+
+    spectrum = det.count_acquisition(1e12, max_time=0.05, poll_time=0.01)
+    assert 0.02 < spectrum.metadata.runtime <= 0.05 + 1e-9  # the acquisition overheads count in max_time
+
+    with pytest.raises(ValueError):
+        det.count_acquisition(100, max_time=1., poll_time=0.)
+
+
+class SlowStartDet(DummyDet):
+    """Detector spending 50 ms to start each acquisition."""
+
+    def acquisition(self, acquisition_time):
+        time.sleep(0.05)
+        return super().acquisition(acquisition_time)
+
+
+def test_count_acquisition_max_time_includes_overheads():
+    det = SlowStartDet('SlowStartDet')
+
+    start = time.monotonic()
+    spectrum = det.count_acquisition(1e12, max_time=0.1, poll_time=0.01)
+
+    # at most one start overhead over max_time, instead of one per acquisition
+    assert time.monotonic() - start < 0.1 + 0.05 + 0.025
+    assert spectrum.metadata.runtime < 0.1
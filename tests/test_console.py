@@ -0,0 +1,70 @@
+import logging
+
+import pytest
+
+import borealis
+from borealis import timing
+from borealis.console import ScanConsole
+from borealis.events import ScanStarted
+from borealis.orchestrator import Orchestrator
+
+
+@pytest.fixture
+def console():
+    console = ScanConsole(refresh_rate=0)
+    yield console
+    console.detach()
+
+
+def scan_messages(console, nb_points):
+    console.receive('new_scan', scan_points=nb_points, all_device_info={})
+    for idx in range(nb_points):
+        console.receive('new_scan_point', idx=idx, data={}, positions={}, point_number=idx,
+                        position=float(idx), acq_time=0.)
+    console.receive('close_scan')
+
+
+def table_lines(caplog):
+    return [record.message for record in caplog.records if record.message.startswith('|')][2:]
+
+
+def test_console_prints_every_point_without_refresh_rate(console, caplog):
+    with caplog.at_level(logging.INFO, logger='borealis.console'):
+        scan_messages(console, 5)
+
+    assert len(table_lines(caplog)) == 5
+    assert "Scan ended successfully" in caplog.text
+
+
+def test_console_is_rate_limited(console, caplog):
+    console.refresh_rate = 1e-3  # one line every 1000 s
+    with caplog.at_level(logging.INFO, logger='borealis.console'):
+        scan_messages(console, 50)
+
+    lines = table_lines(caplog)
+    # only the first and last points
+    assert len(lines) == 2
+    assert lines[-1].split('|')[1].strip() == '49'
+
+
+def test_console_detach_and_attach(console):
+    assert console in borealis.session_orchestrator.data_managers
+    console.detach()
+    assert console not in borealis.session_orchestrator.data_managers
+    console.attach()
+    assert console in borealis.session_orchestrator.data_managers
+
+
+def test_console_is_timed_as_logging(console):
+    orch = Orchestrator()
+    orch.add_data_component(console)
+    timer = timing.PhaseTimer()
+    timing.activate(timer)
+    try:
+        timer.start_point(0)
+        orch.publish(ScanStarted(scan_points=1, all_device_info={}))
+    finally:
+        timing.activate(None)
+
+    assert 'logging' in timer.phases()
+    assert f'receive {console}' not in timer.phases()
@@ -1,7 +1,28 @@
 from pathlib import Path
 
+import numpy as np
+import pytest
+
 import borealis
-from borealis.data_collector import DataCollector
+from borealis.data_collector import DataCollector, read_spectra
+from borealis.events import PointReady, ScanClosed, ScanStarted
+from borealis.mca import MCA, MCAMetadata
+
+DEVICE_INFO = {'det': {'attrs': {}, 'data_sets': {'MCA': 4, 'runtime': 1, 'ICR': 1, 'OCR': 1}},
+               'mot': {'attrs': {}, 'data_sets': {'user_position': 1}}}
+
+
+@pytest.fixture
+def dc(tmp_path):
+    """Data collector writing into a file of a temporary directory, not registered to the session."""
+    dc = DataCollector()
+    borealis.session_orchestrator.data_managers.remove(dc)
+    dc.data_dir = tmp_path
+    dc.filename_base = 'datafile_test_dc'
+    dc.create_h5file(add_date=False)
+    yield dc
+    dc.h5file.close()
+
 
 class TestDataCollector:
 
@@ -10,10 +31,11 @@ class TestDataCollector:
         cls.dc = DataCollector()
         cls.dc.filename_base = Path(f'datafile_test_dc')
 
-    def test_data_collector(self):
+    def test_data_collector(self, tmp_path):
+        self.dc.data_dir = tmp_path
         self.dc.create_h5file(add_date=False)
 
-        assert Path('./data/datafile_test_dc.h5').exists()
+        assert (tmp_path / 'datafile_test_dc.h5').exists()
 
     @classmethod
     def teardown_class(cls):
@@ -21,3 +43,168 @@ class TestDataCollector:
         borealis.session_orchestrator.data_managers.remove(cls.dc)
         # Path('./data/borealis_datafile_test.h5').unlink()
 
+
+
+def test_data_collector_mesh_scan_layout(dc):
+    """Mesh scans are stored as N-D arrays, indexed by the grid index of each point."""
+
+    dc.add_scan(scan_points=(2, 3), all_device_info=DEVICE_INFO)
+    mca = MCA(np.array([1, 2, 3, 4]), MCAMetadata.dummy())
+    dc.add_scan_point(idx=(1, 2), data={'det': mca}, positions={'mot': 42.})
+
+    assert dc.current_scan['det/MCA'].shape == (2, 3, 4)
+    assert np.array_equal(dc.current_scan['det/MCA'][1, 2], [1, 2, 3, 4])
+    assert dc.current_scan['mot/user_position'][1, 2] == 42.
+    dc.close_scan()
+
+
+def test_data_collector_progress_attributes(dc):
+    dc.receive('new_scan', scan_points=3, all_device_info={'mot': {'attrs': {}, 'data_sets': {'user_position': 1}}})
+    scan = dc.current_scan
+    dc.receive('new_scan_point', idx=0, data={}, positions={'mot': 1.})
+    dc.receive('interrupt_scan')
+    assert scan.attrs['status'] == 'interrupted'
+    assert scan.attrs['completed_points'] == 1
+    assert scan.attrs['last_completed_idx'] == 0
+
+    dc.receive('resume_scan')
+    dc.receive('new_scan_point', idx=1, data={}, positions={'mot': 2.})
+    dc.receive('close_scan')
+    assert scan.attrs['status'] == 'completed'
+    assert scan.attrs['completed_points'] == 2
+
+
+def test_data_collector_accumulated_scan(dc):
+    device_info = {'mot': {'attrs': {}, 'data_sets': {'user_position': 1}}}
+    for _ in range(2):
+        dc.receive('new_scan', scan_points=2, all_device_info=device_info)
+        dc.receive('close_scan')
+    dc.receive('accumulated_scan', passes=2, scans=['scan1', 'scan2'],
+               data={'det': {'MCA': np.ones((4, 2)), 'ROI counts': np.array([4., 4.])}},
+               positions={'mot': np.array([1., 2.])})
+
+    scan = dc.h5file['scan3']
+    assert scan.attrs['status'] == 'accumulated'
+    assert list(scan.attrs['Accumulated scans']) == ['scan1', 'scan2']
+    assert scan['det/MCA'].shape == (4, 2)
+    assert np.array_equal(scan['mot/user_position'], [1., 2.])
+
+
+def test_data_collector_open_ended_scan_grows(dc):
+    dc.receive('new_scan', scan_points=0, all_device_info=DEVICE_INFO)
+    scan = dc.current_scan
+    for frame in range(100):
+        mca = MCA(np.full(4, frame), MCAMetadata.dummy())
+        dc.receive('new_scan_point', idx=frame, data={'det': mca}, positions={'mot': 1.}, timestamp=1000. + frame)
+    dc.receive('interrupt_scan')
+    assert scan['det/MCA'].shape == (100, 4)  # trimmed to the stored points
+    dc.receive('close_scan')
+
+    assert scan['det/MCA'].shape == (100, 4)
+    assert scan['mot/user_position'].shape == (100, )
+    assert np.array_equal(scan['det/MCA'][:, 0], np.arange(100))
+    assert np.array_equal(scan['timestamp'], 1000. + np.arange(100))
+
+
+@pytest.mark.parametrize('filter_name', [None, 'gzip', 'lzf'])
+def test_data_collector_compressed_spectra(filter_name, dc):
+    """Spectra are stored one per chunk, compressed losslessly with the selected filter."""
+    dc.set_compression(filter_name)
+
+    device_info = {'det': {'attrs': {}, 'data_sets': {'MCA': 8, 'runtime': 1, 'ICR': 1, 'OCR': 1}}}
+    dc.add_scan(scan_points=3, all_device_info=device_info)
+    for idx in range(3):
+        dc.add_scan_point(idx, data={'det': MCA(np.arange(8) * idx, MCAMetadata.dummy())}, positions={})
+
+    spectra = dc.current_scan['det/MCA']
+    assert spectra.chunks == (1, 8)
+    assert spectra.compression == filter_name
+    assert np.array_equal(spectra[2], np.arange(8) * 2)
+    dc.close_scan()
+
+
+def test_data_collector_unknown_compression():
+    dc = DataCollector()
+    borealis.session_orchestrator.data_managers.remove(dc)
+
+    with pytest.raises(ValueError):
+        dc.set_compression('zip')
+
+
+def test_data_collector_batched_writes(dc):
+    """Points are buffered and written as hyperslabs every `flush_points` points, and at the end of the scan."""
+    dc.flush_points = 4
+
+    dc.receive('new_scan', scan_points=10, all_device_info=DEVICE_INFO)
+    scan = dc.current_scan
+    for idx in range(6):
+        mca = MCA(np.full(4, idx), MCAMetadata.dummy())
+        dc.receive('new_scan_point', idx=idx, data={'det': mca}, positions={'mot': float(idx)})
+
+    assert scan.attrs['completed_points'] == 4
+    assert scan.attrs['last_completed_idx'] == 3
+    assert np.array_equal(scan['mot/user_position'][:6], [0., 1., 2., 3., 0., 0.])
+
+    dc.receive('interrupt_scan')
+    assert scan.attrs['completed_points'] == 6
+    assert np.array_equal(scan['det/MCA'][:6, 0], np.arange(6))
+    dc.receive('resume_scan')
+    dc.receive('close_scan')
+
+
+def test_data_collector_batch_of_events_is_written_once(dc):
+    flushes = []
+    flush = dc.flush
+    dc.flush = lambda: flushes.append(len(dc._pending_points)) or flush()
+
+    dc.receive_events([ScanStarted(scan_points=5, all_device_info=DEVICE_INFO)]
+                      + [PointReady(idx=idx, data={'det': MCA(np.full(4, idx), MCAMetadata.dummy())}, positions={})
+                         for idx in range(3)])
+
+    assert flushes == [3]
+    assert dc.current_scan.attrs['completed_points'] == 3
+    assert np.array_equal(dc.current_scan['det/MCA'][:3, 0], np.arange(3))
+    dc.receive_events([ScanClosed()])
+
+
+def test_data_collector_flush_interval(dc):
+    dc.flush_points = 100
+    dc.flush_interval = 0.
+
+    dc.receive('new_scan', scan_points=(2, 2), all_device_info={'mot': {'attrs': {}, 'data_sets': {'user_position': 1}}})
+    dc.receive('new_scan_point', idx=(1, 1), data={}, positions={'mot': 3.})
+    assert dc.current_scan['mot/user_position'][1, 1] == 3.
+    dc.receive('close_scan')
+
+
+def test_read_spectra_point_major_and_legacy_layout(dc):
+    """Spectra are read as (points, channels) from point-major files and from files written channel-major."""
+
+    dc.add_scan(scan_points=3, all_device_info=DEVICE_INFO)
+    for idx in range(3):
+        dc.add_scan_point(idx, data={'det': MCA(np.arange(4) + 10 * idx, MCAMetadata.dummy())}, positions={})
+    spectra = dc.current_scan['det/MCA']
+    dc.close_scan()
+    legacy = dc.h5file.create_dataset('legacy_MCA', data=spectra[()].T)
+
+    assert np.array_equal(read_spectra(spectra), read_spectra(legacy))
+    assert np.array_equal(read_spectra(spectra)[1], [10, 11, 12, 13])
+    assert np.array_equal(read_spectra(legacy, channels=slice(1, 3)), [[1, 2], [11, 12], [21, 22]])
+
+
+def test_data_collector_declared_dtypes(dc):
+    """Datasets are created with the dtype declared by the devices, spectra counts are stored losslessly."""
+
+    device_info = {'det': {'attrs': {}, 'data_sets': {'MCA': (4, 'uint32'), 'runtime': (1, 'f8'),
+                                                      'ICR': (1, 'f8'), 'OCR': (1, 'f8')}},
+                   'mot': {'attrs': {}, 'data_sets': {'user_position': 1}}}
+    dc.add_scan(scan_points=2, all_device_info=device_info)
+    counts = np.array([0, 1, 2**24 + 1, 2**32 - 1], dtype='uint32')
+    dc.add_scan_point(0, data={'det': MCA(counts, MCAMetadata.dummy())}, positions={'mot': 1.})
+    scan = dc.current_scan
+    dc.close_scan()
+
+    assert scan['det/MCA'].dtype == np.uint32
+    assert scan['det/runtime'].dtype == np.float64
+    assert scan['mot/user_position'].dtype == np.float32
+    assert np.array_equal(scan['det/MCA'][0], counts)
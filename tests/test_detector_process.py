@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pytest
+
+import borealis
+from borealis.detector.detector_base import DummyDet
+from borealis.detector.detector_process import DetectorProcess
+from borealis.exceptions import DetectorProcessError
+
+
+class CrashingDet(DummyDet):
+    """Detector whose driver brings its whole process down."""
+
+    def acquisition(self, acquisition_time):
+        if acquisition_time > 1:
+            os._exit(3)
+        if acquisition_time < 0:
+            raise ValueError("Negative acquisition time")
+        return super().acquisition(acquisition_time)
+
+
+class CountingDet(DummyDet):
+    """Detector returning integer counts, as the hardware ones."""
+
+    def __init__(self, alias='CountingDet'):
+        super().__init__(alias)
+        self.mca_dtype = 'uint32'
+
+    def acquisition(self, acquisition_time):
+        spectrum = super().acquisition(acquisition_time)
+        spectrum.counts = np.full(len(spectrum.counts), 2 ** 31 + 1, dtype='uint32')
+        return spectrum
+
+
+@pytest.fixture
+def det():
+    borealis.session_orchestrator._remove_all_sensors()
+    det = DetectorProcess(CrashingDet, alias='WorkerDet')
+    yield det
+    det.stop()
+    borealis.session_orchestrator._remove_all_sensors()
+
+
+def test_detector_process_keeps_detector_api(det):
+    assert det.alias == 'WorkerDet'
+    assert det.get_det_info()['type'] == 'CrashingDet'
+    assert det in borealis.session_orchestrator.sensors
+    assert det.is_alive
+
+    spectra = [det.acquisition(acq_time) for acq_time in (0.1, 0.2, 0.3)]  # same buffer
+
+    for spectrum, acq_time in zip(spectra, (0.1, 0.2, 0.3)):
+        assert np.array_equal(spectrum.counts, np.arange(2048) * acq_time)
+    assert spectra[0].metadata.det_alias == 'DummyDet'
+    assert det.call('get_det_info')['alias'] == 'WorkerDet'
+
+
+def test_detector_process_errors(det):
+    with pytest.raises(ValueError):
+        det.acquisition(-1)
+    assert det.acquisition(0).counts.sum() == 0  # worker still usable
+
+    with pytest.raises(DetectorProcessError):
+        det.acquisition(2)
+    assert not det.is_alive
+    with pytest.raises(DetectorProcessError):
+        det.acquisition(0)
+
+
+def test_detector_process_buffer_uses_detector_dtype():
+    borealis.session_orchestrator._remove_all_sensors()
+    det = DetectorProcess(CountingDet, alias='CountingWorker')
+    try:
+        assert det.mca_dtype == 'uint32'
+        assert det._buffer.nbytes == det.mca_size * 4
+        counts = det.acquisition(0.1).counts
+        assert counts.dtype == np.uint32
+        assert np.all(counts == 2 ** 31 + 1)
+    finally:
+        det.stop()
+        borealis.session_orchestrator._remove_all_sensors()
@@ -0,0 +1,142 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from borealis.data_structures import DeviceInfo
+from borealis.events import EventBus, Message, PointReady, ScanClosed, ScanStarted, deliver, from_message
+from borealis.orchestrator import Orchestrator
+
+
+class PointMonitor:
+    """Typed component only interested in scan points."""
+    subscriptions = (PointReady, )
+
+    def __init__(self):
+        self.events = []
+
+    def receive_event(self, event):
+        self.events.append(event)
+
+
+class BatchWriter(PointMonitor):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def receive_events(self, events):
+        self.batches.append(events)
+
+
+class LegacyManager:
+    def __init__(self):
+        self.receive = MagicMock()
+
+
+def point(idx):
+    return PointReady(idx=idx, data={}, positions={'mot': float(idx)})
+
+
+def test_events_are_routed_by_subscription():
+    monitor = PointMonitor()
+    legacy = LegacyManager()
+    bus = EventBus([monitor, legacy])
+
+    bus.publish(ScanStarted(scan_points=2, all_device_info={}))
+    bus.publish(point(0))
+    bus.publish(ScanClosed())
+
+    assert monitor.events == [point(0)]
+    assert [c[0][0] for c in legacy.receive.call_args_list] == ['new_scan', 'new_scan_point', 'close_scan']
+    assert legacy.receive.call_args_list[1][1]['positions'] == {'mot': 0.}
+
+    stats = bus.stats()
+    assert stats['PointReady'].published == 1
+    assert stats['PointReady'].deliveries == 2
+    assert stats['ScanStarted'].deliveries == 1
+    assert stats['ScanClosed'].mean_time > 0
+
+
+def test_routes_follow_subscriber_list():
+    subscribers = []
+    bus = EventBus(subscribers)
+    assert bus.routes(PointReady) == []
+
+    monitor = PointMonitor()
+    subscribers.append(monitor)
+
+    assert bus.routes(PointReady) == [monitor]
+    assert bus.routes(ScanClosed) == []
+
+
+def test_batch_delivers_once_per_subscriber():
+    writer = BatchWriter()
+    legacy = LegacyManager()
+    bus = EventBus([writer, legacy])
+
+    with bus.batch():
+        bus.publish(ScanStarted(scan_points=3, all_device_info={}))
+        for idx in range(3):
+            bus.publish(point(idx))
+        assert writer.batches == []
+
+    assert writer.batches == [[point(0), point(1), point(2)]]
+    assert legacy.receive.call_count == 4
+    assert bus.stats()['PointReady'].published == 3
+
+
+class FailingMonitor(PointMonitor):
+    def receive_event(self, event):
+        raise RuntimeError(f"cannot handle point {event.idx}")
+
+
+def test_failing_subscriber_does_not_stop_delivery():
+    monitor = PointMonitor()
+    writer = BatchWriter()
+    bus = EventBus([FailingMonitor(), monitor, writer])
+
+    with pytest.raises(RuntimeError, match="point 0"):
+        bus.publish(point(0))
+    with pytest.raises(RuntimeError, match="point 1"):
+        with bus.batch():
+            bus.publish(point(1))
+            bus.publish(point(2))
+
+    assert monitor.events == [point(0), point(1), point(2)]
+    assert writer.batches == [[point(0)], [point(1), point(2)]]
+    assert bus.stats()['PointReady'].published == 3
+
+
+def test_legacy_messages():
+    assert from_message('close_scan') == ScanClosed()
+    assert isinstance(from_message('new_scan_point', idx=1, data={}, positions={}), PointReady)
+    assert from_message('unknown', x=1) == Message('unknown', {'x': 1})
+
+    legacy = LegacyManager()
+    deliver(legacy, [Message('unknown', {'x': 1})])
+    legacy.receive.assert_called_once_with('unknown', x=1)
+
+
+def test_orchestrator_only_delivers_subscribed_events():
+    orch = Orchestrator()
+    monitor = PointMonitor()
+    orch.add_data_component(monitor)
+
+    class Ctrl:
+        alias = 'motor'
+        user_position = 0.
+
+        def get_device_info(self):
+            return DeviceInfo(alias=self.alias, metadata={})
+
+        def amove(self, position):
+            self.user_position = position
+
+        def soft_limit_violations(self, positions):
+            return {}
+
+    ctrl = Ctrl()
+    orch.add_controller_component(ctrl)
+    orch.scan(sender=ctrl, scan_points=[0., 1.], acq_times=[0.] * 2)
+
+    assert [event.idx for event in monitor.events] == [0, 1]
+    assert [event.position for event in monitor.events] == [0., 1.]
@@ -1,14 +1,19 @@
+import asyncio
+import time
+
+import numpy as np
 import pytest
 
 import borealis
-from borealis.controller.controller_base import DummyCtrl
-from borealis.exceptions import SoftLimitError
+from borealis.controller.controller_base import DummyCtrl, Controller
+from borealis.exceptions import ScanPreflightError, SoftLimitError
 from borealis.motor import Motor
 from borealis.detector.detector_base import DummyDet
 
 
 @pytest.fixture(autouse=True, scope='module')
-def h5file():
+def h5file(tmp_path_factory):
+    borealis.session_data_collector.data_dir = tmp_path_factory.mktemp('data')
     borealis.session_data_collector.filename_base = 'datafile_test_mot'
     borealis.session_data_collector.instrument = 'Dummy instrument'
     borealis.session_data_collector.experiment_id = "Fake ID 42"
@@ -138,4 +143,104 @@ def test_motor_scan_no_h5file(dummy_ctrl):
     mot = Motor('DummyMotor', '1', 0, ctrl)
 
     with pytest.raises(UserWarning):
-        mot.scan(1, 10, 1)
\ No newline at end of file
+        mot.scan(1, 10, 1)
+
+def test_motor_async_amove(dummy_ctrl):
+    """Check the coroutine move honours offset and soft limits like amove."""
+    mot = Motor('DummyMotor', '7', 10, dummy_ctrl, soft_limit_low=-20, soft_limit_high=20)
+
+    asyncio.run(mot.async_amove(15))
+    assert mot.user_position == 15
+    assert mot.dial_position == 5
+
+    with pytest.raises(SoftLimitError):
+        asyncio.run(mot.async_amove(50))
+
+
+def test_motor_fly_scan():
+    """Check bins are tagged with the mid-bin position and the velocity is restored."""
+    borealis.session_data_collector.create_h5file(add_date=False)
+    ctrl = DummyCtrl()
+    ctrl.set_axis_velocity('1', 100.)
+    mot = Motor('DummyMotor', '1', 0, ctrl)
+
+    mot.fly_scan(0, 1, 0.1, acq_time=0.05)
+
+    positions = borealis.session_data_collector.h5file['scan1/DummyMotor/user_position'][()]
+    assert len(positions) == 10
+    assert np.all(np.diff(positions) > 0)
+    assert positions == pytest.approx(np.arange(0.05, 1, 0.1), abs=0.05)
+    assert ctrl.get_axis_velocity('1') == 100.
+    assert mot.user_position == pytest.approx(1)
+
+
+def test_motor_fly_scan_needs_velocity_control(dummy_ctrl):
+    class NoVelocityCtrl(DummyCtrl):
+        def get_axis_velocity(self, axis_id):
+            return Controller.get_axis_velocity(self, axis_id)
+
+    mot = Motor('DummyMotor', '1', 0, NoVelocityCtrl())
+    with pytest.raises(NotImplementedError):
+        mot.fly_move(10, duration=1)
+
+
+def test_motor_fly_scan_without_velocity_control_does_not_start():
+    """The velocity control is checked before moving to the start and before opening the scan."""
+    class NoVelocityCtrl(DummyCtrl):
+        def get_axis_velocity(self, axis_id):
+            return Controller.get_axis_velocity(self, axis_id)
+
+    borealis.session_data_collector.create_h5file(add_date=False)
+    mot = Motor('DummyMotor', '1', 0, NoVelocityCtrl())
+    mot.amove(0.5)
+    with pytest.raises(NotImplementedError):
+        mot.fly_scan(0, 1, 0.1, acq_time=0.05)
+
+    assert mot.user_position == 0.5
+    assert len(borealis.session_data_collector.h5file) == 0
+
+
+def test_motor_fly_scan_motion_failure_interrupts_scan():
+    """A motion error during the scan stops the acquisition and marks the scan as interrupted."""
+    class FailingCtrl(DummyCtrl):
+        calls = 0
+
+        def wait_motion_end(self, axis_id, target, timeout=None):
+            self.calls += 1
+            if self.calls > 1:  # the move to the start succeeds, the fly motion fails
+                time.sleep(0.1)
+                raise RuntimeError("Following error")
+
+    borealis.session_data_collector.create_h5file(add_date=False)
+    ctrl = FailingCtrl()
+    ctrl.set_axis_velocity('1', 100.)
+    mot = Motor('DummyMotor', '1', 0, ctrl)
+    with pytest.raises(RuntimeError):
+        mot.fly_scan(0, 1, 0.1, acq_time=0.05)
+
+    scan = borealis.session_data_collector.h5file['scan1']
+    assert scan.attrs['status'] == 'interrupted'
+    assert scan.attrs['completed_points'] < 10
+
+
+def test_motor_scan_dry_run(dummy_ctrl):
+    """A dry run validates the soft limits of all points without moving."""
+    mot = Motor('DummyMotor', '8', 0, dummy_ctrl, soft_limit_low=-5, soft_limit_high=5)
+
+    estimate = mot.scan(0, 5, 1, acq_time=0.5, dry_run=True)
+    assert estimate.nb_points == 5
+    assert estimate.acquisition == pytest.approx(2.5)
+    assert mot.user_position == 0
+
+    with pytest.raises(SoftLimitError):
+        mot.scan(0, 10, 1, dry_run=True)
+
+
+def test_motor_scan_preflight_rejects_before_moving(dummy_ctrl):
+    mot = Motor('DummyMotor', '9', 0, dummy_ctrl, soft_limit_low=-5, soft_limit_high=5)
+
+    with pytest.raises(ScanPreflightError) as exc_info:
+        mot.scan(0, 10, 1)
+
+    assert exc_info.value.violations['DummyMotor'][:3] == (6, 6., 6.)
+    assert mot.user_position == 0
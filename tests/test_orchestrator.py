@@ -1,9 +1,19 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from unittest.mock import MagicMock, call
 import numpy as np
 
+import borealis
+from borealis.console import ScanConsole
+from borealis.data_collector import DataCollector
 from borealis.orchestrator import Orchestrator
 from borealis.data_structures import DeviceInfo
+from borealis.events import PointReady
+from borealis.exceptions import AcquisitionError
+from borealis.mca import MCA, MCAMetadata
 
 
 class MockSensor:
@@ -20,6 +30,17 @@ class MockSensor:
         return mock
 
 
+class SlowSensor(MockSensor):
+    def acquisition(self, acquisition_time):
+        time.sleep(acquisition_time)
+        return super().acquisition(acquisition_time)
+
+
+class FailingSensor(MockSensor):
+    def acquisition(self, acquisition_time):
+        raise IOError("USB link lost")
+
+
 class MockController:
     def __init__(self, name="motor"):
         self.alias = name
@@ -31,6 +52,12 @@ class MockController:
     def amove(self, pos):
         self.user_position = pos
 
+    def physical_targets_array(self, positions):
+        return {self.alias: np.asarray(positions, dtype=float)}
+
+    def soft_limit_violations(self, positions):
+        return {}
+
 
 class MockDataManager:
     def __init__(self):
@@ -151,6 +178,39 @@ def test_scan_error_length_not_matching():
     with pytest.raises(ValueError):
         orch.scan(sender=ctrl, scan_points=[1, 2, 3], acq_times=[0.1, 0.1])
 
+
+class PresetSensor(MockSensor):
+    def __init__(self, alias="S1"):
+        super().__init__(alias)
+        self.count_acquisition = MagicMock(return_value=MCA(np.array([5, 5, 5]), MCAMetadata.dummy()))
+
+
+def test_scan_count_preset_acquires_until_target():
+    orch = Orchestrator()
+    sensor = PresetSensor()
+    orch.add_sensor_component(sensor)
+    ctrl = MockController(name="motor")
+    orch.add_controller_component(ctrl)
+    dm = MockDataManager()
+    orch.add_data_component(dm)
+
+    orch.scan(sender=ctrl, scan_points=[0., 1.], acq_times=[2., 3.], target_counts=1e4, roi=(0, 2))
+
+    assert sensor.count_acquisition.call_args_list == [call(10000, max_time=2., roi=(0, 2)),
+                                                       call(10000, max_time=3., roi=(0, 2))]
+    preset = dm.receive.call_args_list[0][1]['count_preset']
+    assert (preset.target_counts, preset.roi) == (10000, (0, 2))
+
+
+def test_scan_count_preset_requires_supporting_sensors():
+    orch = Orchestrator()
+    orch.add_sensor_component(MockSensor())
+    ctrl = MockController(name="motor")
+    orch.add_controller_component(ctrl)
+
+    with pytest.raises(ValueError):
+        orch.scan(sender=ctrl, scan_points=[0.], acq_times=[1.], target_counts=100)
+
 # ---------------------------------------------------------
 # notify_data_managers()
 # ---------------------------------------------------------
@@ -167,3 +227,614 @@ def test_notify_data_managers_calls_receive():
 
     dm1.receive.assert_called_once_with("event", x=1)
     dm2.receive.assert_called_once_with("event", x=1)
+
+
+# ---------------------------------------------------------
+# acquire_all()
+# ---------------------------------------------------------
+
+def test_acquire_all_concurrent_scan_overlaps_sensors():
+    orch = Orchestrator()
+    orch.concurrent_acquisition = True
+    for alias in ("S1", "S2", "S3"):
+        orch.add_sensor_component(SlowSensor(alias=alias))
+    ctrl = MockController(name="motor")
+    orch.add_controller_component(ctrl)
+    dm = MockDataManager()
+    orch.add_data_component(dm)
+
+    start = time.perf_counter()
+    orch.scan(sender=ctrl, scan_points=[0.0, 1.0], acq_times=[0.2, 0.2])
+    duration = time.perf_counter() - start
+
+    assert duration < 1.0
+    point_calls = [c for c in dm.receive.call_args_list if c[0][0] == "new_scan_point"]
+    assert set(point_calls[0][1]['data'].keys()) == {"S1", "S2", "S3"}
+
+
+def test_acquire_all_reports_failing_sensors():
+    orch = Orchestrator()
+    orch.add_sensor_component(MockSensor(alias="S1"))
+    orch.add_sensor_component(FailingSensor(alias="S2"))
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        with pytest.raises(AcquisitionError) as exc_info:
+            orch.acquire_all(0.1, pool=pool)
+
+    assert list(exc_info.value.errors.keys()) == ["S2"]
+    assert isinstance(exc_info.value.errors["S2"], IOError)
+
+
+# ---------------------------------------------------------
+# pipelined scan
+# ---------------------------------------------------------
+
+class SlowMotor(MockController):
+    def amove(self, pos):
+        time.sleep(0.1)
+        super().amove(pos)
+
+
+class SlowDataManager:
+    def __init__(self):
+        self.indexes = []
+
+    def receive(self, message, **kwargs):
+        if message == 'new_scan_point':
+            time.sleep(0.1)
+            self.indexes.append(kwargs['idx'])
+
+
+def test_pipelined_scan_overlaps_motion_and_writing():
+    orch = Orchestrator()
+    orch.pipelined_scan = True
+    motor = SlowMotor()
+    orch.add_controller_component(motor)
+    dm = SlowDataManager()
+    orch.add_data_component(dm)
+
+    start = time.perf_counter()
+    orch.scan(sender=motor, scan_points=list(range(6)), acq_times=[0.] * 6)
+    duration = time.perf_counter() - start
+
+    assert dm.indexes == list(range(6))
+    assert duration < 1.0  # 1.2 s when motion and writing are serial
+
+
+def test_pipelined_scan_data_manager_error_propagates():
+    orch = Orchestrator()
+    orch.pipelined_scan = True
+    ctrl = MockController()
+    orch.add_controller_component(ctrl)
+    dm = MockDataManager()
+
+    def receive(message, **kwargs):
+        if message == 'new_scan_point':
+            raise OSError("disk full")
+
+    dm.receive.side_effect = receive
+    orch.add_data_component(dm)
+
+    with pytest.raises(OSError):
+        orch.scan(sender=ctrl, scan_points=[0., 1., 2.], acq_times=[0.] * 3)
+
+    calls = [c[0][0] for c in dm.receive.call_args_list]
+    assert "close_scan" not in calls
+
+
+# ---------------------------------------------------------
+# asynchronous data manager dispatch
+# ---------------------------------------------------------
+
+def test_async_dispatch_does_not_block_scan_on_slow_data_manager():
+    orch = Orchestrator()
+    orch.async_dispatch = True
+    ctrl = MockController()
+    orch.add_controller_component(ctrl)
+    slow_dm = SlowDataManager()
+    fast_dm = MockDataManager()
+    orch.add_data_component(slow_dm)
+    orch.add_data_component(fast_dm)
+
+    orch.scan(sender=ctrl, scan_points=list(range(4)), acq_times=[0.] * 4)
+
+    # close_scan drains all queues, in order, before returning
+    assert slow_dm.indexes == list(range(4))
+    calls = [c[0][0] for c in fast_dm.receive.call_args_list]
+    assert calls == ["new_scan"] + ["new_scan_point"] * 4 + ["scan_timing", "close_scan"]
+
+    stats = orch.dispatch_stats()[str(slow_dm)]
+    assert stats.delivered == 7
+    assert stats.depth == 0
+    assert stats.max_latency >= 0.1
+    orch.stop_dispatch()
+
+
+def test_async_dispatch_error_propagates():
+    orch = Orchestrator()
+    orch.async_dispatch = True
+    dm = MockDataManager()
+    dm.receive.side_effect = OSError("network share unreachable")
+    orch.add_data_component(dm)
+
+    with pytest.raises(OSError):
+        orch.notify_data_managers("close_scan", {})
+    orch.stop_dispatch()
+
+
+def test_async_dispatch_failed_delivery_drops_events_until_next_scan():
+    orch = Orchestrator()
+    orch.async_dispatch = True
+    dm = MockDataManager()
+    dm.receive.side_effect = [OSError("network share unreachable"), None, None, None]
+    orch.add_data_component(dm)
+
+    with pytest.raises(OSError):
+        orch.notify_data_managers("new_scan", {'scan_points': 2, 'all_device_info': {}})
+    with pytest.raises(OSError):  # still failed, the point of the missed scan is not delivered
+        orch.notify_data_managers("new_scan_point", {'idx': 0, 'data': {}, 'positions': {}})
+
+    orch.notify_data_managers("new_scan", {'scan_points': 2, 'all_device_info': {}})
+    orch.notify_data_managers("new_scan_point", {'idx': 0, 'data': {}, 'positions': {}})
+    orch.stop_dispatch()
+
+    calls = [c[0][0] for c in dm.receive.call_args_list]
+    assert calls == ["new_scan", "new_scan", "new_scan_point"]
+
+
+# ---------------------------------------------------------
+# ascan()
+# ---------------------------------------------------------
+
+class AsyncSensor(MockSensor):
+    async def async_acquisition(self, acquisition_time):
+        await asyncio.sleep(acquisition_time)
+        return self.acquisition(acquisition_time)
+
+
+class AsyncController(MockController):
+    async def async_amove(self, pos):
+        await asyncio.sleep(0.01)
+        self.amove(pos)
+
+
+def test_ascan_runs_full_cycle_with_concurrent_sensors():
+    orch = Orchestrator()
+    orch.add_sensor_component(AsyncSensor(alias="S1"))
+    orch.add_sensor_component(AsyncSensor(alias="S2"))
+    ctrl = AsyncController()
+    orch.add_controller_component(ctrl)
+    dm = MockDataManager()
+    orch.add_data_component(dm)
+
+    start = time.perf_counter()
+    asyncio.run(orch.ascan(ctrl, scan_points=[0.0, 1.0], acq_times=[0.2, 0.2]))
+    duration = time.perf_counter() - start
+
+    assert duration < 0.7
+    assert ctrl.user_position == 1.0
+    calls = [c[0][0] for c in dm.receive.call_args_list]
+    assert calls == ["new_scan", "new_scan_point", "new_scan_point", "close_scan"]
+
+
+def test_async_acquire_all_reports_failing_sensors():
+    orch = Orchestrator()
+
+    class FailingAsyncSensor(AsyncSensor):
+        async def async_acquisition(self, acquisition_time):
+            raise IOError("USB link lost")
+
+    orch.add_sensor_component(AsyncSensor(alias="S1"))
+    orch.add_sensor_component(FailingAsyncSensor(alias="S2"))
+
+    with pytest.raises(AcquisitionError) as exc_info:
+        asyncio.run(orch.async_acquire_all(0.01))
+
+    assert list(exc_info.value.errors.keys()) == ["S2"]
+
+
+# ---------------------------------------------------------
+# mesh_scan()
+# ---------------------------------------------------------
+
+def test_mesh_scan_snake_moves_and_grid_indexes():
+    orch = Orchestrator()
+    slow = MockController(name="y")
+    fast = MockController(name="x")
+    slow.amove = MagicMock(side_effect=slow.amove)
+    fast.amove = MagicMock(side_effect=fast.amove)
+    orch.add_controller_component(slow)
+    orch.add_controller_component(fast)
+    dm = MockDataManager()
+    orch.add_data_component(dm)
+
+    orch.mesh_scan([slow, fast], [[0., 1.], [0., 5., 10.]], acq_time=0.)
+
+    new_scan = dm.receive.call_args_list[0]
+    assert new_scan[1]['scan_points'] == (2, 3)
+    points = [c[1] for c in dm.receive.call_args_list if c[0][0] == "new_scan_point"]
+    assert [p['idx'] for p in points] == [(0, 0), (0, 1), (0, 2), (1, 2), (1, 1), (1, 0)]
+    assert [p['positions']['x'] for p in points] == [0., 5., 10., 10., 5., 0.]
+    # a motor only moves when its target changes
+    assert slow.amove.call_count == 2
+    assert fast.amove.call_count == 5
+
+
+# ---------------------------------------------------------
+# scan path optimisation
+# ---------------------------------------------------------
+
+def test_scan_optimise_path_keeps_logical_indexes():
+    orch = Orchestrator()
+    orch.optimise_path = True
+
+    ctrl = MockController()
+    ctrl.amove = MagicMock(side_effect=ctrl.amove)
+    orch.add_controller_component(ctrl)
+    dm = MockDataManager()
+    orch.add_data_component(dm)
+
+    scan_points = [3., 1., 4., 0., 2.]
+    orch.scan(sender=ctrl, scan_points=scan_points, acq_times=[0.] * 5)
+
+    assert [c[0][0] for c in ctrl.amove.call_args_list] == [0., 1., 2., 3., 4.]
+    points = [c[1] for c in dm.receive.call_args_list if c[0][0] == "new_scan_point"]
+    assert all(scan_points[p['idx']] == p['positions']['motor'] for p in points)
+    assert list(dm.receive.call_args_list[0][1]['point_order']) == [3, 1, 4, 0, 2]
+
+
+# ---------------------------------------------------------
+# adaptive_scan()
+# ---------------------------------------------------------
+
+def test_adaptive_scan_densifies_around_edge():
+    orch = Orchestrator()
+    ctrl = MockController(name="energy")
+    orch.add_controller_component(ctrl)
+
+    class EdgeSensor(MockSensor):
+        def acquisition(self, acquisition_time):
+            mock = MagicMock()
+            mock.counts = np.full(4, 1000 * (1 + np.tanh((ctrl.user_position - 5.) / 0.1)))
+            return mock
+
+    orch.add_sensor_component(EdgeSensor(alias="S1"))
+
+    positions, intensities = orch.adaptive_scan(ctrl, 0., 10., 1., acq_time=0., roi=(0, 2),
+                                                tolerance=0.05, min_step=0.01, max_points=60)
+
+    assert np.all(np.diff(positions) > 0)
+    assert len(positions) <= 60
+    near_edge = np.sum(np.abs(positions - 5.) < 0.5)
+    assert near_edge > 10
+    assert np.sum(positions > 6.) == 3  # flat post-edge region is not refined
+    assert intensities[-1] == pytest.approx(4000)
+
+
+# ---------------------------------------------------------
+# interrupted scan and resume()
+# ---------------------------------------------------------
+
+class FlakyMotor(MockController):
+    def __init__(self, fail_at):
+        super().__init__()
+        self.fail_at = fail_at
+
+    def amove(self, pos):
+        if pos == self.fail_at:
+            self.fail_at = None
+            raise RuntimeError("USB glitch")
+        super().amove(pos)
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_resume_interrupted_scan(pipelined):
+    orch = Orchestrator()
+    orch.pipelined_scan = pipelined
+    motor = FlakyMotor(fail_at=3.)
+    orch.add_controller_component(motor)
+    dm = MockDataManager()
+    orch.add_data_component(dm)
+
+    with pytest.raises(RuntimeError):
+        orch.scan(sender=motor, scan_points=[0., 1., 2., 3., 4.], acq_times=[0.] * 5)
+    orch.resume()
+
+    calls = [c[0][0] for c in dm.receive.call_args_list]
+    assert calls == (["new_scan"] + ["new_scan_point"] * 3 + ["device_status", "interrupt_scan", "resume_scan"]
+                     + ["new_scan_point"] * 2 + ["scan_timing", "close_scan"])
+    points = [c[1] for c in dm.receive.call_args_list if c[0][0] == "new_scan_point"]
+    assert [p['idx'] for p in points] == [0, 1, 2, 3, 4]
+
+    with pytest.raises(UserWarning):
+        orch.resume()
+
+
+def test_resume_mesh_scan_moves_all_motors_back():
+    orch = Orchestrator()
+    slow = MockController('slow')
+    fast = FlakyMotor(fail_at=2.)
+    orch.add_controller_component(slow)
+    orch.add_controller_component(fast)
+    dm = MockDataManager()
+    orch.add_data_component(dm)
+
+    with pytest.raises(RuntimeError):
+        orch.mesh_scan([slow, fast], [[0., 1.], [0., 1., 2.]], acq_time=0.)
+    slow.amove(5.)  # moved by hand during the interruption
+    orch.resume()
+
+    points = [c[1] for c in dm.receive.call_args_list if c[0][0] == "new_scan_point"]
+    stored = {p['idx']: (p['positions']['slow'], p['positions']['motor']) for p in points}
+    assert stored[(0, 2)] == (0., 2.)
+    assert stored[(1, 2)] == (1., 2.)
+    assert len(stored) == 6
+
+
+def test_resume_refused_when_devices_changed():
+    orch = Orchestrator()
+    motor = FlakyMotor(fail_at=1.)
+    orch.add_controller_component(motor)
+
+    with pytest.raises(RuntimeError):
+        orch.scan(sender=motor, scan_points=[0., 1.], acq_times=[0.] * 2)
+    orch.add_sensor_component(MockSensor())
+
+    with pytest.raises(ValueError):
+        orch.resume()
+
+
+def test_new_scan_discards_interrupted_scan():
+    orch = Orchestrator()
+    motor = FlakyMotor(fail_at=1.)
+    orch.add_controller_component(motor)
+
+    with pytest.raises(RuntimeError):
+        orch.scan(sender=motor, scan_points=[0., 1.], acq_times=[0.] * 2)
+    orch.scan(sender=motor, scan_points=[0., 0.5], acq_times=[0.] * 2)
+
+    with pytest.raises(UserWarning):
+        orch.resume()
+
+
+# ---------------------------------------------------------
+# dry_run() and timing calibration
+# ---------------------------------------------------------
+
+def test_dry_run_uses_calibrated_timing():
+    orch = Orchestrator()
+    motor = SlowMotor()
+    orch.add_controller_component(motor)
+    orch.add_sensor_component(SlowSensor())
+
+    before = orch.dry_run(motor, scan_points=[0., 1., 2.], acq_times=[0.1] * 3)
+    assert before.settling == 0.
+
+    orch.scan(sender=motor, scan_points=[0., 1., 3., 4., 6.], acq_times=[0.05] * 5)
+    estimate = orch.dry_run(motor, scan_points=[7., 8., 9., 10.], acq_times=[0.1] * 4)
+
+    assert estimate.nb_points == 4
+    # SlowMotor takes 0.1 s per move, whatever the distance
+    assert estimate.settling == pytest.approx(0.4, abs=0.1)
+    assert estimate.motion == pytest.approx(0., abs=0.05)
+    assert estimate.acquisition == pytest.approx(0.4, abs=0.05)
+    assert list(estimate.targets['motor']) == [7., 8., 9., 10.]
+    assert motor.user_position == 6.
+
+
+def test_calibration_with_constant_steps(recwarn):
+    orch = Orchestrator()
+    motor = SlowMotor()
+    orch.add_controller_component(motor)
+    orch.add_sensor_component(MockSensor(alias="S1"))
+
+    # the steps of linspace only differ by rounding errors
+    orch.scan(sender=motor, scan_points=np.linspace(0., 1., 6), acq_times=[0.] * 6)
+
+    assert not [w for w in recwarn if issubclass(w.category, np.exceptions.RankWarning)]
+    model = orch.motion_models['motor']
+    assert model.settling == 0.
+    assert 0.2 / model.velocity == pytest.approx(0.1, abs=0.05)
+
+
+# ---------------------------------------------------------
+# phase timing
+# ---------------------------------------------------------
+
+def test_scan_timing_sent_to_data_managers():
+    orch = Orchestrator()
+    orch.add_sensor_component(MockSensor(alias="S1"))
+    ctrl = MockController()
+    orch.add_controller_component(ctrl)
+    dm = MockDataManager()
+    orch.add_data_component(dm)
+    console = ScanConsole(refresh_rate=0)
+    console.detach()
+    orch.add_data_component(console)
+
+    orch.scan(sender=ctrl, scan_points=[0., 1., 2.], acq_times=[0.] * 3)
+
+    timing_calls = [c[1] for c in dm.receive.call_args_list if c[0][0] == "scan_timing"]
+    phases = timing_calls[0]['phases']
+    assert {'move', 'acquisition', 'acquisition S1', 'publish', 'logging', f'receive {dm}'} <= set(phases)
+    assert all(len(durations) == 3 for durations in phases.values())
+
+
+# ---------------------------------------------------------
+# repeat_scan()
+# ---------------------------------------------------------
+
+class NoisySensor(MockSensor):
+    def __init__(self, alias="S1", seed=0):
+        super().__init__(alias)
+        self.rng = np.random.default_rng(seed)
+
+    def acquisition(self, acquisition_time):
+        return MCA(self.rng.poisson(1000, 4), MCAMetadata.dummy())
+
+
+def test_repeat_scan_accumulates_passes():
+    orch = Orchestrator()
+    sensor = NoisySensor()
+    orch.add_sensor_component(sensor)
+    ctrl = MockController()
+    orch.add_controller_component(ctrl)
+    dm = MockDataManager()
+    orch.add_data_component(dm)
+
+    accumulator = orch.repeat_scan(ctrl, [0., 1., 2.], [0.] * 3, passes=4, roi=(0, 2))
+
+    assert accumulator.passes == 4
+    assert accumulator not in orch.data_managers
+    calls = [c[0][0] for c in dm.receive.call_args_list]
+    assert calls.count("new_scan") == 4
+    assert calls[-1] == "accumulated_scan"
+    result = dm.receive.call_args_list[-1][1]
+    assert result['data']['S1']['MCA'].shape == (3, 4)
+    assert result['data']['S1']['runtime'] == pytest.approx([4., 4., 4.])
+    assert result['data']['S1']['ICR'] == pytest.approx([10., 10., 10.])
+    assert np.all(result['data']['S1']['ROI variance'] > 0)
+    assert result['positions']['motor'] == pytest.approx([0., 1., 2.])
+    # running statistics match the ones computed from the summed spectra
+    assert accumulator.roi_mean['S1'] == pytest.approx(result['data']['S1']['MCA'][:, :2].sum(axis=1) / 4)
+
+
+class StoredSensor(NoisySensor):
+    def get_device_info(self):
+        return DeviceInfo(alias=self.alias, metadata={'attrs': {}, 'data_sets': {
+            'MCA': (4, 'f8'), 'runtime': (1, 'f8'), 'ICR': (1, 'f8'), 'OCR': (1, 'f8')}})
+
+
+class StoredController(MockController):
+    def get_device_info(self):
+        return DeviceInfo(alias=self.alias, metadata={'attrs': {}, 'data_sets': {'user_position': (1, 'f8')}})
+
+
+def test_repeat_scan_stores_the_names_of_the_passes(tmp_path):
+    orch = Orchestrator()
+    orch.add_sensor_component(StoredSensor())
+    ctrl = StoredController()
+    orch.add_controller_component(ctrl)
+    dc = DataCollector()
+    borealis.session_orchestrator.data_managers.remove(dc)
+    dc.data_dir = tmp_path
+    dc.create_h5file(add_date=False)
+    dc.add_scan(scan_points=1, all_device_info={})  # an earlier scan of the file
+    dc.close_scan()
+    orch.add_data_component(dc)
+
+    accumulator = orch.repeat_scan(ctrl, [0., 1.], [0.] * 2, passes=2)
+
+    assert accumulator.scans == ['scan2', 'scan3']
+    assert list(dc.h5file['scan4'].attrs['Accumulated scans']) == ['scan2', 'scan3']
+    dc.h5file.close()
+
+
+def test_repeat_scan_stops_at_statistical_target():
+    orch = Orchestrator()
+    orch.add_sensor_component(NoisySensor())
+    ctrl = MockController()
+    orch.add_controller_component(ctrl)
+
+    # Poisson noise of ~2000 counts is ~2 %, the error of the mean is below 5 % after a few passes
+    accumulator = orch.repeat_scan(ctrl, [0., 1.], [0.] * 2, passes=50, roi=(0, 2), target_error=0.05)
+
+    assert 2 <= accumulator.passes < 50
+    assert accumulator.relative_error() <= 0.05
+
+
+# ---------------------------------------------------------
+# time_scan()
+# ---------------------------------------------------------
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_time_scan_fixed_number_of_frames(pipelined):
+    orch = Orchestrator()
+    orch.pipelined_scan = pipelined
+    orch.add_sensor_component(MockSensor(alias="S1"))
+    ctrl = MockController()
+    ctrl.amove = MagicMock()
+    orch.add_controller_component(ctrl)
+    dm = MockDataManager()
+    orch.add_data_component(dm)
+
+    assert orch.time_scan(0., nb_frames=5) == 5
+
+    ctrl.amove.assert_not_called()
+    points = [c[1] for c in dm.receive.call_args_list if c[0][0] == "new_scan_point"]
+    assert [point['idx'] for point in points] == list(range(5))
+    timestamps = [point['timestamp'] for point in points]
+    assert np.all(np.diff(timestamps) >= 0)
+    assert dm.receive.call_args_list[-1][0][0] == "close_scan"
+
+
+class FlakySensor(MockSensor):
+    def __init__(self, alias="S1", failing_frame=2):
+        super().__init__(alias)
+        self.frame = 0
+        self.failing_frame = failing_frame
+
+    def acquisition(self, acquisition_time):
+        self.frame += 1
+        if self.frame > self.failing_frame:
+            raise OSError("USB link lost")
+        return super().acquisition(acquisition_time)
+
+
+@pytest.mark.parametrize('pipelined', [False, True])
+def test_time_scan_error_interrupts_scan(pipelined):
+    orch = Orchestrator()
+    orch.pipelined_scan = pipelined
+    orch.add_sensor_component(FlakySensor())
+    dm = MockDataManager()
+    orch.add_data_component(dm)
+
+    with pytest.raises(OSError):
+        orch.time_scan(0.)
+
+    calls = [c[0][0] for c in dm.receive.call_args_list]
+    assert calls == ["new_scan", "new_scan_point", "new_scan_point", "interrupt_scan"]
+    assert not orch.is_scanning
+
+
+class SlowBatchWriter:
+    subscriptions = (PointReady, )
+
+    def __init__(self):
+        self.batches = []
+
+    def receive_events(self, events):
+        self.batches.append([event.idx for event in events])
+        time.sleep(0.05)
+
+
+def test_pipelined_time_scan_delivers_queued_frames_as_batches():
+    orch = Orchestrator()
+    orch.pipelined_scan = True
+    writer = SlowBatchWriter()
+    orch.add_data_component(writer)
+
+    assert orch.time_scan(0.001, nb_frames=20) == 20
+
+    assert sum(writer.batches, []) == list(range(20))
+    assert len(writer.batches) < 20
+    assert orch.bus.stats()['PointReady'].published == 20
+
+
+def test_time_scan_until_stopped():
+    orch = Orchestrator()
+    dm = MockDataManager()
+    orch.add_data_component(dm)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        frames = pool.submit(orch.time_scan, 0.01)
+        while not orch.is_scanning:
+            time.sleep(0.001)
+        time.sleep(0.1)
+        orch.abort()
+        nb_frames = frames.result(timeout=5)
+
+    assert nb_frames > 1
+    calls = [c[0][0] for c in dm.receive.call_args_list]
+    assert calls == ["new_scan"] + ["new_scan_point"] * nb_frames + ["close_scan"]
+    assert dm.receive.call_args_list[0][1]['scan_points'] == 0
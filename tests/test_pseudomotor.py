@@ -4,21 +4,24 @@ Created on Mon Jul 29 10:18:23 2024
 
 @author: renebes
 """
+import asyncio
 import math
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 import borealis
 from borealis.controller.controller_base import DummyCtrl
-from borealis.exceptions import SoftLimitError
+from borealis.exceptions import ScanPreflightError, SoftLimitError
 from borealis.motor import Motor
 from borealis.pseudo_motor import PseudoMotor
 from borealis.detector.detector_base import DummyDet
 
 
 @pytest.fixture(autouse=True, scope='module')
-def h5file():
+def h5file(tmp_path_factory):
+    borealis.session_data_collector.data_dir = tmp_path_factory.mktemp('data')
     borealis.session_data_collector.filename_base = 'datafile_test_pm'
     borealis.session_data_collector.instrument = 'Dummy instrument'
     borealis.session_data_collector.experiment_id = "Fake ID 42"
@@ -166,6 +169,39 @@ def test_soft_limit():
         pm_energy.amove(20)
 
 
+def test_pseudomotor_async_amove():
+    borealis.session_orchestrator._remove_all_sensors()
+    borealis.session_orchestrator._remove_all_controllers()
+    ctrl = DummyCtrl()
+    mot1 = Motor('DummyMotor1', '1', 1, ctrl)
+    mot2 = Motor('DummyMotor2', '2', 0, ctrl, soft_limit_low=-25, soft_limit_high=25)
+    geo1 = lambda x: x
+    geo2 = lambda x: 2 * x
+    position_law = lambda x: x[0].user_position
+    pseudo = PseudoMotor('DummyPseudoMotor', [mot1, mot2], [geo1, geo2], position_law)
+
+    asyncio.run(pseudo.async_amove(10))
+    assert mot1.user_position == 10
+    assert mot2.user_position == 20
+    assert pseudo.user_position == 10
+
+    with pytest.raises(SoftLimitError):
+        asyncio.run(pseudo.async_amove(15))
+
+
+def test_pseudomotor_physical_targets():
+    borealis.session_orchestrator._remove_all_sensors()
+    borealis.session_orchestrator._remove_all_controllers()
+    ctrl = DummyCtrl()
+    mot1 = Motor('DummyMotor1', '1', 0, ctrl)
+    mot2 = Motor('DummyMotor2', '2', 0, ctrl)
+    position_law = lambda x: x[0].user_position
+    pseudo1 = PseudoMotor('DummyPseudoMotor1', [mot1, mot2], [lambda x: x, lambda x: 2 * x], position_law)
+    pseudo2 = PseudoMotor('DummyPseudoMotor2', [pseudo1], [lambda x: x + 1], position_law)
+
+    assert pseudo2.physical_targets(3) == {'DummyMotor1': 4, 'DummyMotor2': 8}
+
+
 ###############################################################
 ### Tests below are only aimed to check the console output  ###
 ###############################################################
@@ -270,3 +306,28 @@ def test_pseudomotor_scan_no_h5file():
 
     with pytest.raises(UserWarning):
         pseudo1.scan(2, 5, .5, acq_time=.1)
+
+
+def test_pseudomotor_soft_limit_violations():
+    """Whole scans are checked at once, including conversion laws that only support scalars."""
+    borealis.session_orchestrator._remove_all_sensors()
+    borealis.session_orchestrator._remove_all_controllers()
+    ctrl = DummyCtrl()
+    mot1 = Motor('DummyMotor1', '1', 0, ctrl, soft_limit_low=-10, soft_limit_high=10)
+    mot2 = Motor('DummyMotor2', '2', 0, ctrl, soft_limit_low=-90, soft_limit_high=90)
+    position_law = lambda x: x[0].user_position
+    bragg = lambda x: math.degrees(math.asin(x / 10))  # scalar law, out of domain above 10
+    pseudo = PseudoMotor('DummyPseudoMotor', [mot1, mot2], [lambda x: 2 * x, bragg], position_law)
+
+    assert pseudo.soft_limit_violations(np.linspace(-5, 5, 11)) == {}
+    targets = pseudo.physical_targets_array(np.array([0., 5., 10.]))
+    assert targets['DummyMotor1'] == pytest.approx([0., 10., 20.])
+    assert targets['DummyMotor2'] == pytest.approx([0., 30., 90.])
+
+    violations = pseudo.soft_limit_violations(np.arange(0., 12.))
+    assert violations['DummyMotor1'][0] == 6
+    assert violations['DummyMotor2'][0] == 11  # asin out of domain
+
+    with pytest.raises(ScanPreflightError):
+        pseudo.scan(0, 12, 1)
+    assert mot1.user_position == 0
@@ -0,0 +1,141 @@
+import json
+import time
+
+import numpy as np
+import pytest
+
+from borealis.data_structures import DeviceInfo
+from borealis.orchestrator import Orchestrator
+from borealis.scan_queue import ScanQueue
+
+
+class MockMotor:
+    def __init__(self, alias):
+        self.alias = alias
+        self.user_position = 0.
+        self.visited = []
+
+    def get_device_info(self):
+        return DeviceInfo(alias=self.alias, metadata={'data': 'test'})
+
+    def amove(self, position):
+        self.user_position = position
+        self.visited.append(position)
+
+    def physical_targets_array(self, positions):
+        return {self.alias: np.asarray(positions, dtype=float)}
+
+    def soft_limit_violations(self, positions):
+        return {}
+
+
+class MockDataCollector:
+    def __init__(self):
+        self.current_sample = ''
+        self.samples = []
+
+    def receive(self, message, **kwargs):
+        if message == 'new_scan':
+            self.samples.append(self.current_sample)
+
+
+@pytest.fixture
+def setup(tmp_path):
+    orch = Orchestrator()
+    motors = [MockMotor('x'), MockMotor('energy')]
+    for motor in motors:
+        orch.add_controller_component(motor)
+    dc = MockDataCollector()
+    orch.add_data_component(dc)
+    queue = ScanQueue(motors, state_file=tmp_path / 'queue.json', orchestrator=orch, data_collector=dc)
+    return queue, motors, dc
+
+
+def test_scan_queue_runs_jobs_in_order(setup):
+    queue, (x, energy), dc = setup
+    first = queue.add('sample A', {'type': 'scan', 'motor': 'energy', 'points': [1., 2.], 'acq_time': 0.},
+                      moves={'x': 10.})
+    second = queue.add('sample B', {'type': 'mesh', 'motors': ['x', 'energy'], 'axes': [[0., 1.], [5., 6.]],
+                                    'acq_time': 0.})
+    third = queue.add('sample C', {'type': 'scan', 'motor': 'energy', 'points': [3.], 'acq_time': 0.})
+    queue.move(third, 0)
+    queue.remove(second)
+
+    queue.start()
+    queue.join()
+    queue.stop()
+
+    assert dc.samples == ['sample C', 'sample A']
+    assert x.visited == [10.]
+    assert [job.status for job in queue.status()] == ['done', 'done', 'cancelled']
+    assert [job.job_id for job in queue.status()] == [third, first, second]
+
+
+def test_scan_queue_failed_job_does_not_stop_the_queue(setup):
+    queue, (x, energy), dc = setup
+
+    def broken_move(position):
+        raise RuntimeError("Motor stalled")
+
+    queue.add('sample A', {'type': 'scan', 'motor': 'energy', 'points': [1.], 'acq_time': 0.}, moves={'x': 1.})
+    queue.add('sample B', {'type': 'scan', 'motor': 'energy', 'points': [1.], 'acq_time': 0.})
+    x.amove = broken_move
+
+    queue.start()
+    queue.join()
+    queue.stop()
+
+    jobs = queue.status()
+    assert [job.status for job in jobs] == ['failed', 'done']
+    assert 'Motor stalled' in jobs[0].error
+
+
+def test_scan_queue_pause(setup):
+    queue, (x, energy), dc = setup
+    queue.pause()
+    queue.start()
+    queue.add('sample A', {'type': 'scan', 'motor': 'energy', 'points': [1.], 'acq_time': 0.})
+    time.sleep(0.1)  # give the worker a chance to pick the job up
+
+    assert queue.status()[0].status == 'queued'
+    queue.resume()
+    queue.join()
+    queue.stop()
+    assert queue.status()[0].status == 'done'
+
+
+def test_scan_queue_state_is_persistent(setup, tmp_path):
+    queue, motors, dc = setup
+    queue.add('sample A', {'type': 'scan', 'motor': 'energy', 'points': [1., 2.], 'acq_time': 0.})
+    # simulate a session that ended while the job was running
+    state = json.loads((tmp_path / 'queue.json').read_text())
+    state[0]['status'] = 'running'
+    (tmp_path / 'queue.json').write_text(json.dumps(state))
+
+    reloaded = ScanQueue(motors, state_file=tmp_path / 'queue.json', orchestrator=Orchestrator(), data_collector=dc)
+
+    assert reloaded.status()[0].status == 'queued'
+    assert reloaded.status()[0].scan['points'] == [1., 2.]
+
+
+def test_scan_queue_stores_numpy_scan_definitions(setup, tmp_path):
+    queue, motors, dc = setup
+    queue.add('sample A', {'type': 'mesh', 'motors': ['x', 'energy'], 'axes': [np.arange(2.), np.linspace(5, 6, 2)],
+                           'acq_time': np.float32(0.5)})
+    with pytest.raises(TypeError):
+        queue.add('sample B', {'type': 'scan', 'motor': 'energy', 'points': [1.], 'acq_time': object()})
+    queue.add('sample C', {'type': 'scan', 'motor': 'energy', 'points': np.array([1., 2.]), 'acq_time': 0.})
+
+    reloaded = ScanQueue(motors, state_file=tmp_path / 'queue.json', orchestrator=Orchestrator(), data_collector=dc)
+    assert [job.sample for job in reloaded.status()] == ['sample A', 'sample C']
+    assert reloaded.status()[0].scan['axes'] == [[0., 1.], [5., 6.]]
+    assert reloaded.status()[0].scan['acq_time'] == 0.5
+    assert [job.sample for job in queue.status()] == ['sample A', 'sample C']
+
+
+def test_scan_queue_rejects_unknown_motor(setup):
+    queue, motors, dc = setup
+    with pytest.raises(ValueError):
+        queue.add('sample A', {'type': 'scan', 'motor': 'theta', 'points': [1.], 'acq_time': 0.})
+    with pytest.raises(ValueError):
+        queue.add('sample A', {'type': 'fly', 'motor': 'energy'})
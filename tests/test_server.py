@@ -0,0 +1,161 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from borealis.data_structures import DeviceInfo
+from borealis.exceptions import ServerError
+from borealis.orchestrator import Orchestrator
+from borealis.scan_queue import ScanQueue
+from borealis.server import ScanClient, ScanServer
+
+
+class MockMotor:
+    def __init__(self, alias, move_time=0.):
+        self.alias = alias
+        self.user_position = 0.
+        self.move_time = move_time
+
+    def get_device_info(self):
+        return DeviceInfo(alias=self.alias, metadata={'data': 'test'})
+
+    def amove(self, position):
+        time.sleep(self.move_time)
+        self.user_position = position
+
+    def soft_limit_violations(self, positions):
+        return {}
+
+
+class MockDataCollector:
+    current_sample = ''
+
+    def receive(self, message, **kwargs):
+        pass
+
+
+@pytest.fixture
+def session(tmp_path):
+    orch = Orchestrator()
+    motors = [MockMotor('x'), MockMotor('energy', move_time=0.05)]
+    for motor in motors:
+        orch.add_controller_component(motor)
+    dc = MockDataCollector()
+    orch.add_data_component(dc)
+    queue = ScanQueue(motors, state_file=tmp_path / 'queue.json', orchestrator=orch, data_collector=dc)
+    server = ScanServer(motors, address=('127.0.0.1', 0), scan_queue=queue, orchestrator=orch)
+    server.start()
+    client = ScanClient(server.address)
+    yield orch, motors, server, client
+    client.close()
+    server.stop()
+
+
+def test_server_move_scan_and_status(session):
+    orch, (x, energy), server, client = session
+
+    assert client.move('x', 2.5) == 2.5
+    job_id = client.scan('Cu foil', 'energy', np.array([1., 2., 3.]), acq_time=0., moves={'x': 1.})
+    server.scan_queue.join()
+
+    jobs = client.jobs()
+    assert jobs[0]['job_id'] == job_id
+    assert jobs[0]['status'] == 'done'
+    status = client.status()
+    assert status['motors'] == {'x': 1., 'energy': 3.}
+    assert status['scanning'] is False
+
+
+def test_server_errors_are_raised_in_client(session):
+    orch, motors, server, client = session
+
+    with pytest.raises(ServerError, match='theta'):
+        client.scan('Cu foil', 'theta', [1.], acq_time=0.)
+    with pytest.raises(ServerError):
+        client.request('self_destruct')
+    assert client.status()['queued_jobs'] == 0  # connection still usable
+
+
+def test_server_abort(session):
+    orch, motors, server, client = session
+
+    client.scan('Cu foil', 'energy', list(range(100)), acq_time=0.)
+    while not client.status()['scanning']:
+        time.sleep(0.01)
+    with pytest.raises(ServerError, match='scan is running'):
+        client.move('x', 1.)
+    client.abort()
+    server.scan_queue.join()
+
+    assert client.jobs()[0]['status'] == 'aborted'
+    assert client.status()['queue_paused'] is True
+    assert orch._checkpoint is not None
+
+
+def test_server_abort_during_the_moves_before_a_scan(session):
+    orch, (x, energy), server, client = session
+    energy.move_time = 0.3
+
+    client.scan('Cu foil', 'x', [1., 2.], acq_time=0., moves={'energy': 5.})
+    while client.jobs()[0]['status'] != 'running':
+        time.sleep(0.01)
+    client.abort()
+    server.scan_queue.join()
+
+    assert client.jobs()[0]['status'] == 'aborted'
+    assert x.user_position == 0.  # the scan did not run
+    assert not orch.is_abort_requested
+
+
+class ReadCountingMotor(MockMotor):
+    """Motor recording the threads reading its position from the controller."""
+
+    def __init__(self, alias, move_time=0.):
+        self.readers = []
+        super().__init__(alias, move_time)
+
+    @property
+    def user_position(self):
+        self.readers.append(threading.current_thread().name)
+        return self._position
+
+    @user_position.setter
+    def user_position(self, position):
+        self._position = position
+
+
+def test_server_status_does_not_query_motors_during_a_scan(tmp_path):
+    orch = Orchestrator()
+    energy = ReadCountingMotor('energy', move_time=0.02)
+    orch.add_controller_component(energy)
+    queue = ScanQueue([energy], state_file=tmp_path / 'queue.json', orchestrator=orch,
+                      data_collector=MockDataCollector())
+    server = ScanServer([energy], address=('127.0.0.1', 0), scan_queue=queue, orchestrator=orch)
+    server.start()
+    with ScanClient(server.address) as client:
+        client.scan('Cu foil', 'energy', list(range(50)), acq_time=0.)
+        while not orch.last_positions:
+            time.sleep(0.01)
+        energy.readers.clear()
+        status = client.status()
+        client.abort()
+    server.stop()
+
+    assert set(energy.readers) <= {'borealis-scan-queue'}  # only the scan reads the positions
+    assert status['motors']['energy'] is not None
+
+
+def test_server_move_and_queue_share_motion_lock(session):
+    """A queued job does not drive the motors while a client move holds the motion lock."""
+    orch, (x, energy), server, client = session
+
+    with server.scan_queue.motion_lock:  # as during a client move
+        client.scan('Cu foil', 'energy', [1., 2.], acq_time=0., moves={'x': 3.})
+        time.sleep(0.1)
+        assert x.user_position == 0.
+        assert not orch.is_scanning
+    server.scan_queue.join()
+
+    assert x.user_position == 3.
+    assert client.jobs()[0]['status'] == 'done'
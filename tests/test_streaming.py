@@ -0,0 +1,79 @@
+import time
+
+import numpy as np
+import pytest
+
+import borealis
+from borealis.events import PointReady, ScanClosed, ScanStarted
+from borealis.mca import MCA, MCAMetadata
+from borealis.streaming import StreamPublisher, StreamSubscriber
+
+
+@pytest.fixture
+def publisher():
+    publisher = StreamPublisher(buffer_size=1000)
+    borealis.session_orchestrator.remove_data_component(publisher)  # driven directly by the tests
+    yield publisher
+    publisher.close()
+
+
+def subscribe(publisher, **options):
+    subscriber = StreamSubscriber(publisher.address, timeout=5., **options)
+    start = time.perf_counter()
+    while publisher.nb_subscribers == 0 and time.perf_counter() - start < 5:
+        time.sleep(0.01)
+    return subscriber
+
+
+def publish_scan(publisher, nb_points):
+    publisher.receive_event(ScanStarted(scan_points=nb_points, all_device_info={}))
+    for idx in range(nb_points):
+        mca = MCA(np.arange(8, dtype=np.uint32) * idx, MCAMetadata.dummy())
+        publisher.receive_event(PointReady(idx=idx, data={'det': mca}, positions={'mot': idx / 10},
+                                           point_number=idx, position=float(idx), acq_time=0.5))
+    publisher.receive_event(ScanClosed())
+
+
+def read_scan(subscriber):
+    frames = []
+    for frame in subscriber:
+        frames.append(frame)
+        if frame['type'] == 'scan_closed':
+            return frames
+
+
+def test_stream_full_spectra(publisher):
+    with subscribe(publisher) as subscriber:
+        publish_scan(publisher, 3)
+        frames = read_scan(subscriber)
+
+    assert [frame['type'] for frame in frames] == ['scan_started', 'layout'] + ['point'] * 3 + ['scan_closed']
+    point = frames[-2]
+    assert point['point_number'] == 2
+    assert point['acq_time'] == 0.5
+    assert point['positions'] == {'mot': 0.2}
+    assert point['sensors']['det']['values'].dtype == np.uint32
+    assert np.array_equal(point['sensors']['det']['values'], np.arange(8) * 2)
+    assert point['sensors']['det']['ICR'] == 10
+
+
+def test_stream_decimation_and_roi(publisher):
+    with subscribe(publisher, decimation=5, roi=(0, 4)) as subscriber:
+        publish_scan(publisher, 12)
+        frames = read_scan(subscriber)
+
+    points = [frame for frame in frames if frame['type'] == 'point']
+    assert [point['point_number'] for point in points] == [0, 5, 10]
+    assert points[1]['sensors']['det']['values'].tolist() == [(0 + 1 + 2 + 3) * 5]
+
+
+def test_slow_subscriber_never_blocks(publisher):
+    publisher.buffer_size = 4
+    subscriber = subscribe(publisher)
+    # nothing is read by the subscriber, the socket buffers fill up and frames are dropped
+    start = time.perf_counter()
+    for _ in range(20):
+        publish_scan(publisher, 200)
+    assert time.perf_counter() - start < 5
+    publisher.close()  # does not wait for the subscriber either
+    subscriber.close()
@@ -0,0 +1,39 @@
+import threading
+
+import numpy as np
+import pytest
+
+from borealis import timing
+
+
+def test_phase_timer_accumulates_per_point():
+    timer = timing.PhaseTimer()
+    timing.activate(timer)
+    try:
+        for point in range(3):
+            timer.start_point(point)
+            timing.record('move', 0.1)
+            timing.record('move', 0.2)
+            with timing.phase('logging'):
+                pass
+        # threads without their own point record into the scan thread point
+        worker = threading.Thread(target=timing.record, args=('acquisition S1', 1.))
+        worker.start()
+        worker.join()
+    finally:
+        timing.activate(None)
+
+    phases = timer.phases()
+    assert phases['move'] == pytest.approx([0.3, 0.3, 0.3])
+    assert np.isnan(phases['acquisition S1'][:2]).all()
+    assert phases['acquisition S1'][2] == 1.
+    assert set(timer.summary()['move']) == {'p50', 'p90', 'p99', 'max'}
+
+
+def test_phase_is_not_recorded_without_active_timer():
+    timer = timing.PhaseTimer()
+    with timing.phase('move'):
+        pass
+    timing.record('move', 1.)
+
+    assert timer.phases() == {}
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from borealis.trajectory import mesh_points, optimise_order, refine_points, travel_time
+
+
+def test_mesh_points_raster():
+    points = list(mesh_points([[0, 1], [10, 20, 30]], snake=False))
+
+    assert [index for index, _ in points] == [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2)]
+    assert points[4][1] == (1., 20.)
+
+
+def test_mesh_points_snake_2d():
+    indexes = [index for index, _ in mesh_points([[0, 1, 2], [10, 20, 30]])]
+
+    assert indexes == [(0, 0), (0, 1), (0, 2), (1, 2), (1, 1), (1, 0), (2, 0), (2, 1), (2, 2)]
+
+
+def test_mesh_points_snake_3d_single_steps():
+    """Consecutive points differ by one step along one axis, and every grid point is visited once."""
+    indexes = [index for index, _ in mesh_points([range(3), range(2), range(4)])]
+
+    assert len(set(indexes)) == 3 * 2 * 4
+    steps = np.abs(np.diff(np.array(indexes), axis=0))
+    assert np.all(steps.sum(axis=1) == 1)
+
+
+def test_optimise_order_shuffled_1d():
+    rng = np.random.default_rng(42)
+    targets = rng.permutation(np.arange(0, 10, 0.5))[:, None]
+
+    order = optimise_order(targets, velocities=[1.], start=[0.])
+
+    assert sorted(order) == list(range(len(targets)))
+    assert np.all(np.diff(targets[order, 0]) > 0)
+    assert travel_time(targets[order], [1.], start=[0.]) == pytest.approx(9.5)
+
+
+def test_optimise_order_weights_axes_by_velocity():
+    """The slow axis should be traversed as few times as possible."""
+    targets = np.array([[0, 0], [0, 10], [1, 0], [1, 10]], dtype=float)
+
+    order = optimise_order(targets, velocities=[0.1, 100.], start=[0., 0.])
+
+    assert list(targets[order, 0]) == [0, 0, 1, 1]
+
+
+def test_refine_points_splits_steepest_intervals_first():
+    positions = np.array([0., 1., 2., 3., 4.])
+    intensities = np.array([0., 0., 1., 8., 10.])
+
+    new_points = refine_points(positions, intensities, tolerance=0.05)
+
+    assert list(new_points) == [2.5, 3.5, 1.5]
+    assert len(refine_points(positions, intensities, tolerance=0.05, min_step=0.6)) == 0